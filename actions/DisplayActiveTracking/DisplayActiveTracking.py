@@ -9,7 +9,6 @@ import os
 import requests
 import threading
 from typing import Dict, Any, Optional
-from loguru import logger as log
 
 # Import gtk modules - used for the config rows
 import gi
@@ -17,213 +16,205 @@ gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw
 
+from ...kimai_records import Timesheet
+from ...settings_cache import ConnectionProfile, SettingsSnapshot, action_profile_id
+from ...state_cache import action_state_key
+from ...ui_dispatcher import UiDispatcher, main_thread_only
+from ...plugin_log import get_logger
+
+log = get_logger("ui")
+
 class DisplayActiveTracking(ActionBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
         # State management
-        self.update_timer_id = None
         self.current_timesheet = None
-        self.is_updating = False
         
-    def on_ready(self) -> None:
-        # Reset state variables to handle page caching
-        # This ensures proper state when navigating back to cached pages  
-        self.current_timesheet = None
-        self.is_updating = False
-        # Note: Don't reset update_timer_id as it's managed by timer lifecycle
+        # Cached read-only view of this action's settings
+        self.settings_snapshot = SettingsSnapshot(self.get_settings)
+        
+        # Shared active-timesheet poller of this button's Kimai instance
+        self.subscribed_poller = None
+        
+        # Poll results and errors are coalesced into one render on the main loop;
+        # the labels last rendered let an unchanged refresh skip the setters
+        self.ui = UiDispatcher(self)
+        self.rendered = {}
+        
+    def set_settings(self, settings) -> None:
+        """Save action settings and refresh the cached snapshot"""
+        super().set_settings(settings)
+        self.settings_snapshot.invalidate()
         
+    def on_ready(self) -> None:
         # Set the default icon for display tracking
         self.set_media(media_path=self.plugin_base.get_asset_path("info.png"), size=0.75)
+        self.rendered = {}
+        
+        # Restore the last known state instantly (it survives page switches and caching);
+        # the elapsed time is recalculated from the begin time
+        cached = self.plugin_base.action_state_cache.get(action_state_key(self))
+        if cached is not None:
+            self._update_display_with_timesheet(cached.state.get("timesheet"))
+        else:
+            self.current_timesheet = None
         
         # Register this instance for notifications
         self.plugin_base.register_action_instance(self)
         
-        # Start periodic updates
+        # Start periodic updates (one shared poll per Kimai instance)
         self.start_periodic_updates()
         
-        # Initial update
-        self.update_display()
+        # Only revalidate when the cached state is too old
+        if not self.plugin_base.action_state_cache.is_stale(cached):
+            log.debug("Using cached display state ({:.0f}s old) without revalidating", cached.age)
+            return
+        
+        # Initial update, seeded from the instance's startup prefetch when available
+        if not self.kimai_instance().startup_prefetch.consume(self._on_prefetched_timesheet, self._on_prefetch_failed):
+            self.update_display()
         
     def on_key_down(self) -> None:
+        # Any key press ends idle mode (resumes polling with one refresh)
+        self.plugin_base.idle_monitor.touch()
+        
         # Manually refresh the display when pressed
         try:
             log.info("DisplayActiveTracking button pressed - refreshing display")
             self.update_display()
         except Exception as e:
-            log.error(f"Error in on_key_down: {e}")
+            log.error("Error in on_key_down: {}", e)
     
     def on_key_up(self) -> None:
         pass
     
+    def kimai_instance(self):
+        """The Kimai instance (connection, caches, poller) selected for this button"""
+        return self.plugin_base.get_kimai_instance(action_profile_id(self.settings_snapshot.get()))
+    
     def start_periodic_updates(self) -> None:
-        """Start periodic updates every 30 seconds"""
+        """Subscribe to the instance's poller, which refreshes every 30 seconds"""
         try:
-            if self.update_timer_id is not None:
-                from gi.repository import GLib
-                GLib.source_remove(self.update_timer_id)
-            
-            # Update every 30 seconds
-            from gi.repository import GLib
-            self.update_timer_id = GLib.timeout_add_seconds(30, self._periodic_update)
+            poller = self.kimai_instance().active_poller
+            if self.subscribed_poller is not None and self.subscribed_poller is not poller:
+                self.subscribed_poller.unsubscribe(self._on_active_timesheet_polled)
+            poller.subscribe(self._on_active_timesheet_polled, periodic=True)
+            self.subscribed_poller = poller
             
         except Exception as e:
-            log.error(f"Error starting periodic updates: {e}")
+            log.error("Error starting periodic updates: {}", e)
     
     def stop_periodic_updates(self) -> None:
-        """Stop periodic updates"""
+        """Stop receiving periodic updates"""
         try:
-            if self.update_timer_id is not None:
-                from gi.repository import GLib
-                GLib.source_remove(self.update_timer_id)
-                self.update_timer_id = None
+            if self.subscribed_poller is not None:
+                self.subscribed_poller.unsubscribe(self._on_active_timesheet_polled)
+                self.subscribed_poller = None
                 
         except Exception as e:
-            log.error(f"Error stopping periodic updates: {e}")
-    
-    def _periodic_update(self) -> bool:
-        """Periodic update callback - returns True to continue timer"""
-        try:
-            if not self.is_updating:
-                self.update_display()
-            return True  # Continue the timer
-        except Exception as e:
-            log.error(f"Error in periodic update: {e}")
-            return True  # Continue despite error
+            log.error("Error stopping periodic updates: {}", e)
     
     def update_display(self) -> None:
         """Update the display with current active tracking information"""
         try:
-            if self.is_updating:
-                return
-                
-            plugin_global_settings = self.plugin_base.get_settings()
-            kimai_url = plugin_global_settings.get("global_kimai_url", "")
-            api_token = plugin_global_settings.get("global_api_token", "")
+            instance = self.kimai_instance()
             
-            if not kimai_url or not api_token:
+            if not instance.profile.is_configured:
                 self._show_no_config()
                 return
                 
-            # Run in background thread to avoid blocking UI
-            threading.Thread(target=self._fetch_active_timesheet, 
-                            args=(kimai_url, api_token), daemon=True).start()
+            # The shared poll runs in a background thread and coalesces concurrent refreshes;
+            # the result arrives in _on_active_timesheet_polled
+            instance.active_poller.refresh()
                             
         except Exception as e:
-            log.error(f"Error updating display: {e}")
+            log.error("Error updating display: {}", e)
             self._show_error()
     
-    def _fetch_active_timesheet(self, kimai_url: str, api_token: str) -> None:
-        """Fetch active timesheet in background thread"""
-        try:
-            self.is_updating = True
-            
-            active_timesheet = self._get_active_timesheet(kimai_url, api_token)
-            
-            # Update UI in main thread using a wrapper function to ensure proper parameter passing
-            from gi.repository import GLib
-            GLib.idle_add(lambda: self._update_display_with_timesheet(active_timesheet))
-            
-        except Exception as e:
-            log.error(f"Error fetching active timesheet: {e}")
-            from gi.repository import GLib
-            GLib.idle_add(self._show_error)
-        finally:
-            self.is_updating = False
+    def _on_active_timesheet_polled(self, timesheet: Optional[Timesheet], ok: bool) -> None:
+        """Handle a shared poll result (called from the poller thread)"""
+        if ok:
+            self._update_display_with_timesheet(timesheet)
+        else:
+            self._show_error()
     
-    def _get_active_timesheet(self, kimai_url: str, api_token: str) -> Optional[dict]:
-        """Get the currently active timesheet with full expansion (nested objects)"""
-        try:
-            url = f"{kimai_url.rstrip('/')}/api/timesheets"
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Get active timesheets with full expansion (nested objects)
-            params = {"size": 1, "orderBy": "begin", "order": "DESC", "full": "true"}
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                timesheets = response.json()
-                log.debug(f"API response: {timesheets}")
-                
-                if timesheets and len(timesheets) > 0:
-                    # Check if the first timesheet is active (no end time)
-                    timesheet = timesheets[0]
-                    log.debug(f"First timesheet: {type(timesheet)} - {timesheet}")
-                    
-                    if timesheet.get('end') is None:
-                        log.info(f"Found active timesheet: {timesheet.get('id')}")
-                        log.debug(f"Returning timesheet: {type(timesheet)} - {timesheet}")
-                        return timesheet
-            
-            log.info("No active timesheet found")
-            return None
-            
-        except Exception as e:
-            log.error(f"Error getting active timesheet: {e}")
-            import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
-            return None
+    def _on_prefetched_timesheet(self, timesheet: Optional[Timesheet]) -> None:
+        """Show the active timesheet fetched once by the plugin at startup"""
+        self._update_display_with_timesheet(timesheet)
+    
+    def _on_prefetch_failed(self) -> None:
+        """Fall back to fetching on our own if the startup prefetch failed"""
+        self.update_display()
     
-    def _update_display_with_timesheet(self, timesheet: Optional[dict]) -> None:
+    def _render(self, top: tuple, center: tuple, bottom: tuple, background: list) -> None:
+        """Set the labels and background, skipping the ones already showing the same thing"""
+        for name, value, setter in (("top", top, self.set_top_label), ("center", center, self.set_center_label),
+                                    ("bottom", bottom, self.set_bottom_label)):
+            if self.rendered.get(name) != value:
+                text, font_size = value
+                if font_size is None:
+                    setter(text)
+                else:
+                    setter(text, font_size=font_size)
+                self.rendered[name] = value
+        if self.rendered.get("background") != background:
+            self.set_background_color(background)
+            self.rendered["background"] = background
+    
+    @main_thread_only("display")
+    def _update_display_with_timesheet(self, timesheet: Optional[Timesheet]) -> None:
         """Update the display with timesheet information"""
         try:
             # Debug logging to understand what we're receiving
-            log.debug(f"_update_display_with_timesheet called with: {type(timesheet)} - {timesheet}")
+            log.debug("_update_display_with_timesheet called with: {}", timesheet)
             
             self.current_timesheet = timesheet
+            self.plugin_base.action_state_cache.put(action_state_key(self), {"timesheet": timesheet})
             
             if timesheet is None:
                 self._show_no_active_tracking()
                 return
             
-            # Safety check: ensure timesheet is a dictionary
-            if not isinstance(timesheet, dict):
-                log.error(f"Expected dict but got {type(timesheet)}: {timesheet}")
+            # Safety check: ensure timesheet is a decoded record
+            if not isinstance(timesheet, Timesheet):
+                log.error("Expected Timesheet but got {}: {}", type(timesheet).__name__, timesheet)
                 self._show_error()
                 return
             
-            # Extract information from timesheet (now with full expansion)
-            project_info = timesheet.get('project', {})
-            activity_info = timesheet.get('activity', {})
-            customer_info = project_info.get('customer', {}) if project_info else {}
-            
-            customer_name = customer_info.get('name', 'Unknown Customer') if customer_info else 'No Customer'
-            project_name = project_info.get('name', 'Unknown Project') if project_info else 'No Project'
-            activity_name = activity_info.get('name', 'Unknown Activity') if activity_info else 'No Activity'
+            # Resolve names from the catalog cache (the poller made sure they are known)
+            described = self.kimai_instance().catalog_cache.describe(timesheet)
+            if described is not None:
+                customer, project, activity = described
+                customer_name, project_name, activity_name = customer.name, project.name, activity.name
+            else:
+                customer_name, project_name, activity_name = 'Unknown Customer', 'Unknown Project', 'Unknown Activity'
             
             # Calculate elapsed time
-            elapsed_text = self._calculate_elapsed_time(timesheet.get('begin'))
+            elapsed_text = self._calculate_elapsed_time(timesheet.begin)
             
             # Set labels using different positions
             # Top line: Customer & Project (truncated to fit)
             customer_short = customer_name[:8] if customer_name != 'No Customer' else ''
             project_short = project_name[:8] if project_name != 'No Project' else ''
             top_text = f"{customer_short} {project_short}".strip()
-            if top_text:
-                self.set_top_label(top_text, font_size=9)
-            else:
-                self.set_top_label("")
             
             # Middle line: Activity
             activity_short = activity_name[:12] if activity_name != 'No Activity' else ''
-            self.set_center_label(activity_short, font_size=10)
-            
-            # Bottom line: Elapsed time
-            self.set_bottom_label(elapsed_text, font_size=11)
             
-            # Set background color to indicate active tracking
-            self.set_background_color([0, 100, 0, 80])  # Subtle green background
+            # Bottom line: Elapsed time; a subtle green background indicates active tracking
+            self._render((top_text, 9) if top_text else ("", None), (activity_short, 10), (elapsed_text, 11),
+                         [0, 100, 0, 80])
             
-            log.info(f"Updated display: {customer_name} / {project_name} / {activity_name} ({elapsed_text})")
+            # Runs on every poll; one line every few minutes is enough to follow along
+            log.every("display-updated", 300).info("Updated display: {} / {} / {} ({})",
+                                                   customer_name, project_name, activity_name, elapsed_text)
             
         except Exception as e:
-            log.error(f"Error updating display with timesheet: {e}")
-            log.error(f"Timesheet type: {type(timesheet)}, value: {timesheet}")
+            log.error("Error updating display with timesheet: {}", e)
+            log.error("Timesheet type: {}, value: {}", type(timesheet).__name__, timesheet)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
             self._show_error()
     
     def _calculate_elapsed_time(self, start_time: str) -> str:
@@ -255,61 +246,47 @@ class DisplayActiveTracking(ActionBase):
             return f"{hours:02d}:{minutes:02d}"
             
         except Exception as e:
-            log.debug(f"Error calculating elapsed time: {e}")
-            log.debug(f"Start time format: '{start_time}'")
+            log.every("elapsed-time-error", 60).debug("Error calculating elapsed time from '{}': {}", start_time, e)
             return "??:??"
     
+    @main_thread_only("display")
     def _show_no_active_tracking(self) -> None:
         """Show display when no active tracking"""
         try:
-            # Clear all labels when no tracking is active
-            self.set_top_label("")
-            self.set_center_label("")
-            self.set_bottom_label("")
-            self.set_background_color([0, 0, 0, 0])  # Transparent background
-            log.info("Display updated: No active tracking")
+            # Clear all labels and the background when no tracking is active
+            self._render(("", None), ("", None), ("", None), [0, 0, 0, 0])
+            log.every("display-idle", 300).info("Display updated: No active tracking")
         except Exception as e:
-            log.error(f"Error showing no active tracking: {e}")
+            log.error("Error showing no active tracking: {}", e)
     
+    @main_thread_only("display")
     def _show_no_config(self) -> None:
         """Show display when configuration is missing"""
         try:
-            self.set_top_label("")
-            self.set_center_label("Config", font_size=10)
-            self.set_bottom_label("Missing", font_size=10)
-            self.set_background_color([100, 100, 0, 80])  # Yellow background
+            self._render(("", None), ("Config", 10), ("Missing", 10), [100, 100, 0, 80])  # Yellow background
             log.warning("Display updated: Configuration missing")
         except Exception as e:
-            log.error(f"Error showing no config: {e}")
+            log.error("Error showing no config: {}", e)
     
+    @main_thread_only("display")
     def _show_error(self) -> None:
         """Show error indicator"""
         try:
-            self.set_top_label("")
-            self.set_center_label("Error", font_size=12)
-            self.set_bottom_label("")
-            self.set_background_color([100, 0, 0, 80])  # Red background
-            log.error("Display updated: Error state")
+            self._render(("", None), ("Error", 12), ("", None), [100, 0, 0, 80])  # Red background
+            # Every failed poll lands here; the poller already logs the cause
+            profile = self.kimai_instance().profile
+            log.every(f"display-error:{profile.id}", 300).error("Display updated: Error state for profile '{}'", profile.label)
         except Exception as e:
-            log.error(f"Error showing error state: {e}")
+            log.error("Error showing error state: {}", e)
 
-    def on_timesheet_started_notification(self) -> None:
-        """Handle notification that a timesheet has been started"""
+    def on_connection_profile_changed(self, profile: ConnectionProfile) -> None:
+        """Handle a changed Kimai URL or API token"""
         try:
-            log.info("Received notification that a timesheet was started - updating display")
-            # Immediately update display
+            log.info("Kimai connection settings changed - updating display")
+            self.start_periodic_updates()
             self.update_display()
         except Exception as e:
-            log.error(f"Error handling timesheet started notification: {e}")
-
-    def on_timesheet_stopped_notification(self) -> None:
-        """Handle notification that a timesheet has been stopped"""
-        try:
-            log.info("Received notification that a timesheet was stopped - updating display")
-            # Immediately update display
-            self.update_display()
-        except Exception as e:
-            log.error(f"Error handling timesheet stopped notification: {e}")
+            log.error("Error handling connection profile change: {}", e)
 
     def __del__(self):
         """Cleanup when action is destroyed"""
@@ -325,10 +302,28 @@ class DisplayActiveTracking(ActionBase):
                     self.plugin_base.unregister_action_instance(self)
                     log.info("Unregistered from plugin notifications")
                 except Exception as e:
-                    log.error(f"Error unregistering from notifications: {e}")
+                    log.error("Error unregistering from notifications: {}", e)
                     
         except Exception as e:
-            log.error(f"Error during DisplayActiveTracking cleanup: {e}")
+            log.error("Error during DisplayActiveTracking cleanup: {}", e)
+
+    def on_profile_changed(self, dropdown, *args) -> None:
+        """Handle Kimai instance selection change"""
+        try:
+            selected_index = dropdown.get_selected()
+            if selected_index == Gtk.INVALID_LIST_POSITION or selected_index >= len(self.profile_ids):
+                return
+            
+            settings = self.get_settings()
+            settings["profile_id"] = self.profile_ids[selected_index]
+            settings.pop("profile_name", None)  # Superseded by profile_id
+            self.set_settings(settings)
+            
+            # Follow the new instance's poller
+            self.start_periodic_updates()
+            self.update_display()
+        except Exception as e:
+            log.error("Error in on_profile_changed: {}", e)
 
     def get_config_rows(self) -> list:
         """Return configuration UI rows"""
@@ -345,14 +340,28 @@ class DisplayActiveTracking(ActionBase):
             
             # Global settings reminder
             global_row = Adw.ActionRow(title="Global Settings")
-            global_row.set_subtitle("Configure Kimai URL and API Token in Plugin Settings")
+            global_row.set_subtitle("Configure Kimai URL, API Token and additional instances in Plugin Settings")
+            
+            # Kimai instance (connection profile) selector
+            profiles = self.plugin_base.get_profiles()
+            self.profile_ids = [profile.id for profile in profiles]
+            self.profile_dropdown = Adw.ComboRow(title="Kimai Instance")
+            self.profile_model = Gtk.StringList()
+            for profile in profiles:
+                self.profile_model.append(profile.label)
+            self.profile_dropdown.set_model(self.profile_model)
+            current_profile = action_profile_id(self.settings_snapshot.get())
+            if current_profile in self.profile_ids:
+                self.profile_dropdown.set_selected(self.profile_ids.index(current_profile))
+            self.profile_dropdown.connect("notify::selected", self.on_profile_changed)
             
             return super_rows + [
                 info_row,
                 interval_row,
-                global_row
+                global_row,
+                self.profile_dropdown
             ]
             
         except Exception as e:
-            log.error(f"Error building configuration UI: {e}")
+            log.error("Error building configuration UI: {}", e)
             return super().get_config_rows()
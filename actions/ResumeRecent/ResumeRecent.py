@@ -0,0 +1,283 @@
+# Import StreamController modules
+from src.backend.PluginManager.ActionBase import ActionBase
+from src.backend.DeckManagement.DeckController import DeckController
+from src.backend.PageManagement.Page import Page
+from src.backend.PluginManager.PluginBase import PluginBase
+
+# Import python modules
+import os
+import requests
+import threading
+from typing import Dict, Any, Optional
+
+# Import gtk modules - used for the config rows
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw
+
+from ...command_queue import CommandQueue
+from ...kimai_records import Timesheet
+from ...settings_cache import ConnectionProfile, SettingsSnapshot, action_profile_id
+from ...ui_dispatcher import UiDispatcher, main_thread_only
+from ...plugin_log import get_logger
+
+log = get_logger("ui")
+
+class ResumeRecent(ActionBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Cached read-only view of this action's settings
+        self.settings_snapshot = SettingsSnapshot(self.get_settings)
+
+        # The recent entry this button currently resumes
+        self.candidate = None
+
+        # Widget updates from request threads are coalesced onto the main loop
+        self.ui = UiDispatcher(self)
+
+        # One restart at a time; pressing again while it is in flight does not restart twice
+        self.commands = CommandQueue(self, self._run_resume)
+
+    def set_settings(self, settings) -> None:
+        """Save action settings and refresh the cached snapshot"""
+        super().set_settings(settings)
+        self.settings_snapshot.invalidate()
+
+    def kimai_instance(self):
+        """The Kimai instance (connection, caches, poller) selected for this button"""
+        return self.plugin_base.get_kimai_instance(action_profile_id(self.settings_snapshot.get()))
+
+    def on_ready(self) -> None:
+        # Re-arm feedback timers suspended while the page was hidden
+        self.plugin_base.source_scheduler.resume_owner(self)
+
+        # Set the default icon for resuming
+        self.set_media(media_path=self.plugin_base.get_asset_path("start.png"), size=0.75)
+
+        # Show whatever is already cached, then refresh in the background
+        self._show_candidate(self._pick_candidate(self.kimai_instance().recent_timesheets.cached()))
+        self.load_candidates()
+
+    def on_key_down(self) -> None:
+        # Any key press ends idle mode (resumes polling with one refresh)
+        self.plugin_base.idle_monitor.touch()
+
+        # Resume the selected recent entry when pressed
+        try:
+            log.info("ResumeRecent button pressed")
+            self.resume_recent()
+        except Exception as e:
+            log.error("Error in on_key_down: {}", e)
+            self.show_error()
+
+    def on_key_up(self) -> None:
+        pass
+
+    def _get_position(self) -> int:
+        """Which recent entry this button resumes (1 = most recent)"""
+        try:
+            return max(1, int(self.get_settings().get("recent_position", 1)))
+        except (TypeError, ValueError):
+            return 1
+
+    def _pick_candidate(self, timesheets: list) -> Optional[Timesheet]:
+        """Pick the configured entry, skipping entries that are still running"""
+        finished = [t for t in timesheets if not t.is_running]
+        position = self._get_position()
+        if position <= len(finished):
+            return finished[position - 1]
+        return None
+
+    def on_connection_profile_changed(self, profile: ConnectionProfile) -> None:
+        """The instance was replaced; its recent list has to be fetched again"""
+        self.load_candidates()
+
+    def on_timesheet_started_notification(self) -> None:
+        """A start stopped the running entry and made the new one recent; reload the list"""
+        self.load_candidates()
+
+    def on_timesheet_stopped_notification(self) -> None:
+        """The stopped entry can be resumed now; reload the list"""
+        self.load_candidates()
+
+    def load_candidates(self) -> None:
+        """Refresh the cached recent list in a background thread"""
+        profile = self.kimai_instance().profile
+
+        if not profile.is_configured:
+            return
+
+        threading.Thread(target=self._load_candidates_background,
+                        args=(profile,), daemon=True).start()
+
+    def _load_candidates_background(self, profile: ConnectionProfile) -> None:
+        """Fetch the recent list (shared cache) and update the labels"""
+        try:
+            timesheets = self.plugin_base.get_kimai_instance(profile.id).recent_timesheets.get(profile)
+            self._show_candidate(self._pick_candidate(timesheets))
+        except Exception as e:
+            log.error("Error loading recent timesheets: {}", e)
+
+    @main_thread_only("candidate")
+    def _show_candidate(self, candidate: Optional[Timesheet]) -> None:
+        """Show the project and activity of the entry that will be resumed"""
+        try:
+            self.candidate = candidate
+
+            if candidate is None:
+                self.set_top_label("")
+                self.set_center_label("No Recent", font_size=10)
+                return
+
+            # The recent list's nested objects were remembered in the catalog cache
+            names = self.kimai_instance().catalog_cache.describe(candidate)
+            project_name = names[1].name if names else ''
+            activity_name = names[2].name if names else ''
+
+            self.set_top_label(project_name[:10], font_size=9)
+            self.set_center_label(activity_name[:12], font_size=10)
+        except Exception as e:
+            log.error("Error showing recent candidate: {}", e)
+
+    def resume_recent(self) -> None:
+        """Restart the selected recent entry in Kimai"""
+        profile = self.kimai_instance().profile
+
+        if not profile.is_configured or self.candidate is None:
+            log.error("Missing configuration or no recent entry to resume")
+            self.show_error()
+            return
+
+        # Runs on the queue's thread to avoid blocking UI
+        self.commands.submit((profile, self.candidate.id))
+
+    def _run_resume(self, command: tuple) -> None:
+        """Run a queued resume (on the queue's thread)"""
+        profile, timesheet_id = command
+        self._resume_request(profile, timesheet_id)
+
+    def _resume_request(self, profile: ConnectionProfile, timesheet_id: int) -> None:
+        """Make the single restart request (Kimai stops the running entry itself)"""
+        instance = self.plugin_base.get_kimai_instance(profile.id)
+        try:
+            response = instance.kimai_api.restart_timesheet(profile, timesheet_id)
+
+            if response.status_code in [200, 201]:
+                response_data = response.json()
+                log.info("Successfully resumed timesheet ID {} as {}", timesheet_id, response_data.get('id'))
+                instance.recent_timesheets.remember(Timesheet.from_api(response_data))
+
+                # Update all other buttons
+                self.plugin_base.notify_timesheet_stopped(profile.id)
+                self.plugin_base.notify_timesheet_started(profile.id)
+
+                self.show_success()
+            else:
+                log.error("Failed to resume timesheet. Status: {}", response.status_code)
+                log.error("Response body: {}", response.text)
+                log.error("Timesheet ID: {}", timesheet_id)
+                if response.status_code == 404:
+                    instance.recent_timesheets.forget(timesheet_id)
+                    instance.recent_timesheets.invalidate()
+                    self.load_candidates()
+                self.show_error()
+
+        except requests.exceptions.Timeout:
+            log.error("Timeout while resuming timesheet. URL: {}", profile.base_url)
+            self.show_error()
+        except requests.exceptions.ConnectionError:
+            log.error("Connection error while resuming timesheet. URL: {}", profile.base_url)
+            self.show_error()
+        except requests.exceptions.RequestException as e:
+            log.error("HTTP request error while resuming timesheet: {}", e)
+            log.error("URL: {}", profile.base_url)
+            self.show_error()
+        except Exception as e:
+            log.error("Unexpected error resuming timesheet: {}", e)
+            log.error("URL: {}", profile.base_url)
+            self.show_error()
+
+    @main_thread_only("feedback")
+    def show_success(self) -> None:
+        """Show success indicator"""
+        self.set_background_color([0, 255, 0, 100])  # Green background
+
+        # Clear the success background after 2 seconds
+        self.plugin_base.source_scheduler.timeout_add_seconds(self, 2, self._clear_background)
+
+    @main_thread_only("feedback")
+    def show_error(self) -> None:
+        """Show error indicator"""
+        self.set_background_color([255, 0, 0, 100])  # Red background
+
+        # Clear the error background after 3 seconds
+        self.plugin_base.source_scheduler.timeout_add_seconds(self, 3, self._clear_background)
+
+    def _clear_background(self) -> bool:
+        """Clear the feedback background"""
+        try:
+            self.set_background_color([0, 0, 0, 0])  # Transparent background
+        except Exception as e:
+            log.error("Error clearing background: {}", e)
+        return False  # Don't repeat the timer
+
+    def get_config_rows(self) -> list:
+        """Return configuration UI rows"""
+        super_rows = super().get_config_rows()
+
+        # Which recent entry to resume
+        self.position_row = Adw.SpinRow.new_with_range(1, 10, 1)
+        self.position_row.set_title("Recent Entry")
+        self.position_row.set_subtitle("1 = most recently tracked task")
+        self.position_row.set_value(self._get_position())
+        self.position_row.connect("notify::value", self.on_position_changed)
+
+        # Info row
+        info_row = Adw.ActionRow(title="Global Settings")
+        info_row.set_subtitle("Configure Kimai URL, API Token and additional instances in Plugin Settings")
+
+        # Kimai instance (connection profile) selector
+        profiles = self.plugin_base.get_profiles()
+        self.profile_ids = [profile.id for profile in profiles]
+        self.profile_dropdown = Adw.ComboRow(title="Kimai Instance")
+        self.profile_model = Gtk.StringList()
+        for profile in profiles:
+            self.profile_model.append(profile.label)
+        self.profile_dropdown.set_model(self.profile_model)
+        current_profile = action_profile_id(self.settings_snapshot.get())
+        if current_profile in self.profile_ids:
+            self.profile_dropdown.set_selected(self.profile_ids.index(current_profile))
+        self.profile_dropdown.connect("notify::selected", self.on_profile_changed)
+
+        return super_rows + [
+            info_row,
+            self.profile_dropdown,
+            self.position_row
+        ]
+
+    def on_profile_changed(self, dropdown, *args) -> None:
+        """Handle Kimai instance selection change - recent entries belong to the new instance"""
+        try:
+            selected_index = dropdown.get_selected()
+            if selected_index == Gtk.INVALID_LIST_POSITION or selected_index >= len(self.profile_ids):
+                return
+
+            settings = self.get_settings()
+            settings["profile_id"] = self.profile_ids[selected_index]
+            settings.pop("profile_name", None)  # Superseded by profile_id
+            self.set_settings(settings)
+
+            self._show_candidate(self._pick_candidate(self.kimai_instance().recent_timesheets.cached()))
+            self.load_candidates()
+        except Exception as e:
+            log.error("Error in on_profile_changed: {}", e)
+
+    def on_position_changed(self, spin_row, *args) -> None:
+        """Handle recent entry position changes"""
+        settings = self.get_settings()
+        settings["recent_position"] = int(spin_row.get_value())
+        self.set_settings(settings)
+
+        self._show_candidate(self._pick_candidate(self.kimai_instance().recent_timesheets.cached()))
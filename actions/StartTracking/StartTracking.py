@@ -3,13 +3,13 @@ from src.backend.PluginManager.ActionBase import ActionBase
 from src.backend.DeckManagement.DeckController import DeckController
 from src.backend.PageManagement.Page import Page
 from src.backend.PluginManager.PluginBase import PluginBase
+from src.backend.DeckManagement.InputIdentifier import Input
 
 # Import python modules
 import os
 import requests
 import threading
-from typing import Dict, Any
-from loguru import logger as log
+from typing import Dict, Any, Optional
 
 # Import gtk modules - used for the config rows
 import gi
@@ -17,6 +17,31 @@ gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw
 
+from ...candidate_ring import CandidateRing, build_candidates
+from ...command_queue import CommandQueue
+from ...catalog_query import CatalogQuery
+from ...kimai_records import Timesheet
+from ...model_fill import ModelFill
+from ...settings_cache import ConnectionProfile, SettingsSnapshot, action_profile_id
+from ...settings_writer import DebouncedSettingsWriter
+from ...source_scheduler import WHEN_IDLE_STRETCH
+from ...state_cache import action_state_key
+from ...ui_dispatcher import UiDispatcher, main_thread_only
+from ...plugin_log import get_logger
+
+log = get_logger("ui")
+
+# How long the dial has to rest before the scrolled-to task becomes the button's task
+DIAL_SETTLE_MS = 1200
+
+# Project search in the config panel: delay after the last keystroke, and most matches shown
+PROJECT_SEARCH_DELAY_MS = 300
+PROJECT_SEARCH_LIMIT = 50
+
+# Commands of the button's queue
+START = "start"
+STOP = "stop"
+
 class StartTracking(ActionBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -26,35 +51,129 @@ class StartTracking(ActionBase):
         self.projects_map = {}
         self.activities_map = {}
         
+        # Dropdown model fills still running on the main loop, by dropdown
+        self.dropdown_fills = {}
+        
+        # Project type-ahead: pending keystroke timer, and which search may still fill the dropdown
+        self.project_search_id = None
+        self.project_search_generation = 0
+        
         # State management for running status
         self.is_running = False
         self.current_timesheet_id = None
         self.elapsed_timer_id = None
         self.start_time = None
         
+        # Why the configured task can't be started according to the catalog snapshot (None: fine or unknown)
+        self.task_problem = None
+        
+        # Cached read-only view of this action's settings for hot paths
+        self.settings_snapshot = SettingsSnapshot(self.get_settings)
+        
+        # Description typing is coalesced into a single settings write
+        self.description_writer = DebouncedSettingsWriter(self.get_settings, self.set_settings)
+        
+        # Shared active-timesheet poller of this button's Kimai instance
+        self.subscribed_poller = None
+        
+        # Dial scrolling: prefetched task candidates and the one shown but not yet committed
+        self.candidate_ring = CandidateRing()
+        self.dial_preview = None
+        self.dial_settle_id = None
+        
+        # Renders from the poller and request threads are coalesced onto the main loop
+        self.ui = UiDispatcher(self)
+        
+        # Start/stop requests run one at a time; presses during a request collapse
+        self.commands = CommandQueue(self, self._run_command)
+        
+    def set_settings(self, settings) -> None:
+        """Save action settings and refresh the cached snapshot"""
+        super().set_settings(settings)
+        self.settings_snapshot.invalidate()
+        self.validate_task()
+        
+    def kimai_instance(self):
+        """The Kimai instance (connection, caches, poller) selected for this button"""
+        return self.plugin_base.get_kimai_instance(action_profile_id(self.settings_snapshot.get()))
+        
+    def _subscribe_to_poller(self) -> None:
+        """Receive the instance's shared active-timesheet polls instead of fetching per button"""
+        poller = self.kimai_instance().active_poller
+        if self.subscribed_poller is not None and self.subscribed_poller is not poller:
+            self.subscribed_poller.unsubscribe(self._on_active_timesheet_polled)
+        poller.subscribe(self._on_active_timesheet_polled)
+        self.subscribed_poller = poller
+        
+    def _on_active_timesheet_polled(self, active_timesheet: Optional[Timesheet], ok: bool) -> None:
+        """Handle a shared poll result (called from the poller thread)"""
+        # While our own start/stop is in flight the poll may predate it; the request's result wins
+        if ok and not self.commands.busy:
+            self._apply_active_timesheet(active_timesheet)
+        
+    def _state_key(self) -> str:
+        return action_state_key(self)
+        
+    def _remember_state(self) -> None:
+        """Store the current state so it can be shown instantly after a page switch"""
+        self.plugin_base.action_state_cache.put(self._state_key(), {
+            "is_running": self.is_running,
+            "timesheet_id": self.current_timesheet_id,
+            "start_time": self.start_time,
+        })
+        
     def on_ready(self) -> None:
-        # Reset state variables to handle page caching
-        # This ensures proper state when navigating back to cached pages
-        self.is_running = False
-        self.current_timesheet_id = None
-        self.start_time = None
-        # Note: Don't reset elapsed_timer_id as it's managed by timer lifecycle
+        # Our page is shown again: re-arm timers suspended while it was hidden
+        self.plugin_base.source_scheduler.resume_owner(self)
         
-        # Set the default icon for start tracking
-        self.set_media(media_path=self.plugin_base.get_asset_path("start.png"), size=0.75)
+        # Restore the last known state instantly (it survives page switches and caching)
+        # instead of painting a stopped button and waiting for the network
+        cached = self.plugin_base.action_state_cache.get(self._state_key())
+        if cached is not None and cached.state.get("is_running"):
+            self._set_running_state(cached.state.get("timesheet_id"), cached.state.get("start_time"))
+        else:
+            self.is_running = False
+            self.current_timesheet_id = None
+            self.start_time = None
+            # Note: Don't reset elapsed_timer_id as it's managed by timer lifecycle
+            
+            # Set the default icon for start tracking
+            self.set_media(media_path=self.plugin_base.get_asset_path("start.png"), size=0.75)
         
         # Register this instance for notifications
         self.plugin_base.register_action_instance(self)
+        self._subscribe_to_poller()
+        
+        # Mark a task deleted in Kimai right away (buttons ready after the startup snapshot)
+        self.validate_task()
         
-        # Check if there's an active timesheet that matches this button's configuration
-        self.check_active_timesheet_status()
+        # Dials show their task and prefetch what they can scroll to
+        if self._is_dial():
+            self._show_configured_task()
+            self._refresh_candidates()
+        
+        # Only revalidate when the cached state is too old
+        if not self.plugin_base.action_state_cache.is_stale(cached):
+            log.debug("Using cached state ({:.0f}s old) without revalidating", cached.age)
+            return
+        
+        # Check if there's an active timesheet that matches this button's configuration,
+        # using the plugin's startup prefetch when it is available
+        if not self.kimai_instance().startup_prefetch.consume(self._apply_active_timesheet,
+                                                         self.check_active_timesheet_status):
+            self.check_active_timesheet_status()
         
     def on_key_down(self) -> None:
+        # Any key press ends idle mode (resumes polling with one refresh)
+        self.plugin_base.idle_monitor.touch()
+        
         # Toggle functionality: start if not running, stop if running
         try:
             log.info("StartTracking button pressed (toggle mode)")
             
-            if self.is_running:
+            # Toggle against the latest queued intent: is_running lags behind requests in flight
+            queued = self.commands.latest()
+            if (self.is_running if queued is None else queued == START):
                 log.info("Button is currently running - stopping time tracking")
                 self.stop_time_tracking()
             else:
@@ -62,40 +181,153 @@ class StartTracking(ActionBase):
                 self.start_time_tracking()
                 
         except Exception as e:
-            log.error(f"Error in on_key_down: {e}")
+            log.error("Error in on_key_down: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
             self.show_error()
     
     def on_key_up(self) -> None:
         pass
     
+    def event_callback(self, event, data=None) -> None:
+        """Dial rotation scrolls through tasks, a dial press switches to the shown task"""
+        if event in (Input.Dial.Events.TURN_CW, Input.Dial.Events.TURN_CCW):
+            self.plugin_base.idle_monitor.touch()
+            self.on_dial_turn(1 if event == Input.Dial.Events.TURN_CW else -1)
+        elif event == Input.Dial.Events.DOWN:
+            self.on_dial_down()
+        else:
+            super().event_callback(event, data)
+    
+    def on_dial_turn(self, steps: int) -> None:
+        """Show the next/previous task candidate; it is committed once the dial rests"""
+        try:
+            if not len(self.candidate_ring):
+                self._rebuild_candidate_ring()
+            
+            # Purely local: rotate the prefetched ring and re-render
+            candidate = self.candidate_ring.rotate(steps)
+            if candidate is None:
+                return
+            self.dial_preview = candidate
+            self._show_task(candidate.project_name, candidate.activity_name)
+            
+            scheduler = self.plugin_base.source_scheduler
+            scheduler.remove(self.dial_settle_id)
+            self.dial_settle_id = scheduler.timeout_add(self, DIAL_SETTLE_MS, self._on_dial_settled)
+        except Exception as e:
+            log.error("Error in on_dial_turn: {}", e)
+    
+    def on_dial_down(self) -> None:
+        """Commit the shown task right away and toggle tracking like a key press"""
+        try:
+            if self.dial_preview is not None:
+                self.plugin_base.source_scheduler.remove(self.dial_settle_id)
+                self.dial_settle_id = None
+                self._commit_dial_preview()
+            self.on_key_down()
+        except Exception as e:
+            log.error("Error in on_dial_down: {}", e)
+    
+    def _on_dial_settled(self) -> bool:
+        self.dial_settle_id = None
+        self._commit_dial_preview()
+        return False  # Don't repeat the timer
+    
+    def _commit_dial_preview(self) -> None:
+        """Make the scrolled-to task this button's project/activity/description"""
+        candidate, self.dial_preview = self.dial_preview, None
+        if candidate is None or candidate.key == self._configured_task():
+            return
+        
+        log.info("Dial selected project {}, activity {}", candidate.project_id, candidate.activity_id)
+        self.description_writer.flush()
+        settings = self.get_settings()
+        settings["customer_filter"] = ""
+        settings["project_id"] = candidate.project_id
+        settings["activity_id"] = candidate.activity_id
+        settings["description"] = candidate.description
+        self.set_settings(settings)
+        
+        # Whatever is running belongs to the previous task; the next press switches over
+        if self.is_running:
+            self._set_stopped_state()
+        poller = self.kimai_instance().active_poller
+        if poller.last_ok:
+            self._apply_active_timesheet(poller.last_timesheet)
+    
+    def _is_dial(self) -> bool:
+        return isinstance(getattr(self, "input_ident", None), Input.Dial)
+    
+    def _configured_task(self) -> tuple:
+        """This button's (project id, activity id, description)"""
+        settings = self.settings_snapshot.get()
+        return (str(settings.get("project_id", "")), str(settings.get("activity_id", "")),
+                settings.get("description", "") or "")
+    
+    @main_thread_only("task")
+    def _show_task(self, project_name: str, activity_name: str) -> None:
+        """Label the button with a task (dials only; the top label is the elapsed clock)"""
+        self.set_center_label(project_name[:12], font_size=10)
+        self.set_bottom_label(activity_name[:12], font_size=9)
+    
+    def _show_configured_task(self) -> None:
+        project_id, activity_id, _ = self._configured_task()
+        if not project_id or not activity_id:
+            return
+        for candidate in build_candidates([(project_id, activity_id, "")], [], [], self.kimai_instance().catalog_cache):
+            self._show_task(candidate.project_name, candidate.activity_name)
+    
+    def _refresh_candidates(self) -> None:
+        """Prefetch the recent list in the background, then rebuild the ring"""
+        def refresh():
+            try:
+                self.kimai_instance().recent_timesheets.get(self.kimai_instance().profile)
+            except Exception as e:
+                log.error("Error prefetching dial candidates: {}", e)
+            self.ui.post("candidates", self._rebuild_candidate_ring)
+        
+        threading.Thread(target=refresh, daemon=True).start()
+    
+    def _rebuild_candidate_ring(self) -> None:
+        """Favorites (tasks of this instance's Start buttons), recent entries, then local history"""
+        try:
+            instance = self.kimai_instance()
+            favorites = [
+                action._configured_task() for action in self.plugin_base.action_instances
+                if isinstance(action, StartTracking) and action.kimai_instance() is instance
+            ]
+            history = instance.timesheet_store.recent_combinations(10) if instance.timesheet_store else []
+            candidates = build_candidates(favorites, instance.recent_timesheets.cached(), history, instance.catalog_cache)
+            self.candidate_ring.replace(candidates, keep=self._configured_task())
+            log.debug("Dial candidate ring has {} task(s)", len(self.candidate_ring))
+        except Exception as e:
+            log.error("Error building dial candidates: {}", e)
+    
     def start_time_tracking(self) -> None:
         """Start time tracking in Kimai (with auto-stop of other instances)"""
         try:
             log.info("Start time tracking button pressed")
             
-            settings = self.get_settings()
-            plugin_global_settings = self.plugin_base.get_settings()
+            # Make sure a description that is still being typed is used
+            self.description_writer.flush()
             
-            # Get global configuration (Kimai URL and API token)
-            kimai_url = plugin_global_settings.get("global_kimai_url", "")
-            api_token = plugin_global_settings.get("global_api_token", "")
+            settings = self.settings_snapshot.get()
+            profile = self.kimai_instance().profile
             
             # Get action-specific configuration
             project_id = settings.get("project_id", "")
             activity_id = settings.get("activity_id", "")
             
-            log.info(f"Configuration check - Kimai URL: {'SET' if kimai_url else 'MISSING'}, "
-                    f"API Token: {'SET' if api_token else 'MISSING'}, "
-                    f"Project ID: {project_id if project_id else 'MISSING'}, "
-                    f"Activity ID: {activity_id if activity_id else 'MISSING'}")
+            log.info("Configuration check - Kimai URL: {}, API Token: {}, Project ID: {}, Activity ID: {}",
+                     'SET' if profile.base_url else 'MISSING', 'SET' if profile.api_token else 'MISSING',
+                     project_id if project_id else 'MISSING', activity_id if activity_id else 'MISSING')
             
             # Check for missing configuration with detailed error logging
             missing_configs = []
-            if not kimai_url:
+            if not profile.base_url:
                 missing_configs.append("Kimai URL")
-            if not api_token:
+            if not profile.api_token:
                 missing_configs.append("API Token")
             if not project_id:
                 missing_configs.append("Project ID")
@@ -103,42 +335,40 @@ class StartTracking(ActionBase):
                 missing_configs.append("Activity ID")
             
             if missing_configs:
-                log.error(f"Missing required configuration: {', '.join(missing_configs)}")
-                log.error(f"Current settings: {settings}")
-                log.error(f"Global settings keys: {list(plugin_global_settings.keys())}")
+                log.error("Missing required configuration: {}", ', '.join(missing_configs))
+                log.error("Current settings: {}", settings)
+                self.show_error()
+                return
+            
+            # Known to fail without asking Kimai
+            if self.task_problem is not None:
+                log.error("Not starting time tracking: {}. Select another task in the button's settings", self.task_problem)
                 self.show_error()
                 return
             
-            log.info(f"Starting time tracking for project {project_id}, activity {activity_id}")
+            log.info("Starting time tracking for project {}, activity {}", project_id, activity_id)
             
-            # First, stop any existing active timesheet
-            # Run in separate thread to avoid blocking UI
-            threading.Thread(target=self._start_tracking_with_auto_stop, 
-                            args=(kimai_url, api_token, project_id, activity_id),
-                            daemon=True).start()
+            # Stops any existing active timesheet first, on the queue's thread after in-flight requests
+            self.commands.submit(START)
                             
         except Exception as e:
-            log.error(f"Unexpected error in start_time_tracking: {e}")
-            log.error(f"Exception type: {type(e)}")
+            log.error("Unexpected error in start_time_tracking: {}", e)
+            log.error("Exception type: {}", type(e).__name__)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
             self.show_error()
     
-    def _start_tracking_request(self, kimai_url: str, api_token: str, project_id: str, activity_id: str) -> None:
+    def _start_tracking_request(self, profile: ConnectionProfile, project_id: str, activity_id: str) -> None:
         """Make the API request to start tracking"""
         try:
-            log.info(f"Starting API request to create timesheet - Project: {project_id}, Activity: {activity_id}")
+            log.info("Starting API request to create timesheet - Project: {}, Activity: {}", project_id, activity_id)
             
             from datetime import datetime
             
-            url = f"{kimai_url.rstrip('/')}/api/timesheets"
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
+            url = profile.url("/api/timesheets")
             
             # Get description from settings
-            settings = self.get_settings()
+            settings = self.settings_snapshot.get()
             description = settings.get("description", "")
             
             # Validate and convert IDs to integers
@@ -146,7 +376,7 @@ class StartTracking(ActionBase):
                 project_id_int = int(project_id)
                 activity_id_int = int(activity_id)
             except ValueError as e:
-                log.error(f"Invalid ID format - Project ID: '{project_id}', Activity ID: '{activity_id}', Error: {e}")
+                log.error("Invalid ID format - Project ID: '{}', Activity ID: '{}', Error: {}", project_id, activity_id, e)
                 self.show_error()
                 return
             
@@ -155,7 +385,7 @@ class StartTracking(ActionBase):
             # NOT ISO 8601 with timezone information
             from datetime import datetime
             current_time = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
-            log.info(f"Using HTML5 local datetime format: {current_time}")
+            log.debug("Using HTML5 local datetime format: {}", current_time)
             
             data = {
                 "begin": current_time,
@@ -165,239 +395,272 @@ class StartTracking(ActionBase):
                 "description": description
             }
             
-            log.info(f"Making POST request to {url}")
-            log.info(f"Request headers: {dict(headers)}")  # Don't log the actual token
-            log.info(f"Request data: {data}")
+            log.info("Making POST request to {}", url)
+            log.debug("Request data: {}", data)
             
-            response = requests.post(url, json=data, headers=headers, timeout=10)
+            response = self.kimai_instance().kimai_api.session.post(url, json=data, headers=profile.headers, timeout=10)
             
-            log.info(f"Response status code: {response.status_code}")
-            log.info(f"Response headers: {dict(response.headers)}")
+            log.debug("Response status code: {}, headers: {}", response.status_code, lambda: dict(response.headers))
             
             if response.status_code in [200, 201]:
                 response_data = response.json()
-                log.info(f"Successfully started time tracking. Response: {response_data}")
                 timesheet_id = response_data.get('id')
-                log.info(f"Timesheet ID: {timesheet_id}")
+                log.info("Successfully started time tracking, timesheet ID {}", timesheet_id)
+                log.debug("Start response: {}", response_data)
+                
+                # Make the new entry a restart candidate for later switches
+                self.kimai_instance().recent_timesheets.remember(Timesheet.from_api(response_data))
                 
                 # Update UI in main thread to show running state
-                from gi.repository import GLib
-                GLib.idle_add(self._set_running_state, timesheet_id, data["begin"])
+                self._set_running_state(timesheet_id, data["begin"])
                 
                 # Notify other instances that timesheet has been started
                 try:
-                    self.plugin_base.notify_timesheet_started()
+                    self.plugin_base.notify_timesheet_started(self.kimai_instance().profile.id)
                 except Exception as e:
-                    log.error(f"Error notifying timesheet started: {e}")
+                    log.error("Error notifying timesheet started: {}", e)
             else:
-                log.error(f"Failed to start time tracking. Status: {response.status_code}")
-                log.error(f"Response body: {response.text}")
-                log.error(f"Request URL: {url}")
-                log.error(f"Request data: {data}")
-                log.error(f"Request headers (without token): {{'Content-Type': headers.get('Content-Type'), 'Authorization': 'Bearer [REDACTED]'}}")
+                log.error("Failed to start time tracking. Status: {}", response.status_code)
+                log.error("Response body: {}", response.text)
+                log.error("Request URL: {}", url)
+                log.error("Request data: {}", data)
                 
                 # Try to parse error response
                 try:
                     error_data = response.json()
-                    log.error(f"Parsed error response: {error_data}")
+                    log.error("Parsed error response: {}", error_data)
                 except:
                     log.error("Could not parse error response as JSON")
                 
                 self.show_error()
                 
-        except requests.exceptions.Timeout:
-            log.error(f"Timeout while starting time tracking. URL: {url}")
-            log.error(f"Timeout occurred after 10 seconds")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+        except requests.exceptions.Timeout as e:
+            log.error("Timeout while starting time tracking. URL: {}", url)
+            log.error("Timeout details: {}", e)
+            self.show_error()
         except requests.exceptions.ConnectionError as e:
-            log.error(f"Connection error while starting time tracking. URL: {url}")
-            log.error(f"Connection error details: {e}")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+            log.error("Connection error while starting time tracking. URL: {}", url)
+            log.error("Connection error details: {}", e)
+            self.show_error()
         except requests.exceptions.RequestException as e:
-            log.error(f"HTTP request error while starting time tracking: {e}")
-            log.error(f"URL: {url}")
-            log.error(f"Request exception type: {type(e)}")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+            log.error("HTTP request error while starting time tracking: {}", e)
+            log.error("URL: {}", url)
+            log.error("Request exception type: {}", type(e).__name__)
+            self.show_error()
         except ValueError as e:
-            log.error(f"Invalid project_id or activity_id: {e}")
-            log.error(f"project_id: '{project_id}' (type: {type(project_id)}), activity_id: '{activity_id}' (type: {type(activity_id)})")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+            log.error("Invalid project_id or activity_id: {}", e)
+            log.error("project_id: '{}' (type: {}), activity_id: '{}' (type: {})", project_id, type(project_id).__name__, activity_id, type(activity_id).__name__)
+            self.show_error()
         except Exception as e:
-            log.error(f"Unexpected error starting time tracking: {e}")
-            log.error(f"Exception type: {type(e)}")
-            log.error(f"URL: {url}")
+            log.error("Unexpected error starting time tracking: {}", e)
+            log.error("Exception type: {}", type(e).__name__)
+            log.error("URL: {}", url)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+            log.error("Traceback: {}", traceback.format_exc())
+            self.show_error()
     
     def stop_time_tracking(self) -> None:
-        """Stop the currently running time tracking"""
-        try:
-            if not self.is_running or not self.current_timesheet_id:
-                log.warning("No active timesheet to stop")
-                return
-                
-            plugin_global_settings = self.plugin_base.get_settings()
-            kimai_url = plugin_global_settings.get("global_kimai_url", "")
-            api_token = plugin_global_settings.get("global_api_token", "")
-            
-            if not kimai_url or not api_token:
-                log.error("Missing Kimai URL or API token for stopping timesheet")
-                self.show_error()
+        """Stop the currently running time tracking (after any in-flight request of this button)"""
+        self.commands.submit(STOP)
+    
+    def _run_command(self, command: str) -> None:
+        """Run a queued start or stop (on the queue's thread), skipping it if the button is already there"""
+        profile = self.kimai_instance().profile
+        
+        if command == START:
+            if self.is_running:
+                log.info("Already running this button's task, skipping queued start")
                 return
-                
-            log.info(f"Stopping timesheet ID: {self.current_timesheet_id}")
-            
-            # Run in separate thread to avoid blocking UI
-            threading.Thread(target=self._stop_tracking_request, 
-                            args=(kimai_url, api_token, self.current_timesheet_id),
-                            daemon=True).start()
-                            
-        except Exception as e:
-            log.error(f"Unexpected error in stop_time_tracking: {e}")
-            import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            settings = self.settings_snapshot.get()
+            self._start_tracking_with_auto_stop(profile, settings.get("project_id", ""), settings.get("activity_id", ""))
+            return
+        
+        if not self.is_running or not self.current_timesheet_id:
+            log.warning("No active timesheet to stop")
+            return
+        
+        if not profile.is_configured:
+            log.error("Missing Kimai URL or API token for stopping timesheet")
             self.show_error()
+            return
+        
+        log.info("Stopping timesheet ID: {}", self.current_timesheet_id)
+        self._stop_tracking_request(profile, self.current_timesheet_id)
 
-    def _start_tracking_with_auto_stop(self, kimai_url: str, api_token: str, project_id: str, activity_id: str) -> None:
+    def _start_tracking_with_auto_stop(self, profile: ConnectionProfile, project_id: str, activity_id: str) -> None:
         """Start tracking with automatic stopping of any existing active timesheet"""
         try:
             log.info("Starting time tracking with auto-stop of existing sessions")
             
-            # First, check if there's an active timesheet and stop it
-            active_timesheet = self._get_active_timesheet(kimai_url, api_token)
-            if active_timesheet:
-                active_id = active_timesheet.get('id')
-                log.info(f"Found active timesheet ID {active_id}, stopping it first")
+            # Fast path: restarting a recent entry stops the running one server-side
+            if self._restart_recent_timesheet(profile, project_id, activity_id):
+                return
+            
+            # First, check if there's an active timesheet and stop it (only its id is needed)
+            active_id = self.kimai_instance().kimai_api.get_active_timesheet_id(profile)
+            if active_id is not None:
+                log.info("Found active timesheet ID {}, stopping it first", active_id)
                 
                 # Stop the existing timesheet
-                stop_url = f"{kimai_url.rstrip('/')}/api/timesheets/{active_id}/stop"
-                headers = {
-                    "Authorization": f"Bearer {api_token}",
-                    "Content-Type": "application/json"
-                }
+                stop_url = profile.url(f"/api/timesheets/{active_id}/stop")
                 
-                stop_response = requests.patch(stop_url, headers=headers, timeout=10)
+                stop_response = self.kimai_instance().kimai_api.session.patch(stop_url, headers=profile.headers, timeout=10)
                 if stop_response.status_code in [200, 201]:
-                    log.info(f"Successfully stopped existing timesheet ID {active_id}")
+                    log.info("Successfully stopped existing timesheet ID {}", active_id)
                     # Notify other instances that the timesheet has stopped
                     self._notify_other_instances_stopped()
                 else:
-                    log.warning(f"Failed to stop existing timesheet ID {active_id}. Status: {stop_response.status_code}")
-                    log.warning(f"Response: {stop_response.text}")
+                    log.warning("Failed to stop existing timesheet ID {}. Status: {}", active_id, stop_response.status_code)
+                    log.warning("Response: {}", stop_response.text)
             
             # Now start the new timesheet
-            self._start_tracking_request(kimai_url, api_token, project_id, activity_id)
+            self._start_tracking_request(profile, project_id, activity_id)
             
         except Exception as e:
-            log.error(f"Error in _start_tracking_with_auto_stop: {e}")
+            log.error("Error in _start_tracking_with_auto_stop: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
             self.show_error()
 
-    def _get_active_timesheet(self, kimai_url: str, api_token: str) -> dict:
-        """Get the currently active timesheet with full expansion"""
-        try:
-            url = f"{kimai_url.rstrip('/')}/api/timesheets"
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Get active timesheets with full expansion (nested objects)
-            params = {"size": 1, "orderBy": "begin", "order": "DESC", "full": "true"}
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                timesheets = response.json()
-                if timesheets and len(timesheets) > 0:
-                    # Check if the first timesheet is active (no end time)
-                    timesheet = timesheets[0]
-                    if timesheet.get('end') is None:
-                        return timesheet
+    def _restart_recent_timesheet(self, profile: ConnectionProfile, project_id: str, activity_id: str) -> bool:
+        """Switch to this button's task with a single restart call if a recent entry matches.
+
+        Candidates come from the plugin's cached recent list only, so a miss costs
+        no request. Returns False when the caller should use the stop + create path.
+        """
+        description = self.settings_snapshot.get().get("description", "")
+        candidate = self.kimai_instance().recent_timesheets.find(project_id, activity_id, description)
+        if candidate is None:
+            return False
+        
+        candidate_id = candidate.id
+        log.info("Restarting recent timesheet ID {} for project {}, activity {}", candidate_id, project_id, activity_id)
+        
+        response = self.kimai_instance().kimai_api.restart_timesheet(profile, candidate_id)
+        
+        if response.status_code in [200, 201]:
+            response_data = response.json()
+            log.info("Successfully restarted timesheet. New timesheet ID: {}", response_data.get('id'))
+            self.kimai_instance().recent_timesheets.remember(Timesheet.from_api(response_data))
             
-            return None
+            # Update UI in main thread to show running state
+            self._set_running_state(response_data.get('id'), response_data.get('begin'))
             
-        except Exception as e:
-            log.error(f"Error getting active timesheet: {e}")
-            return None
+            # The previously running entry (if any) was stopped by Kimai
+            self._notify_other_instances_stopped()
+            try:
+                self.plugin_base.notify_timesheet_started(self.kimai_instance().profile.id)
+            except Exception as e:
+                log.error("Error notifying timesheet started: {}", e)
+            return True
+        
+        if response.status_code == 404:
+            log.info("Recent timesheet ID {} no longer exists, dropping it from the cache", candidate_id)
+            self.kimai_instance().recent_timesheets.forget(candidate_id)
+        else:
+            log.warning("Failed to restart timesheet ID {}. Status: {}", candidate_id, response.status_code)
+            log.warning("Response: {}", response.text)
+        return False
 
     def check_active_timesheet_status(self) -> None:
         """Check if there's an active timesheet that matches this button's configuration"""
         try:
-            plugin_global_settings = self.plugin_base.get_settings()
-            kimai_url = plugin_global_settings.get("global_kimai_url", "")
-            api_token = plugin_global_settings.get("global_api_token", "")
+            instance = self.kimai_instance()
             
-            if not kimai_url or not api_token:
+            if not instance.profile.is_configured:
                 return
+            
+            # The result arrives through the shared poller subscription
+            instance.active_poller.refresh()
                 
-            # Run in background thread
-            threading.Thread(target=self._check_active_timesheet_background, 
-                            args=(kimai_url, api_token), daemon=True).start()
+            # Keep restart candidates warm in a background thread
+            threading.Thread(target=self._warm_recent_timesheets, 
+                            args=(instance.profile,), daemon=True).start()
                             
         except Exception as e:
-            log.error(f"Error checking active timesheet status: {e}")
+            log.error("Error checking active timesheet status: {}", e)
 
-    def _check_active_timesheet_background(self, kimai_url: str, api_token: str) -> None:
-        """Background thread to check active timesheet status"""
+    def _warm_recent_timesheets(self, profile: ConnectionProfile) -> None:
+        """Background thread keeping restart candidates warm (shared, refreshed at most every few minutes)"""
         try:
-            active_timesheet = self._get_active_timesheet(kimai_url, api_token)
-            if active_timesheet:
-                settings = self.get_settings()
-                my_project_id = settings.get("project_id", "")
-                my_activity_id = settings.get("activity_id", "")
+            self.kimai_instance().recent_timesheets.get(profile)
+        except Exception as e:
+            log.error("Error refreshing recent timesheets: {}", e)
+
+    def _apply_active_timesheet(self, active_timesheet: Optional[Timesheet]) -> None:
+        """Show running or stopped state depending on whether the active timesheet is ours"""
+        if active_timesheet:
+            settings = self.settings_snapshot.get()
+            my_project_id = settings.get("project_id", "")
+            my_activity_id = settings.get("activity_id", "")
+            
+            timesheet_project_id = str(active_timesheet.project_id or '')
+            timesheet_activity_id = str(active_timesheet.activity_id or '')
+            
+            # Check if the active timesheet matches this button's configuration
+            if (str(my_project_id) == timesheet_project_id and 
+                str(my_activity_id) == timesheet_activity_id):
                 
-                timesheet_project_id = str(active_timesheet.get('project', {}).get('id', ''))
-                timesheet_activity_id = str(active_timesheet.get('activity', {}).get('id', ''))
+                log.debug("Found matching active timesheet ID {} for this button", active_timesheet.id)
                 
-                # Check if the active timesheet matches this button's configuration
-                if (str(my_project_id) == timesheet_project_id and 
-                    str(my_activity_id) == timesheet_activity_id):
-                    
-                    log.info(f"Found matching active timesheet ID {active_timesheet['id']} for this button")
-                    
-                    # Update UI in main thread
-                    from gi.repository import GLib
-                    GLib.idle_add(self._set_running_state, active_timesheet['id'], active_timesheet.get('begin'))
-                else:
-                    log.info("Active timesheet found but doesn't match this button's configuration")
-                    # Update UI to stopped state if we're currently showing as running
-                    if self.is_running:
-                        from gi.repository import GLib
-                        GLib.idle_add(self._set_stopped_state)
+                # Update UI in main thread
+                self._set_running_state(active_timesheet.id, active_timesheet.begin)
             else:
-                log.info("No active timesheet found")
+                log.debug("Active timesheet found but doesn't match this button's configuration")
                 # Update UI to stopped state if we're currently showing as running
                 if self.is_running:
-                    from gi.repository import GLib
-                    GLib.idle_add(self._set_stopped_state)
-                    
-        except Exception as e:
-            log.error(f"Error in background timesheet check: {e}")
+                    self._set_stopped_state()
+                else:
+                    self._remember_state()
+        else:
+            log.debug("No active timesheet found")
+            # Update UI to stopped state if we're currently showing as running
+            if self.is_running:
+                self._set_stopped_state()
+            else:
+                self._remember_state()
 
     def _notify_other_instances_stopped(self) -> None:
         """Notify other StartTracking instances that a timesheet has been stopped"""
         try:
             log.info("Notifying other instances that timesheet has been stopped")
-            self.plugin_base.notify_timesheet_stopped()
+            self.plugin_base.notify_timesheet_stopped(self.kimai_instance().profile.id)
         except Exception as e:
-            log.error(f"Error notifying other instances: {e}")
+            log.error("Error notifying other instances: {}", e)
     
-    def on_timesheet_stopped_notification(self) -> None:
-        """Handle notification that a timesheet has been stopped"""
+    def on_connection_profile_changed(self, profile: ConnectionProfile) -> None:
+        """Handle a changed Kimai URL or API token"""
         try:
-            log.info("Received notification that a timesheet was stopped")
-            # Check if we should update our state
+            log.info("Kimai connection settings changed - rechecking active timesheet")
+            self._subscribe_to_poller()
+            self.validate_task()
             self.check_active_timesheet_status()
         except Exception as e:
-            log.error(f"Error handling timesheet stopped notification: {e}")
+            log.error("Error handling connection profile change: {}", e)
+    
+    def validate_task(self) -> Optional[str]:
+        """Check the configured task against the instance's catalog snapshot (in memory) and mark the button"""
+        project_id, activity_id, _ = self._configured_task()
+        problem = self.kimai_instance().catalog_cache.task_problem(project_id, activity_id)
+        if problem != self.task_problem:
+            if problem is not None:
+                log.warning("Start button for project {}, activity {} is invalid: {}", project_id, activity_id, problem)
+            self.task_problem = problem
+            self._render_task_validity()
+        elif problem is not None:
+            self._render_task_validity()
+        return problem
+    
+    @main_thread_only("validity")
+    def _render_task_validity(self) -> None:
+        """Label a stopped button whose task can't be started (the top label is the clock while running)"""
+        try:
+            if not self.is_running:
+                self.set_top_label("Invalid" if self.task_problem is not None else "")
+        except Exception as e:
+            log.error("Error showing task validity: {}", e)
     
+    @main_thread_only("feedback")
     def show_success(self) -> None:
         """Show success indicator (used for quick feedback)"""
         try:
@@ -405,10 +668,9 @@ class StartTracking(ActionBase):
             self.set_background_color([0, 255, 0, 100])  # Green background
             
             # Clear the success background after 2 seconds
-            from gi.repository import GLib
-            GLib.timeout_add_seconds(2, self._clear_success_background)
+            self.plugin_base.source_scheduler.timeout_add_seconds(self, 2, self._clear_success_background)
         except Exception as e:
-            log.error(f"Error setting success background: {e}")
+            log.error("Error setting success background: {}", e)
     
     def _clear_success_background(self) -> bool:
         """Clear the success background"""
@@ -416,9 +678,10 @@ class StartTracking(ActionBase):
             if not self.is_running:  # Only clear if not in running state
                 self.set_background_color([0, 0, 0, 0])  # Transparent background
         except Exception as e:
-            log.error(f"Error clearing success background: {e}")
+            log.error("Error clearing success background: {}", e)
         return False  # Don't repeat the timer
         
+    @main_thread_only("feedback")
     def show_error(self) -> None:
         """Show error indicator"""
         try:
@@ -426,10 +689,9 @@ class StartTracking(ActionBase):
             self.set_background_color([255, 0, 0, 100])  # Red background
             
             # Clear the error background after 3 seconds
-            from gi.repository import GLib
-            GLib.timeout_add_seconds(3, self._clear_error_background)
+            self.plugin_base.source_scheduler.timeout_add_seconds(self, 3, self._clear_error_background)
         except Exception as e:
-            log.error(f"Error setting error background: {e}")
+            log.error("Error setting error background: {}", e)
     
     def _clear_error_background(self) -> bool:
         """Clear the error background"""
@@ -437,7 +699,7 @@ class StartTracking(ActionBase):
             if not self.is_running:  # Only clear if not in running state
                 self.set_background_color([0, 0, 0, 0])  # Transparent background
         except Exception as e:
-            log.error(f"Error clearing error background: {e}")
+            log.error("Error clearing error background: {}", e)
         return False  # Don't repeat the timer
         
     def get_config_rows(self) -> list:
@@ -447,12 +709,35 @@ class StartTracking(ActionBase):
             
             super_rows = super().get_config_rows()
             
+            # Kimai instance (connection profile) selector
+            profiles = self.plugin_base.get_profiles()
+            self.profile_ids = [profile.id for profile in profiles]
+            self.profile_dropdown = Adw.ComboRow(title="Kimai Instance")
+            self.profile_model = Gtk.StringList()
+            for profile in profiles:
+                self.profile_model.append(profile.label)
+            self.profile_dropdown.set_model(self.profile_model)
+            current_profile = action_profile_id(self.settings_snapshot.get())
+            if current_profile in self.profile_ids:
+                self.profile_dropdown.set_selected(self.profile_ids.index(current_profile))
+            self.profile_dropdown.connect("notify::selected", self.on_profile_changed)
+            
+            # Fills still running target the previous panel's dropdowns
+            for fill in self.dropdown_fills.values():
+                fill.cancel()
+            self.dropdown_fills = {}
+            
             # Customer dropdown (for filtering only)
             self.customer_dropdown = Adw.ComboRow(title="Customer (Filter)")
             self.customer_model = Gtk.StringList()
             self.customer_dropdown.set_model(self.customer_model)
             self.customer_dropdown.connect("notify::selected", self.on_customer_changed)
             
+            # Project search (narrows the project dropdown as you type)
+            self.project_search_row = Adw.EntryRow(title="Search Projects")
+            self.project_search_row.connect("notify::text", self.on_project_search_changed)
+            self.project_search_row.connect("unrealize", self._cancel_project_search)
+            
             # Project dropdown
             self.project_dropdown = Adw.ComboRow(title="Project")
             self.project_model = Gtk.StringList()
@@ -470,6 +755,7 @@ class StartTracking(ActionBase):
             self.description_row = Adw.EntryRow(title="Description")
             self.description_row.set_text(current_description)
             self.description_row.connect("notify::text", self.on_description_changed)
+            self.description_writer.attach(self.description_row)
             
             # Refresh button
             self.refresh_button = Gtk.Button(label="Refresh Data")
@@ -479,7 +765,7 @@ class StartTracking(ActionBase):
             
             # Info row
             info_row = Adw.ActionRow(title="Global Settings")
-            info_row.set_subtitle("Configure Kimai URL and API Token in Plugin Settings")
+            info_row.set_subtitle("Configure Kimai URL, API Token and additional instances in Plugin Settings")
             
             # Load data initially
             log.info("Starting initial data load for dropdowns")
@@ -488,17 +774,19 @@ class StartTracking(ActionBase):
             log.info("Configuration UI built successfully")
             return super_rows + [
                 info_row,
+                self.profile_dropdown,
                 refresh_row,
                 self.customer_dropdown,
+                self.project_search_row,
                 self.project_dropdown,
                 self.activity_dropdown,
                 self.description_row
             ]
             
         except Exception as e:
-            log.error(f"Error building configuration UI: {e}")
+            log.error("Error building configuration UI: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
             return super().get_config_rows()
     
     def load_customers_and_global_activities(self) -> None:
@@ -508,83 +796,52 @@ class StartTracking(ActionBase):
     def _fetch_customers_and_global_activities(self) -> None:
         """Fetch customers and global activities in background thread"""
         try:
-            plugin_global_settings = self.plugin_base.get_settings()
-            kimai_url = plugin_global_settings.get("global_kimai_url", "")
-            api_token = plugin_global_settings.get("global_api_token", "")
+            profile = self.kimai_instance().profile
             
-            if not kimai_url or not api_token:
+            if not profile.is_configured:
                 return
             
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Fetch customers
-            customers_url = f"{kimai_url.rstrip('/')}/api/customers"
-            customers_response = requests.get(customers_url, headers=headers, timeout=10)
-            
-            # Fetch global activities
-            global_activities_url = f"{kimai_url.rstrip('/')}/api/activities?globals=true"
-            global_activities_response = requests.get(global_activities_url, headers=headers, timeout=10)
+            # Visible customers and global activities only, sorted by Kimai
+            # (fetched records are kept in the catalog cache for display buttons)
+            kimai_api = self.kimai_instance().kimai_api
+            customers_data = kimai_api.get_catalog(profile, CatalogQuery.customers().order_by("name"))
+            global_activities_data = kimai_api.get_catalog(profile, CatalogQuery.activities(globals_only=True).order_by("name"))
             
-            if customers_response.status_code == 200 and global_activities_response.status_code == 200:
-                customers_data = customers_response.json()
-                global_activities_data = global_activities_response.json()
-                
-                log.info(f"Successfully fetched {len(customers_data)} customers and {len(global_activities_data)} global activities")
+            if customers_data is not None and global_activities_data is not None:
+                log.info("Successfully fetched {} customers and {} global activities", len(customers_data), len(global_activities_data))
                 
                 # Update UI in main thread
-                from gi.repository import GLib
-                GLib.idle_add(self._update_customers_and_global_activities, customers_data, global_activities_data)
-            else:
-                if customers_response.status_code != 200:
-                    log.error(f"Failed to fetch customers. Status: {customers_response.status_code}")
-                    log.error(f"Customers URL: {customers_url}")
-                    log.error(f"Customers response: {customers_response.text}")
-                
-                if global_activities_response.status_code != 200:
-                    log.error(f"Failed to fetch global activities. Status: {global_activities_response.status_code}")
-                    log.error(f"Global activities URL: {global_activities_url}")
-                    log.error(f"Global activities response: {global_activities_response.text}")
+                self._update_customers_and_global_activities(customers_data, global_activities_data)
                 
         except requests.exceptions.Timeout:
-            log.error(f"Timeout while fetching customers/global activities from {kimai_url}")
+            log.error("Timeout while fetching customers/global activities from {}", profile.base_url)
         except requests.exceptions.ConnectionError:
-            log.error(f"Connection error while fetching customers/global activities from {kimai_url}")
+            log.error("Connection error while fetching customers/global activities from {}", profile.base_url)
         except requests.exceptions.RequestException as e:
-            log.error(f"HTTP request error while fetching customers/global activities: {e}")
-            log.error(f"Kimai URL: {kimai_url}")
+            log.error("HTTP request error while fetching customers/global activities: {}", e)
+            log.error("Kimai URL: {}", profile.base_url)
         except Exception as e:
-            log.error(f"Unexpected error fetching customers/global activities: {e}")
-            log.error(f"Kimai URL: {kimai_url}")
+            log.error("Unexpected error fetching customers/global activities: {}", e)
+            log.error("Kimai URL: {}", profile.base_url)
     
+    @main_thread_only("customers")
     def _update_customers_and_global_activities(self, customers_data: list, global_activities_data: list) -> None:
         """Update customer dropdown and global activities"""
         # Store customer mappings
-        self.customers_map = {}
-        
-        # Clear existing customer model
-        self.customer_model.splice(0, self.customer_model.get_n_items())
-        
-        # Add "All Customers" option
-        self.customer_model.append("All Customers")
-        self.customers_map["All Customers"] = None
-        
-        # Populate customers
+        self.customers_map = {"All Customers": None}
         for customer in customers_data:
-            if customer.get('visible', True):  # Only show visible customers
-                customer_name = customer.get('name', f"Customer {customer.get('id')}")
-                customer_id = customer.get('id')
-                display_text = f"{customer_name} (ID: {customer_id})"
-                
-                self.customer_model.append(display_text)
-                self.customers_map[display_text] = customer_id
+            if customer.visible:  # Only show visible customers
+                self.customers_map[f"{customer.name} (ID: {customer.id})"] = customer.id
+        
+        # Fill the dropdown in chunks, then restore the selection
+        self._fill_dropdown("customer", self.customer_model, list(self.customers_map),
+                            self.customer_dropdown, self.on_customer_changed, self._restore_customer_selection)
         
         # Update global activities
         self._update_activities_dropdown(global_activities_data, is_global=True)
-        
-        # Restore current customer selection
+    
+    def _restore_customer_selection(self) -> None:
+        """Select the saved customer filter once the customer dropdown is filled"""
         settings = self.get_settings()
         saved_customer_filter = settings.get("customer_filter", "")
         
@@ -601,56 +858,49 @@ class StartTracking(ActionBase):
             self.customer_dropdown.set_selected(0)
             self.load_projects_for_customer(None)
     
+    def _fill_dropdown(self, name: str, model, rows: list, dropdown, handler, on_done) -> None:
+        """Replace a dropdown's rows without blocking the main loop, cancelling a fill still in progress"""
+        previous = self.dropdown_fills.get(name)
+        if previous is not None:
+            previous.cancel()
+        fill = ModelFill(model, rows, dropdown=dropdown, handler=handler, on_done=on_done)
+        self.dropdown_fills[name] = fill
+        fill.start()
+    
     def load_projects_for_customer(self, customer_id: int = None) -> None:
         """Load projects for selected customer"""
+        # Results of a search still in flight would replace the full list
+        self.project_search_generation += 1
         threading.Thread(target=self._fetch_projects_for_customer, args=(customer_id,), daemon=True).start()
     
     def _fetch_projects_for_customer(self, customer_id: int = None) -> None:
         """Fetch projects for specific customer in background thread"""
         try:
-            plugin_global_settings = self.plugin_base.get_settings()
-            kimai_url = plugin_global_settings.get("global_kimai_url", "")
-            api_token = plugin_global_settings.get("global_api_token", "")
+            profile = self.kimai_instance().profile
             
-            if not kimai_url or not api_token:
+            if not profile.is_configured:
                 return
             
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Fetch projects (filtered by customer if specified)
-            if customer_id:
-                projects_url = f"{kimai_url.rstrip('/')}/api/projects?customer={customer_id}"
-            else:
-                projects_url = f"{kimai_url.rstrip('/')}/api/projects"
+            # Fetch visible projects (filtered by customer if specified)
+            query = CatalogQuery.projects(customer_id).order_by("name")
+            projects_data = self.kimai_instance().kimai_api.get_catalog(profile, query)
             
-            projects_response = requests.get(projects_url, headers=headers, timeout=10)
-            
-            if projects_response.status_code == 200:
-                projects_data = projects_response.json()
-                
-                log.info(f"Successfully fetched {len(projects_data)} projects for customer {customer_id}")
+            if projects_data is not None:
+                log.info("Successfully fetched {} projects for customer {}", len(projects_data), customer_id)
                 
                 # Update UI in main thread
-                from gi.repository import GLib
-                GLib.idle_add(self._update_projects_dropdown, projects_data)
-            else:
-                log.error(f"Failed to fetch projects. Status: {projects_response.status_code}")
-                log.error(f"Projects URL: {projects_url}")
-                log.error(f"Projects response: {projects_response.text}")
+                self._update_projects_dropdown(projects_data)
                 
         except requests.exceptions.Timeout:
-            log.error(f"Timeout while fetching projects from {kimai_url}")
+            log.error("Timeout while fetching projects from {}", profile.base_url)
         except requests.exceptions.ConnectionError:
-            log.error(f"Connection error while fetching projects from {kimai_url}")
+            log.error("Connection error while fetching projects from {}", profile.base_url)
         except requests.exceptions.RequestException as e:
-            log.error(f"HTTP request error while fetching projects: {e}")
-            log.error(f"Kimai URL: {kimai_url}")
+            log.error("HTTP request error while fetching projects: {}", e)
+            log.error("Kimai URL: {}", profile.base_url)
         except Exception as e:
-            log.error(f"Unexpected error fetching projects: {e}")
-            log.error(f"Kimai URL: {kimai_url}")
+            log.error("Unexpected error fetching projects: {}", e)
+            log.error("Kimai URL: {}", profile.base_url)
     
     def load_activities_for_project(self, project_id: int = None) -> None:
         """Load activities for selected project (or global if no project)"""
@@ -659,95 +909,155 @@ class StartTracking(ActionBase):
     def _fetch_activities_for_project(self, project_id: int = None) -> None:
         """Fetch activities for specific project in background thread"""
         try:
-            plugin_global_settings = self.plugin_base.get_settings()
-            kimai_url = plugin_global_settings.get("global_kimai_url", "")
-            api_token = plugin_global_settings.get("global_api_token", "")
+            profile = self.kimai_instance().profile
             
-            if not kimai_url or not api_token:
+            if not profile.is_configured:
                 return
             
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Fetch activities (project-specific or global)
-            if project_id:
-                activities_url = f"{kimai_url.rstrip('/')}/api/activities?project={project_id}"
-            else:
-                activities_url = f"{kimai_url.rstrip('/')}/api/activities?globals=true"
-            
-            activities_response = requests.get(activities_url, headers=headers, timeout=10)
+            # Fetch visible activities (project-specific or global)
+            query = CatalogQuery.activities(project_id, globals_only=not project_id).order_by("name")
+            activities_data = self.kimai_instance().kimai_api.get_catalog(profile, query)
             
-            if activities_response.status_code == 200:
-                activities_data = activities_response.json()
-                
-                log.info(f"Successfully fetched {len(activities_data)} activities for project {project_id}")
+            if activities_data is not None:
+                log.info("Successfully fetched {} activities for project {}", len(activities_data), project_id)
                 
                 # Update UI in main thread
-                from gi.repository import GLib
-                GLib.idle_add(self._update_activities_dropdown, activities_data, project_id is None)
-            else:
-                log.error(f"Failed to fetch activities. Status: {activities_response.status_code}")
-                log.error(f"Activities URL: {activities_url}")
-                log.error(f"Activities response: {activities_response.text}")
+                self._update_activities_dropdown(activities_data, project_id is None)
                 
         except requests.exceptions.Timeout:
-            log.error(f"Timeout while fetching activities from {kimai_url}")
+            log.error("Timeout while fetching activities from {}", profile.base_url)
         except requests.exceptions.ConnectionError:
-            log.error(f"Connection error while fetching activities from {kimai_url}")
+            log.error("Connection error while fetching activities from {}", profile.base_url)
         except requests.exceptions.RequestException as e:
-            log.error(f"HTTP request error while fetching activities: {e}")
-            log.error(f"Kimai URL: {kimai_url}")
+            log.error("HTTP request error while fetching activities: {}", e)
+            log.error("Kimai URL: {}", profile.base_url)
         except Exception as e:
-            log.error(f"Unexpected error fetching activities: {e}")
-            log.error(f"Kimai URL: {kimai_url}")
+            log.error("Unexpected error fetching activities: {}", e)
+            log.error("Kimai URL: {}", profile.base_url)
     
 
     
-    def _update_projects_dropdown(self, projects_data: list) -> None:
-        """Update projects dropdown with fetched data"""
+    def on_project_search_changed(self, entry, *args) -> None:
+        """Search projects once the user pauses typing"""
+        scheduler = self.plugin_base.source_scheduler
+        scheduler.remove(self.project_search_id)
+        self.project_search_id = scheduler.timeout_add(self, PROJECT_SEARCH_DELAY_MS, self._run_project_search)
+    
+    def _cancel_project_search(self, *args) -> None:
+        """Drop a pending search when the configuration panel goes away"""
+        self.plugin_base.source_scheduler.remove(self.project_search_id)
+        self.project_search_id = None
+    
+    def _run_project_search(self) -> bool:
+        """Fill the project dropdown with matches: from the cached catalog, or by asking Kimai for the term"""
+        self.project_search_id = None
+        term = self.project_search_row.get_text().strip()
+        customer_id = self._customer_filter()
+        
+        if not term:
+            self.load_projects_for_customer(customer_id)
+            return False
+        
+        self.project_search_generation += 1
+        catalog_cache = self.kimai_instance().catalog_cache
+        if catalog_cache.snapshot_loaded:
+            matches = catalog_cache.search_projects(term, customer_id, PROJECT_SEARCH_LIMIT)
+            log.info("Found {} cached projects matching '{}'", len(matches), term)
+            self._update_projects_dropdown(matches, searching=True)
+        else:
+            threading.Thread(target=self._search_projects_remote, daemon=True,
+                             args=(term, customer_id, self.project_search_generation)).start()
+        return False  # Don't repeat the timer
+    
+    def _search_projects_remote(self, term: str, customer_id: Optional[int], generation: int) -> None:
+        """Ask Kimai for the projects matching a search term (runs in background thread)"""
         try:
-            log.info(f"Updating projects dropdown with {len(projects_data)} projects")
+            profile = self.kimai_instance().profile
             
-            # Store project mappings
-            self.projects_map = {}
+            if not profile.is_configured:
+                return
             
-            # Clear existing projects model
-            self.project_model.splice(0, self.project_model.get_n_items())
+            query = CatalogQuery.projects(customer_id).search(term).order_by("name").page(1, PROJECT_SEARCH_LIMIT)
+            projects_data = self.kimai_instance().kimai_api.get_catalog(profile, query)
             
-            # Populate projects
-            visible_projects = 0
+            # A later keystroke (or a full reload) owns the dropdown now
+            if projects_data is None or generation != self.project_search_generation:
+                return
+            
+            log.info("Kimai found {} projects matching '{}'", len(projects_data), term)
+            self._update_projects_dropdown(projects_data, searching=True)
+        except requests.exceptions.RequestException as e:
+            log.error("HTTP request error while searching projects: {}", e)
+        except Exception as e:
+            log.error("Unexpected error searching projects: {}", e)
+    
+    def _customer_filter(self) -> Optional[int]:
+        """The customer the project list is filtered to, if any"""
+        customer_filter = self.get_settings().get("customer_filter", "")
+        try:
+            return int(customer_filter) if customer_filter else None
+        except (TypeError, ValueError):
+            return None
+    
+    @main_thread_only("projects")
+    def _update_projects_dropdown(self, projects_data: list, searching: bool = False) -> None:
+        """Update projects dropdown with fetched data (or search results)"""
+        try:
+            log.info("Updating projects dropdown with {} projects", len(projects_data))
+            
+            # Store project mappings (visible projects only)
+            self.projects_map = {}
             for project in projects_data:
-                if project.get('visible', True):  # Only show visible projects
-                    project_name = project.get('name', f"Project {project.get('id')}")
-                    project_id = project.get('id')
-                    display_text = f"{project_name} (ID: {project_id})"
-                    
-                    self.project_model.append(display_text)
-                    self.projects_map[display_text] = project_id
-                    visible_projects += 1
-                    log.debug(f"Added project: {display_text}")
+                if project.visible:
+                    self.projects_map[f"{project.name} (ID: {project.id})"] = project.id
             
-            log.info(f"Added {visible_projects} visible projects to dropdown")
-            log.info(f"Projects map has {len(self.projects_map)} entries")
+            log.info("Adding {} visible projects to dropdown", len(self.projects_map))
             
+            # Fill the dropdown in chunks, then restore the selection
+            on_done = self._select_search_result if searching else self._restore_project_selection
+            self._fill_dropdown("project", self.project_model, list(self.projects_map),
+                                self.project_dropdown, self.on_project_changed, on_done)
+        except Exception as e:
+            log.error("Error updating projects dropdown: {}", e)
+            import traceback
+            log.error("Traceback: {}", traceback.format_exc())
+    
+    def _select_search_result(self) -> None:
+        """Highlight the saved project if the search found it, without saving anything.
+
+        Typing only narrows the list; the project changes when the user picks
+        a match. Without the saved project nothing is selected, so picking
+        the first match still counts as a change.
+        """
+        if not self.projects_map:
+            return
+        saved_project_id = str(self.get_settings().get("project_id", ""))
+        project_ids = [str(project_id) for project_id in self.projects_map.values()]
+        index = project_ids.index(saved_project_id) if saved_project_id in project_ids else Gtk.INVALID_LIST_POSITION
+        
+        self.project_dropdown.handler_block_by_func(self.on_project_changed)
+        self.project_dropdown.set_selected(index)
+        self.project_dropdown.handler_unblock_by_func(self.on_project_changed)
+    
+    def _restore_project_selection(self) -> None:
+        """Select the saved project (or the only one) once the project dropdown is filled"""
+        try:
             # Restore current project selection
             settings = self.get_settings()
             saved_project_id = settings.get("project_id", "")
-            log.info(f"Attempting to restore project selection: '{saved_project_id}'")
+            log.info("Attempting to restore project selection: '{}'", saved_project_id)
             
             if saved_project_id:
                 restored = False
                 for i, (display_text, project_id) in enumerate(self.projects_map.items()):
                     if str(project_id) == str(saved_project_id):
-                        log.info(f"Restoring project selection: index {i}, '{display_text}'")
+                        log.info("Restoring project selection: index {}, '{}'", i, display_text)
                         self.project_dropdown.set_selected(i)
                         restored = True
                         break
                 
                 if not restored:
-                    log.warning(f"Could not restore project selection - project_id '{saved_project_id}' not found in current projects")
+                    log.warning("Could not restore project selection - project_id '{}' not found in current projects", saved_project_id)
                     # Clear the invalid project_id from settings
                     settings = self.get_settings()
                     settings["project_id"] = ""
@@ -763,80 +1073,77 @@ class StartTracking(ActionBase):
                 # If there's only one project, auto-select it and save to settings
                 if len(self.projects_map) == 1:
                     display_text, project_id = list(self.projects_map.items())[0]
-                    log.info(f"Auto-selecting single project: '{display_text}' (ID: {project_id})")
+                    log.info("Auto-selecting single project: '{}' (ID: {})", display_text, project_id)
                     self.project_dropdown.set_selected(0)
                     
                     # Manually save the project_id since the selection change might not trigger
                     settings = self.get_settings()
                     settings["project_id"] = str(project_id)
                     self.set_settings(settings)
-                    log.info(f"Manually saved project_id to settings: {project_id}")
+                    log.info("Manually saved project_id to settings: {}", project_id)
                     
                     # Also load activities for this project
-                    log.info(f"Auto-loading activities for project {project_id}")
+                    log.info("Auto-loading activities for project {}", project_id)
                     self.load_activities_for_project(project_id)
                     
                     # Manually trigger the project changed handler to ensure consistency
                     log.info("Manually triggering project change handler")
                     self.on_project_changed(self.project_dropdown)
                 elif len(self.projects_map) > 1:
-                    log.info(f"Multiple projects available ({len(self.projects_map)}), user must select manually")
+                    log.info("Multiple projects available ({}), user must select manually", len(self.projects_map))
                 else:
                     log.info("No projects available for this customer")
                 
         except Exception as e:
-            log.error(f"Error updating projects dropdown: {e}")
+            log.error("Error restoring project selection: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
     
+    @main_thread_only("activities")
     def _update_activities_dropdown(self, activities_data: list, is_global: bool = False) -> None:
         """Update activities dropdown with fetched data"""
         try:
-            log.info(f"Updating activities dropdown with {len(activities_data)} activities (global: {is_global})")
+            log.info("Updating activities dropdown with {} activities (global: {})", len(activities_data), is_global)
             
-            # Store activity mappings
+            # Store activity mappings (visible activities only), marking global activities
             self.activities_map = {}
-            
-            # Clear existing activities model
-            self.activity_model.splice(0, self.activity_model.get_n_items())
-            
-            # Populate activities
-            visible_activities = 0
             for activity in activities_data:
-                if activity.get('visible', True):  # Only show visible activities
-                    activity_name = activity.get('name', f"Activity {activity.get('id')}")
-                    activity_id = activity.get('id')
-                    
-                    # Add indicator for global activities
+                if activity.visible:
                     if is_global:
-                        display_text = f"{activity_name} (Global, ID: {activity_id})"
+                        display_text = f"{activity.name} (Global, ID: {activity.id})"
                     else:
-                        display_text = f"{activity_name} (ID: {activity_id})"
-                    
-                    self.activity_model.append(display_text)
-                    self.activities_map[display_text] = activity_id
-                    visible_activities += 1
-                    log.debug(f"Added activity: {display_text}")
+                        display_text = f"{activity.name} (ID: {activity.id})"
+                    self.activities_map[display_text] = activity.id
             
-            log.info(f"Added {visible_activities} visible activities to dropdown")
-            log.info(f"Activities map has {len(self.activities_map)} entries")
+            log.info("Adding {} visible activities to dropdown", len(self.activities_map))
             
+            # Fill the dropdown in chunks, then restore the selection
+            self._fill_dropdown("activity", self.activity_model, list(self.activities_map),
+                                self.activity_dropdown, self.on_activity_changed, self._restore_activity_selection)
+        except Exception as e:
+            log.error("Error updating activities dropdown: {}", e)
+            import traceback
+            log.error("Traceback: {}", traceback.format_exc())
+    
+    def _restore_activity_selection(self) -> None:
+        """Select the saved activity (or the first one) once the activity dropdown is filled"""
+        try:
             # Restore current activity selection
             settings = self.get_settings()
             saved_activity_id = settings.get("activity_id", "")
-            log.info(f"Attempting to restore activity selection: '{saved_activity_id}'")
+            log.info("Attempting to restore activity selection: '{}'", saved_activity_id)
             
             if saved_activity_id:
                 restored = False
                 for i, (display_text, activity_id) in enumerate(self.activities_map.items()):
                     if str(activity_id) == str(saved_activity_id):
-                        log.info(f"Restoring activity selection: index {i}, '{display_text}'")
+                        log.info("Restoring activity selection: index {}, '{}'", i, display_text)
                         self.activity_dropdown.set_selected(i)
                         restored = True
                         break
                 
                 if not restored:
-                    log.warning(f"Could not restore activity selection - activity_id '{saved_activity_id}' not found in current activities")
+                    log.warning("Could not restore activity selection - activity_id '{}' not found in current activities", saved_activity_id)
                     # Fall through to auto-selection logic below
                     saved_activity_id = ""  # Clear it so auto-selection logic runs
             
@@ -847,47 +1154,69 @@ class StartTracking(ActionBase):
                 # If there are activities available, auto-select the first one
                 if len(self.activities_map) >= 1:
                     display_text, activity_id = list(self.activities_map.items())[0]
-                    log.info(f"Auto-selecting first activity: '{display_text}' (ID: {activity_id})")
+                    log.info("Auto-selecting first activity: '{}' (ID: {})", display_text, activity_id)
                     self.activity_dropdown.set_selected(0)
                     
                     # Manually save the activity_id since the selection change might not trigger
                     settings = self.get_settings()
                     settings["activity_id"] = str(activity_id)
                     self.set_settings(settings)
-                    log.info(f"Manually saved activity_id to settings: {activity_id}")
-                    
-                    # Verify the setting was saved
-                    verification_settings = self.get_settings()
-                    saved_activity_id_verify = verification_settings.get("activity_id", "")
-                    if saved_activity_id_verify == str(activity_id):
-                        log.info(f"✓ Activity ID successfully saved and verified: {saved_activity_id_verify}")
-                    else:
-                        log.error(f"✗ Activity ID save verification failed. Expected: {activity_id}, Got: {saved_activity_id_verify}")
+                    log.info("Manually saved activity_id to settings: {}", activity_id)
                 else:
                     log.info("No activities available for this project/global context")
                     
         except Exception as e:
-            log.error(f"Error updating activities dropdown: {e}")
+            log.error("Error restoring activity selection: {}", e)
+            import traceback
+            log.error("Traceback: {}", traceback.format_exc())
+    
+    def on_profile_changed(self, dropdown, *args) -> None:
+        """Handle Kimai instance selection change - catalog and state belong to the new instance"""
+        try:
+            selected_index = dropdown.get_selected()
+            if selected_index == Gtk.INVALID_LIST_POSITION or selected_index >= len(self.profile_ids):
+                return
+            
+            profile_id = self.profile_ids[selected_index]
+            settings = self.get_settings()
+            if action_profile_id(settings) == profile_id:
+                return
+            
+            log.info("Kimai instance changed to '{}' - clearing customer, project and activity selections", self.profile_model.get_string(selected_index))
+            settings["profile_id"] = profile_id
+            settings.pop("profile_name", None)  # Superseded by profile_id
+            settings["customer_filter"] = ""
+            settings["project_id"] = ""
+            settings["activity_id"] = ""
+            self.set_settings(settings)
+            
+            # Follow the new instance's poller and reload its catalog
+            self._subscribe_to_poller()
+            self.check_active_timesheet_status()
+            self.load_customers_and_global_activities()
+            
+        except Exception as e:
+            log.error("Error in on_profile_changed: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
     
     def on_customer_changed(self, dropdown, *args) -> None:
         """Handle customer selection change - reload projects based on selected customer"""
         try:
             log.info("Customer selection changed")
             selected_index = dropdown.get_selected()
-            log.info(f"Selected index: {selected_index}")
+            log.info("Selected index: {}", selected_index)
             
             if selected_index != Gtk.INVALID_LIST_POSITION and hasattr(self, 'customers_map'):
                 # Get the display text for the selected item
                 display_texts = list(self.customers_map.keys())
-                log.info(f"Available customers: {len(display_texts)}")
+                log.info("Available customers: {}", len(display_texts))
                 
                 if selected_index < len(display_texts):
                     selected_text = display_texts[selected_index]
                     customer_id = self.customers_map[selected_text]
                     
-                    log.info(f"Selected customer: '{selected_text}' (ID: {customer_id})")
+                    log.info("Selected customer: '{}' (ID: {})", selected_text, customer_id)
                     
                     # Save customer for filtering (not used in API)
                     settings = self.get_settings()
@@ -897,49 +1226,50 @@ class StartTracking(ActionBase):
                     # Clear project_id and activity_id when customer changes
                     # This prevents trying to restore invalid project/activity combinations
                     if old_customer_filter != settings["customer_filter"]:
-                        log.info(f"Customer changed from '{old_customer_filter}' to '{settings['customer_filter']}' - clearing project and activity selections")
+                        log.info("Customer changed from '{}' to '{}' - clearing project and activity selections", old_customer_filter, settings['customer_filter'])
                         settings["project_id"] = ""
                         settings["activity_id"] = ""
                         
                         # Also clear the activity dropdown since activities are project-dependent
                         if hasattr(self, 'activity_model'):
                             log.info("Clearing activity dropdown due to customer change")
-                            self.activity_model.splice(0, self.activity_model.get_n_items())
                             self.activities_map = {}
+                            self._fill_dropdown("activity", self.activity_model, [],
+                                                self.activity_dropdown, self.on_activity_changed, None)
                     
                     self.set_settings(settings)
-                    log.info(f"Updated customer filter in settings: {settings.get('customer_filter')}")
+                    log.info("Updated customer filter in settings: {}", settings.get('customer_filter'))
                     
                     # Load projects for this customer
-                    log.info(f"Loading projects for customer {customer_id}")
+                    log.info("Loading projects for customer {}", customer_id)
                     self.load_projects_for_customer(customer_id)
                 else:
-                    log.warning(f"Selected index {selected_index} out of range for {len(display_texts)} customers")
+                    log.warning("Selected index {} out of range for {} customers", selected_index, len(display_texts))
             else:
-                log.warning(f"Invalid selection or customers_map not ready. Index: {selected_index}, has customers_map: {hasattr(self, 'customers_map')}")
+                log.warning("Invalid selection or customers_map not ready. Index: {}, has customers_map: {}", selected_index, hasattr(self, 'customers_map'))
                 
         except Exception as e:
-            log.error(f"Error in on_customer_changed: {e}")
+            log.error("Error in on_customer_changed: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
     
     def on_project_changed(self, dropdown, *args) -> None:
         """Handle project selection change - reload activities based on selected project"""
         try:
             log.info("Project selection changed")
             selected_index = dropdown.get_selected()
-            log.info(f"Selected index: {selected_index}")
+            log.info("Selected index: {}", selected_index)
             
             if selected_index != Gtk.INVALID_LIST_POSITION and hasattr(self, 'projects_map'):
                 # Get the display text for the selected item
                 display_texts = list(self.projects_map.keys())
-                log.info(f"Available projects: {len(display_texts)}")
+                log.info("Available projects: {}", len(display_texts))
                 
                 if selected_index < len(display_texts):
                     selected_text = display_texts[selected_index]
                     project_id = self.projects_map[selected_text]
                     
-                    log.info(f"Selected project: '{selected_text}' (ID: {project_id})")
+                    log.info("Selected project: '{}' (ID: {})", selected_text, project_id)
                     
                     # Save to settings
                     settings = self.get_settings()
@@ -948,71 +1278,60 @@ class StartTracking(ActionBase):
                     
                     # Clear activity_id when project changes since activities are project-specific
                     if old_project_id != str(project_id):
-                        log.info(f"Project changed from '{old_project_id}' to '{project_id}' - clearing activity selection")
+                        log.info("Project changed from '{}' to '{}' - clearing activity selection", old_project_id, project_id)
                         settings["activity_id"] = ""
                     
                     self.set_settings(settings)
-                    log.info(f"Updated project_id in settings: {old_project_id} -> {project_id}")
-                    
-                    # Verify the setting was saved
-                    verification_settings = self.get_settings()
-                    saved_project_id = verification_settings.get("project_id", "")
-                    if saved_project_id == str(project_id):
-                        log.info(f"✓ Project ID successfully saved and verified: {saved_project_id}")
-                    else:
-                        log.error(f"✗ Project ID save verification failed. Expected: {project_id}, Got: {saved_project_id}")
-                        log.error(f"Full verification settings: {verification_settings}")
+                    log.info("Updated project_id in settings: {} -> {}", old_project_id, project_id)
                     
                     # Load activities for this project
-                    log.info(f"Loading activities for project {project_id}")
+                    log.info("Loading activities for project {}", project_id)
                     self.load_activities_for_project(project_id)
                 else:
-                    log.warning(f"Selected index {selected_index} out of range for {len(display_texts)} projects")
+                    log.warning("Selected index {} out of range for {} projects", selected_index, len(display_texts))
             else:
-                log.warning(f"Invalid selection or projects_map not ready. Index: {selected_index}, has projects_map: {hasattr(self, 'projects_map')}")
+                log.warning("Invalid selection or projects_map not ready. Index: {}, has projects_map: {}", selected_index, hasattr(self, 'projects_map'))
                 
         except Exception as e:
-            log.error(f"Error in on_project_changed: {e}")
+            log.error("Error in on_project_changed: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
     
     def on_activity_changed(self, dropdown, *args) -> None:
         """Handle activity selection change"""
         try:
             log.info("Activity selection changed")
             selected_index = dropdown.get_selected()
-            log.info(f"Selected index: {selected_index}")
+            log.info("Selected index: {}", selected_index)
             
             if selected_index != Gtk.INVALID_LIST_POSITION and hasattr(self, 'activities_map'):
                 # Get the display text for the selected item
                 display_texts = list(self.activities_map.keys())
-                log.info(f"Available activities: {len(display_texts)}")
+                log.info("Available activities: {}", len(display_texts))
                 
                 if selected_index < len(display_texts):
                     selected_text = display_texts[selected_index]
                     activity_id = self.activities_map[selected_text]
                     
-                    log.info(f"Selected activity: '{selected_text}' (ID: {activity_id})")
+                    log.info("Selected activity: '{}' (ID: {})", selected_text, activity_id)
                     
                     # Save to settings
                     settings = self.get_settings()
                     settings["activity_id"] = str(activity_id)
                     self.set_settings(settings)
-                    log.info(f"Updated activity_id in settings: {settings.get('activity_id')}")
+                    log.info("Updated activity_id in settings: {}", settings.get('activity_id'))
                 else:
-                    log.warning(f"Selected index {selected_index} out of range for {len(display_texts)} activities")
+                    log.warning("Selected index {} out of range for {} activities", selected_index, len(display_texts))
             else:
-                log.warning(f"Invalid selection or activities_map not ready. Index: {selected_index}, has activities_map: {hasattr(self, 'activities_map')}")
+                log.warning("Invalid selection or activities_map not ready. Index: {}, has activities_map: {}", selected_index, hasattr(self, 'activities_map'))
                 
         except Exception as e:
-            log.error(f"Error in on_activity_changed: {e}")
+            log.error("Error in on_activity_changed: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
+            log.error("Traceback: {}", traceback.format_exc())
     
     def on_description_changed(self, entry, *args):
-        settings = self.get_settings()
-        settings["description"] = entry.get_text()
-        self.set_settings(settings)
+        self.description_writer.update("description", entry.get_text())
     
     def on_refresh_clicked(self, button) -> None:
         """Refresh customers, projects and activities when button is clicked"""
@@ -1030,67 +1349,64 @@ class StartTracking(ActionBase):
         # Reload all data
         self.load_customers_and_global_activities()
     
-    def _stop_tracking_request(self, kimai_url: str, api_token: str, timesheet_id: int) -> None:
+    def _stop_tracking_request(self, profile: ConnectionProfile, timesheet_id: int) -> None:
         """Make the API request to stop tracking"""
         try:
-            log.info(f"Stopping timesheet ID: {timesheet_id}")
+            log.info("Stopping timesheet ID: {}", timesheet_id)
             
-            url = f"{kimai_url.rstrip('/')}/api/timesheets/{timesheet_id}/stop"
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
+            url = profile.url(f"/api/timesheets/{timesheet_id}/stop")
             
-            response = requests.patch(url, headers=headers, timeout=10)
+            response = self.kimai_instance().kimai_api.session.patch(url, headers=profile.headers, timeout=10)
             
             if response.status_code in [200, 201]:
                 response_data = response.json()
-                log.info(f"Successfully stopped time tracking. Response: {response_data}")
+                log.info("Successfully stopped time tracking")
+                log.debug("Stop response: {}", response_data)
                 
                 # Update UI in main thread to show stopped state
-                from gi.repository import GLib
-                GLib.idle_add(self._set_stopped_state)
+                self._set_stopped_state()
                 
                 # Notify other instances that timesheet has been stopped
                 self._notify_other_instances_stopped()
             else:
-                log.error(f"Failed to stop time tracking. Status: {response.status_code}")
-                log.error(f"Response body: {response.text}")
-                log.error(f"Request URL: {url}")
-                log.error(f"Timesheet ID: {timesheet_id}")
+                log.error("Failed to stop time tracking. Status: {}", response.status_code)
+                log.error("Response body: {}", response.text)
+                log.error("Request URL: {}", url)
+                log.error("Timesheet ID: {}", timesheet_id)
                 
                 # Update UI to show error
-                from gi.repository import GLib
-                GLib.idle_add(self.show_error)
+                self.show_error()
                 
         except requests.exceptions.Timeout:
-            log.error(f"Timeout while stopping time tracking. URL: {url}")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+            log.error("Timeout while stopping time tracking. URL: {}", url)
+            self.show_error()
         except requests.exceptions.ConnectionError as e:
-            log.error(f"Connection error while stopping time tracking: {e}")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+            log.error("Connection error while stopping time tracking: {}", e)
+            self.show_error()
         except requests.exceptions.RequestException as e:
-            log.error(f"HTTP request error while stopping time tracking: {e}")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+            log.error("HTTP request error while stopping time tracking: {}", e)
+            self.show_error()
         except Exception as e:
-            log.error(f"Unexpected error stopping time tracking: {e}")
+            log.error("Unexpected error stopping time tracking: {}", e)
             import traceback
-            log.error(f"Traceback: {traceback.format_exc()}")
-            from gi.repository import GLib
-            GLib.idle_add(self.show_error)
+            log.error("Traceback: {}", traceback.format_exc())
+            self.show_error()
 
     def _set_running_state(self, timesheet_id: int, start_time: str) -> None:
-        """Set the button to running state with pause icon"""
+        """Set the button to running state (right away; the widgets follow on the main loop)"""
+        log.info("Setting running state - Timesheet ID: {}", timesheet_id)
+        
+        # Queued commands read this state before the render runs
+        self.is_running = True
+        self.current_timesheet_id = timesheet_id
+        self.start_time = start_time
+        self._remember_state()
+        self._render_running_state()
+
+    @main_thread_only("state")
+    def _render_running_state(self) -> None:
+        """Show the pause icon and the elapsed time"""
         try:
-            log.info(f"Setting running state - Timesheet ID: {timesheet_id}")
-            
-            self.is_running = True
-            self.current_timesheet_id = timesheet_id
-            self.start_time = start_time
-            
             # Show pause icon to indicate running state
             self.set_media(media_path=self.plugin_base.get_asset_path("stop.png"), size=0.75)
             
@@ -1101,60 +1417,69 @@ class StartTracking(ActionBase):
             self.set_background_color([0, 0, 0, 0])  # Transparent background
             
         except Exception as e:
-            log.error(f"Error setting running state: {e}")
+            log.error("Error showing running state: {}", e)
 
     def _set_stopped_state(self) -> None:
-        """Set the button to stopped state"""
+        """Set the button to stopped state (right away; the widgets follow on the main loop)"""
+        log.info("Setting stopped state")
+        
+        self.is_running = False
+        self.current_timesheet_id = None
+        self.start_time = None
+        self._remember_state()
+        self._render_stopped_state()
+
+    @main_thread_only("state")
+    def _render_stopped_state(self) -> None:
+        """Show the start icon without the elapsed time"""
         try:
-            log.info("Setting stopped state")
-            
-            self.is_running = False
-            self.current_timesheet_id = None
-            self.start_time = None
-            
             # Stop the elapsed time display
             self._stop_elapsed_time_display()
             
             # Reset to original start icon
             self.set_media(media_path=self.plugin_base.get_asset_path("start.png"), size=0.75)
             
+            # Keep marking a task that can't be started
+            if self.task_problem is not None:
+                self._render_task_validity()
+            
             # Clear any background color
             self.set_background_color([0, 0, 0, 0])  # Transparent background
             
         except Exception as e:
-            log.error(f"Error setting stopped state: {e}")
+            log.error("Error showing stopped state: {}", e)
 
     def _start_elapsed_time_display(self) -> None:
         """Start the elapsed time display"""
         try:
+            scheduler = self.plugin_base.source_scheduler
             if self.elapsed_timer_id is not None:
                 # Stop existing timer
-                from gi.repository import GLib
-                GLib.source_remove(self.elapsed_timer_id)
+                scheduler.remove(self.elapsed_timer_id)
             
-            # Start new timer for elapsed time display (update every 1 second)
-            from gi.repository import GLib
-            self.elapsed_timer_id = GLib.timeout_add_seconds(1, self._update_elapsed_time_display)
+            # Start new timer for elapsed time display (update every 1 second);
+            # the scheduler suspends it while this button's page is hidden
+            self.elapsed_timer_id = scheduler.timeout_add_seconds(self, 1, self._update_elapsed_time_display,
+                                                                  when_idle=WHEN_IDLE_STRETCH)
             
             # Show initial elapsed time
             self._update_elapsed_time_display()
             
         except Exception as e:
-            log.error(f"Error starting elapsed time display: {e}")
+            log.error("Error starting elapsed time display: {}", e)
 
     def _stop_elapsed_time_display(self) -> None:
         """Stop the elapsed time display"""
         try:
             if self.elapsed_timer_id is not None:
-                from gi.repository import GLib
-                GLib.source_remove(self.elapsed_timer_id)
+                self.plugin_base.source_scheduler.remove(self.elapsed_timer_id)
                 self.elapsed_timer_id = None
                 
             # Clear the top label (where clock is displayed)
             self.set_top_label("")
                 
         except Exception as e:
-            log.error(f"Error stopping elapsed time display: {e}")
+            log.error("Error stopping elapsed time display: {}", e)
 
     def _update_elapsed_time_display(self) -> bool:
         """Update the elapsed time display - returns True to continue timer"""
@@ -1188,8 +1513,8 @@ class StartTracking(ActionBase):
                     minutes = int((elapsed.total_seconds() % 3600) // 60)
                     elapsed_text = f"{hours:02d}:{minutes:02d}"
                 except Exception as e:
-                    log.debug(f"Error calculating elapsed time: {e}")
-                    log.debug(f"Start time format: '{self.start_time}'")
+                    # Once per second while running, so sampled
+                    log.every("elapsed-time-error", 60).debug("Error calculating elapsed time from '{}': {}", self.start_time, e)
                     elapsed_text = "??:??"
             
             # Set the clock/elapsed time in the top label
@@ -1198,7 +1523,7 @@ class StartTracking(ActionBase):
             return True  # Continue the timer
             
         except Exception as e:
-            log.error(f"Error updating elapsed time display: {e}")
+            log.error("Error updating elapsed time display: {}", e)
             return False  # Stop the timer on error
     
     def __del__(self):
@@ -1206,15 +1531,29 @@ class StartTracking(ActionBase):
         try:
             log.info("StartTracking action being destroyed - performing cleanup")
             
-            # Stop any running timer
-            if hasattr(self, 'elapsed_timer_id') and self.elapsed_timer_id is not None:
+            # Write a description that was still being typed
+            if hasattr(self, 'description_writer'):
+                try:
+                    self.description_writer.flush()
+                except Exception as e:
+                    log.error("Error flushing pending settings: {}", e)
+            
+            # Stop any running timer and pending feedback timers
+            if hasattr(self, 'elapsed_timer_id'):
                 try:
-                    from gi.repository import GLib
-                    GLib.source_remove(self.elapsed_timer_id)
+                    self.plugin_base.source_scheduler.remove(self.elapsed_timer_id)
                     self.elapsed_timer_id = None
+                    self.plugin_base.source_scheduler.remove_owner(self)
                     log.info("Cleaned up elapsed timer")
                 except Exception as e:
-                    log.error(f"Error cleaning up elapsed timer: {e}")
+                    log.error("Error cleaning up elapsed timer: {}", e)
+            
+            # Stop receiving shared polls
+            if getattr(self, 'subscribed_poller', None) is not None:
+                try:
+                    self.subscribed_poller.unsubscribe(self._on_active_timesheet_polled)
+                except Exception as e:
+                    log.error("Error unsubscribing from active timesheet poller: {}", e)
             
             # Unregister from notifications
             if hasattr(self, 'plugin_base') and self.plugin_base is not None:
@@ -1222,7 +1561,7 @@ class StartTracking(ActionBase):
                     self.plugin_base.unregister_action_instance(self)
                     log.info("Unregistered from plugin notifications")
                 except Exception as e:
-                    log.error(f"Error unregistering from notifications: {e}")
+                    log.error("Error unregistering from notifications: {}", e)
                     
         except Exception as e:
-            log.error(f"Error during StartTracking cleanup: {e}")
+            log.error("Error during StartTracking cleanup: {}", e)
@@ -7,9 +7,7 @@ from src.backend.PluginManager.PluginBase import PluginBase
 # Import python modules
 import os
 import requests
-import threading
 from typing import Dict, Any, Optional
-from loguru import logger as log
 
 # Import gtk modules - used for the config rows
 import gi
@@ -17,15 +15,43 @@ gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw
 
+from ...command_queue import CommandQueue
+from ...settings_cache import ConnectionProfile, SettingsSnapshot, action_profile_id
+from ...ui_dispatcher import UiDispatcher, main_thread_only
+from ...plugin_log import get_logger
+
+log = get_logger("ui")
+
 class StopTracking(ActionBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
+        # Cached read-only view of this action's settings
+        self.settings_snapshot = SettingsSnapshot(self.get_settings)
+        
+        # Widget updates from the request thread are coalesced onto the main loop
+        self.ui = UiDispatcher(self)
+        
+        # One stop request at a time; presses while it is in flight are dropped
+        self.commands = CommandQueue(self, self._stop_tracking_request)
+        
+    def set_settings(self, settings) -> None:
+        """Save action settings and refresh the cached snapshot"""
+        super().set_settings(settings)
+        self.settings_snapshot.invalidate()
+        
+    def kimai_instance(self):
+        """The Kimai instance (connection, caches, poller) selected for this button"""
+        return self.plugin_base.get_kimai_instance(action_profile_id(self.settings_snapshot.get()))
+        
     def on_ready(self) -> None:
         # Set the icon for stop tracking
         self.set_media(media_path=self.plugin_base.get_asset_path("stop.png"), size=0.75)
         
     def on_key_down(self) -> None:
+        # Any key press ends idle mode (resumes polling with one refresh)
+        self.plugin_base.idle_monitor.touch()
+
         # Stop time tracking when button is pressed
         self.stop_time_tracking()
     
@@ -34,116 +60,101 @@ class StopTracking(ActionBase):
     
     def stop_time_tracking(self) -> None:
         """Stop time tracking in Kimai"""
-        plugin_global_settings = self.plugin_base.get_settings()
-        
-        # Get global configuration
-        kimai_url = plugin_global_settings.get("global_kimai_url", "")
-        api_token = plugin_global_settings.get("global_api_token", "")
+        profile = self.kimai_instance().profile
         
-        if not all([kimai_url, api_token]):
+        if not profile.is_configured:
             self.show_error()
             return
         
-        # Run in separate thread to avoid blocking UI
-        threading.Thread(target=self._stop_tracking_request, 
-                        args=(kimai_url, api_token),
-                        daemon=True).start()
+        # Runs on the queue's thread to avoid blocking UI; a press for another instance is a new command
+        self.commands.submit(profile)
     
-    def _stop_tracking_request(self, kimai_url: str, api_token: str) -> None:
+    def _stop_tracking_request(self, profile: ConnectionProfile) -> None:
         """Make the API request to stop tracking"""
         try:
-            # First, get the active timesheet
-            active_id = self._get_active_timesheet_id(kimai_url, api_token)
-            
-            if active_id is None:
-                self.show_error()
-                return
-            
-            # Stop the active timesheet
-            url = f"{kimai_url.rstrip('/')}/api/timesheets/{active_id}/stop"
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
+            # Stop the entry we already know is running: one round trip instead of lookup + stop
+            active_id = self.plugin_base.known_active_timesheet_id(profile.id)
+            response = self._stop_timesheet(profile, active_id) if active_id is not None else None
             
-            response = requests.patch(url, headers=headers, timeout=10)
+            # 404: the known entry is gone; 400: Kimai says it was already stopped (e.g. from the web UI)
+            if response is None or response.status_code in [400, 404]:
+                if response is not None:
+                    log.info("Known active timesheet {} could not be stopped (status {}), looking up the active one",
+                             active_id, response.status_code)
+                looked_up_id = self._get_active_timesheet_id(profile)
+                
+                if looked_up_id is None or looked_up_id == active_id:
+                    self.show_error()
+                    return
+                
+                active_id = looked_up_id
+                response = self._stop_timesheet(profile, active_id)
             
             if response.status_code in [200, 201]:
-                log.info(f"Successfully stopped time tracking for timesheet ID {active_id}")
+                log.info("Successfully stopped time tracking for timesheet ID {}", active_id)
                 
                 # Notify all StartTracking instances that timesheet was stopped
-                self.plugin_base.notify_timesheet_stopped()
+                self.plugin_base.notify_timesheet_stopped(profile.id)
                 
                 self.show_success()
             else:
-                log.error(f"Failed to stop time tracking. Status: {response.status_code}")
-                log.error(f"Response body: {response.text}")
-                log.error(f"Request URL: {url}")
-                log.error(f"Timesheet ID: {active_id}")
+                log.error("Failed to stop time tracking. Status: {}", response.status_code)
+                log.error("Response body: {}", response.text)
+                log.error("Request URL: {}", response.url)
+                log.error("Timesheet ID: {}", active_id)
                 self.show_error()
                 
         except requests.exceptions.Timeout:
-            log.error(f"Timeout while stopping time tracking. URL: {kimai_url}")
+            log.error("Timeout while stopping time tracking. URL: {}", profile.base_url)
             self.show_error()
         except requests.exceptions.ConnectionError:
-            log.error(f"Connection error while stopping time tracking. URL: {kimai_url}")
+            log.error("Connection error while stopping time tracking. URL: {}", profile.base_url)
             self.show_error()
         except requests.exceptions.RequestException as e:
-            log.error(f"HTTP request error while stopping time tracking: {e}")
-            log.error(f"URL: {kimai_url}")
+            log.error("HTTP request error while stopping time tracking: {}", e)
+            log.error("URL: {}", profile.base_url)
             self.show_error()
         except Exception as e:
-            log.error(f"Unexpected error stopping time tracking: {e}")
-            log.error(f"URL: {kimai_url}")
+            log.error("Unexpected error stopping time tracking: {}", e)
+            log.error("URL: {}", profile.base_url)
             self.show_error()
     
-    def _get_active_timesheet_id(self, kimai_url: str, api_token: str) -> Optional[int]:
+    def _stop_timesheet(self, profile: ConnectionProfile, timesheet_id: int) -> requests.Response:
+        """PATCH the stop endpoint of a timesheet"""
+        url = profile.url(f"/api/timesheets/{timesheet_id}/stop")
+        return self.plugin_base.get_kimai_instance(profile.id).kimai_api.session.patch(url, headers=profile.headers, timeout=10)
+    
+    def _get_active_timesheet_id(self, profile: ConnectionProfile) -> Optional[int]:
         """Get the ID of the currently active timesheet"""
         try:
-            url = f"{kimai_url.rstrip('/')}/api/timesheets"
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
-            
-            params = {"active": "1"}
-            
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data and len(data) > 0:
-                    active_id = data[0].get("id")
-                    log.info(f"Found active timesheet with ID: {active_id}")
-                    return active_id
-                else:
-                    log.warning("No active timesheet found")
-                    return None
+            active_id = self.plugin_base.get_kimai_instance(profile.id).kimai_api.get_active_timesheet_id(profile)
+            if active_id is not None:
+                log.info("Found active timesheet with ID: {}", active_id)
             else:
-                log.error(f"Failed to get active timesheet. Status: {response.status_code}")
-                log.error(f"Response body: {response.text}")
-                log.error(f"Request URL: {url}")
-                return None
+                log.warning("No active timesheet found")
+            return active_id
             
         except requests.exceptions.Timeout:
-            log.error(f"Timeout while getting active timesheet. URL: {kimai_url}")
+            log.error("Timeout while getting active timesheet. URL: {}", profile.base_url)
             return None
         except requests.exceptions.ConnectionError:
-            log.error(f"Connection error while getting active timesheet. URL: {kimai_url}")
+            log.error("Connection error while getting active timesheet. URL: {}", profile.base_url)
             return None
         except requests.exceptions.RequestException as e:
-            log.error(f"HTTP request error while getting active timesheet: {e}")
-            log.error(f"URL: {kimai_url}")
+            log.error("HTTP request error while getting active timesheet: {}", e)
+            log.error("URL: {}", profile.base_url)
             return None
         except Exception as e:
-            log.error(f"Unexpected error getting active timesheet: {e}")
-            log.error(f"URL: {kimai_url}")
+            log.error("Unexpected error getting active timesheet: {}", e)
+            log.error("URL: {}", profile.base_url)
             return None
     
+    @main_thread_only("feedback")
     def show_success(self) -> None:
         """Show success indicator"""
         self.set_background_color([0, 255, 0, 100])  # Green background
         
+    @main_thread_only("feedback")
     def show_error(self) -> None:
         """Show error indicator"""
         self.set_background_color([255, 0, 0, 100])  # Red background
@@ -154,9 +165,37 @@ class StopTracking(ActionBase):
         
         # Info row
         info_row = Adw.ActionRow(title="Global Settings")
-        info_row.set_subtitle("Configure Kimai URL and API Token in Plugin Settings")
+        info_row.set_subtitle("Configure Kimai URL, API Token and additional instances in Plugin Settings")
+        
+        # Kimai instance (connection profile) selector
+        profiles = self.plugin_base.get_profiles()
+        self.profile_ids = [profile.id for profile in profiles]
+        self.profile_dropdown = Adw.ComboRow(title="Kimai Instance")
+        self.profile_model = Gtk.StringList()
+        for profile in profiles:
+            self.profile_model.append(profile.label)
+        self.profile_dropdown.set_model(self.profile_model)
+        current_profile = action_profile_id(self.settings_snapshot.get())
+        if current_profile in self.profile_ids:
+            self.profile_dropdown.set_selected(self.profile_ids.index(current_profile))
+        self.profile_dropdown.connect("notify::selected", self.on_profile_changed)
         
         return super_rows + [
-            info_row
+            info_row,
+            self.profile_dropdown
         ]
+    
+    def on_profile_changed(self, dropdown, *args) -> None:
+        """Handle Kimai instance selection change"""
+        try:
+            selected_index = dropdown.get_selected()
+            if selected_index == Gtk.INVALID_LIST_POSITION or selected_index >= len(self.profile_ids):
+                return
+            
+            settings = self.get_settings()
+            settings["profile_id"] = self.profile_ids[selected_index]
+            settings.pop("profile_name", None)  # Superseded by profile_id
+            self.set_settings(settings)
+        except Exception as e:
+            log.error("Error in on_profile_changed: {}", e)
 
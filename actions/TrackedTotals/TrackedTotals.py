@@ -0,0 +1,338 @@
+# Import StreamController modules
+from src.backend.PluginManager.ActionBase import ActionBase
+from src.backend.DeckManagement.DeckController import DeckController
+from src.backend.PageManagement.Page import Page
+from src.backend.PluginManager.PluginBase import PluginBase
+
+# Import python modules
+import requests
+import threading
+from typing import Optional
+
+# Import gtk modules - used for the config rows
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw
+
+from ...catalog_query import CatalogQuery
+from ...kimai_records import Timesheet
+from ...model_fill import ModelFill
+from ...settings_cache import ConnectionProfile, SettingsSnapshot, action_profile_id
+from ...source_scheduler import WHEN_IDLE_STRETCH
+from ...totals_cache import format_duration
+from ...ui_dispatcher import UiDispatcher, main_thread_only
+from ...plugin_log import get_logger
+
+log = get_logger("ui")
+
+class TrackedTotals(ActionBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Cached read-only view of this action's settings
+        self.settings_snapshot = SettingsSnapshot(self.get_settings)
+
+        # Shared active-timesheet poller of this button's Kimai instance
+        self.subscribed_poller = None
+
+        # Minute tick that adds the running entry's elapsed time to the totals
+        self.render_timer_id = None
+
+        # Project filter rows still being added on the main loop
+        self.project_fill = None
+
+        # Renders from the poller and request threads are coalesced onto the main loop
+        self.ui = UiDispatcher(self)
+
+    def set_settings(self, settings) -> None:
+        """Save action settings and refresh the cached snapshot"""
+        super().set_settings(settings)
+        self.settings_snapshot.invalidate()
+
+    def on_ready(self) -> None:
+        # Re-arm the minute tick suspended while the page was hidden
+        self.plugin_base.source_scheduler.resume_owner(self)
+
+        # Set the default icon for the totals display
+        self.set_media(media_path=self.plugin_base.get_asset_path("info.png"), size=0.75)
+
+        self.plugin_base.register_action_instance(self)
+        self._subscribe_to_poller()
+
+        # Render what is already aggregated, then load the week once if needed
+        self.render()
+        self.load_totals()
+
+        if self.render_timer_id is None:
+            self.render_timer_id = self.plugin_base.source_scheduler.timeout_add_seconds(
+                self, 60, self._on_render_timer, when_idle=WHEN_IDLE_STRETCH
+            )
+
+    def on_key_down(self) -> None:
+        # Any key press ends idle mode (resumes polling with one refresh)
+        self.plugin_base.idle_monitor.touch()
+
+        # Re-download the week to pick up entries edited elsewhere
+        try:
+            log.info("TrackedTotals button pressed - reloading the week")
+            self.load_totals(force=True)
+        except Exception as e:
+            log.error("Error in on_key_down: {}", e)
+
+    def on_key_up(self) -> None:
+        pass
+
+    def kimai_instance(self):
+        """The Kimai instance (connection, caches, poller) selected for this button"""
+        return self.plugin_base.get_kimai_instance(action_profile_id(self.settings_snapshot.get()))
+
+    def _project_filter(self):
+        """Project id to total, or None for all projects"""
+        return self.settings_snapshot.get().get("project_id") or None
+
+    def _subscribe_to_poller(self) -> None:
+        """Follow starts and stops through the instance's shared poller"""
+        try:
+            poller = self.kimai_instance().active_poller
+            if self.subscribed_poller is not None and self.subscribed_poller is not poller:
+                self.subscribed_poller.unsubscribe(self._on_active_timesheet_polled)
+            poller.subscribe(self._on_active_timesheet_polled, periodic=True)
+            self.subscribed_poller = poller
+        except Exception as e:
+            log.error("Error subscribing to active timesheet poller: {}", e)
+
+    def load_totals(self, force: bool = False) -> None:
+        """Load this week's timesheets in the background unless already loaded"""
+        instance = self.kimai_instance()
+        if not instance.profile.is_configured:
+            self._show_no_config()
+            return
+        if instance.tracked_totals.is_current and not force:
+            return
+
+        thread = threading.Thread(target=self._load_totals, args=(instance, force), daemon=True)
+        thread.start()
+
+    def _load_totals(self, instance, force: bool) -> None:
+        """Fetch the week (runs in background thread)"""
+        try:
+            if instance.tracked_totals.load(instance.profile, force=force):
+                # Account for an entry that started or stopped while the week was downloading
+                poller = instance.active_poller
+                if poller.last_ok:
+                    instance.tracked_totals.apply_active(poller.last_timesheet)
+                self.render()
+            else:
+                self._show_error()
+        except requests.exceptions.RequestException as e:
+            log.error("HTTP request error while loading tracked totals: {}", e)
+            log.error("Kimai URL: {}", instance.profile.base_url)
+            self._show_error()
+        except Exception as e:
+            log.error("Unexpected error loading tracked totals: {}", e)
+            self._show_error()
+
+    def _on_active_timesheet_polled(self, timesheet: Optional[Timesheet], ok: bool) -> None:
+        """Move the running entry in or out of the totals (called from the poller thread)"""
+        if not ok:
+            return
+        self.kimai_instance().tracked_totals.apply_active(timesheet)
+        self.render()
+
+    def _on_render_timer(self) -> bool:
+        # A new week starts from a fresh download
+        if not self.kimai_instance().tracked_totals.is_current:
+            self.load_totals()
+        self.render()
+        return True  # Continue the timer
+
+    @main_thread_only("totals")
+    def render(self) -> None:
+        """Show today's and this week's totals"""
+        try:
+            totals = self.kimai_instance().tracked_totals
+            if not totals.is_current:
+                self.set_top_label("Today", font_size=9)
+                self.set_center_label("…", font_size=12)
+                self.set_bottom_label("")
+                return
+
+            today, week = totals.totals(self._project_filter())
+            self.set_top_label("Today", font_size=9)
+            self.set_center_label(format_duration(today), font_size=14)
+            self.set_bottom_label(f"Week {format_duration(week)}", font_size=10)
+            self.set_background_color([0, 0, 0, 0])  # Transparent background
+        except Exception as e:
+            log.error("Error rendering tracked totals: {}", e)
+
+    @main_thread_only("totals")
+    def _show_no_config(self) -> None:
+        """Show display when configuration is missing"""
+        try:
+            self.set_top_label("")
+            self.set_center_label("Config", font_size=10)
+            self.set_bottom_label("Missing", font_size=10)
+            self.set_background_color([100, 100, 0, 80])  # Yellow background
+            log.warning("Tracked totals: Configuration missing")
+        except Exception as e:
+            log.error("Error showing no config: {}", e)
+
+    @main_thread_only("totals")
+    def _show_error(self) -> None:
+        """Show error indicator"""
+        try:
+            self.set_top_label("")
+            self.set_center_label("Error", font_size=12)
+            self.set_bottom_label("")
+            self.set_background_color([100, 0, 0, 80])  # Red background
+        except Exception as e:
+            log.error("Error showing error state: {}", e)
+
+    def on_connection_profile_changed(self, profile: ConnectionProfile) -> None:
+        """Handle a changed Kimai URL or API token"""
+        try:
+            self._subscribe_to_poller()
+            self.render()
+            self.load_totals()
+        except Exception as e:
+            log.error("Error handling connection profile change: {}", e)
+
+    def on_profile_changed(self, dropdown, *args) -> None:
+        """Handle Kimai instance selection change"""
+        try:
+            selected_index = dropdown.get_selected()
+            if selected_index == Gtk.INVALID_LIST_POSITION or selected_index >= len(self.profile_ids):
+                return
+
+            settings = self.get_settings()
+            settings["profile_id"] = self.profile_ids[selected_index]
+            settings.pop("profile_name", None)  # Superseded by profile_id
+            settings["project_id"] = None  # Projects belong to the previous instance
+            self.set_settings(settings)
+
+            self._subscribe_to_poller()
+            self.render()
+            self.load_totals()
+            self.load_projects()
+        except Exception as e:
+            log.error("Error in on_profile_changed: {}", e)
+
+    def on_project_changed(self, dropdown, *args) -> None:
+        """Handle project filter change"""
+        try:
+            selected_index = dropdown.get_selected()
+            if selected_index == Gtk.INVALID_LIST_POSITION or selected_index >= len(self.project_ids):
+                return
+
+            settings = self.get_settings()
+            settings["project_id"] = self.project_ids[selected_index]
+            self.set_settings(settings)
+            self.render()
+        except Exception as e:
+            log.error("Error in on_project_changed: {}", e)
+
+    def load_projects(self) -> None:
+        """Fill the project filter from the catalog cache, fetching it once if empty"""
+        # Projects only known from timesheets don't count; the filter lists the catalog
+        if self.kimai_instance().catalog_cache.search_projects("", limit=1):
+            self._update_projects_dropdown()
+            return
+        thread = threading.Thread(target=self._fetch_projects, daemon=True)
+        thread.start()
+
+    def _fetch_projects(self) -> None:
+        """Fetch projects from Kimai API (runs in background thread)"""
+        instance = self.kimai_instance()
+        profile = instance.profile
+        try:
+            if not profile.is_configured:
+                return
+
+            # Remembered in the catalog cache, which the dropdown is built from
+            if instance.kimai_api.get_catalog(profile, CatalogQuery.projects().order_by("name")) is not None:
+                self._update_projects_dropdown()
+        except requests.exceptions.RequestException as e:
+            log.error("HTTP request error while fetching projects: {}", e)
+            log.error("Kimai URL: {}", profile.base_url)
+        except Exception as e:
+            log.error("Unexpected error fetching projects: {}", e)
+
+    @main_thread_only("projects")
+    def _update_projects_dropdown(self) -> None:
+        """Rebuild the project filter from the catalog cache"""
+        try:
+            projects = self.kimai_instance().catalog_cache.search_projects("")
+            self.project_ids = [None] + [project.id for project in projects]
+
+            # Fill in chunks so a large catalog doesn't stall the main loop
+            if self.project_fill is not None:
+                self.project_fill.cancel()
+            self.project_fill = ModelFill(self.project_model, ["All Projects"] + [project.name for project in projects],
+                                          dropdown=self.project_dropdown, handler=self.on_project_changed,
+                                          on_done=self._restore_project_selection)
+            self.project_fill.start()
+        except Exception as e:
+            log.error("Error updating projects dropdown: {}", e)
+
+    def _restore_project_selection(self) -> None:
+        """Select the saved project filter once the dropdown is filled"""
+        current_project = self._project_filter()
+        self.project_dropdown.set_selected(self.project_ids.index(current_project) if current_project in self.project_ids else 0)
+
+    def get_config_rows(self) -> list:
+        """Return configuration UI rows"""
+        try:
+            super_rows = super().get_config_rows()
+
+            # Info row
+            info_row = Adw.ActionRow(title="Tracked Totals")
+            info_row.set_subtitle("Shows today's and this week's tracked hours. Press the button to reload the week from Kimai.")
+
+            # Kimai instance (connection profile) selector
+            profiles = self.plugin_base.get_profiles()
+            self.profile_ids = [profile.id for profile in profiles]
+            self.profile_dropdown = Adw.ComboRow(title="Kimai Instance")
+            self.profile_model = Gtk.StringList()
+            for profile in profiles:
+                self.profile_model.append(profile.label)
+            self.profile_dropdown.set_model(self.profile_model)
+            current_profile = action_profile_id(self.settings_snapshot.get())
+            if current_profile in self.profile_ids:
+                self.profile_dropdown.set_selected(self.profile_ids.index(current_profile))
+            self.profile_dropdown.connect("notify::selected", self.on_profile_changed)
+
+            # Optional project filter
+            if self.project_fill is not None:
+                self.project_fill.cancel()
+            self.project_ids = [None]
+            self.project_dropdown = Adw.ComboRow(title="Project")
+            self.project_dropdown.set_subtitle("Only count time tracked on this project")
+            self.project_model = Gtk.StringList()
+            self.project_model.append("All Projects")
+            self.project_dropdown.set_model(self.project_model)
+            self.project_dropdown.connect("notify::selected", self.on_project_changed)
+            self.load_projects()
+
+            return super_rows + [
+                info_row,
+                self.profile_dropdown,
+                self.project_dropdown
+            ]
+
+        except Exception as e:
+            log.error("Error building configuration UI: {}", e)
+            return super().get_config_rows()
+
+    def __del__(self):
+        """Cleanup when action is destroyed"""
+        try:
+            if getattr(self, 'subscribed_poller', None) is not None:
+                self.subscribed_poller.unsubscribe(self._on_active_timesheet_polled)
+                self.subscribed_poller = None
+
+            if hasattr(self, 'plugin_base') and self.plugin_base is not None:
+                self.plugin_base.source_scheduler.remove(self.render_timer_id)
+                self.plugin_base.unregister_action_instance(self)
+        except Exception as e:
+            log.error("Error during TrackedTotals cleanup: {}", e)
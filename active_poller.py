@@ -0,0 +1,192 @@
+# Import python modules
+import threading
+import time
+import weakref
+from typing import Callable, Optional
+
+from .kimai_records import Timesheet
+from .source_scheduler import WHEN_IDLE_PAUSE, action_is_visible
+from .plugin_log import get_logger
+
+log = get_logger("poller")
+
+class ActiveTimesheetPoller:
+    """Single active-timesheet poll per Kimai instance, shared by all of its buttons.
+
+    Buttons subscribe with ``callback(timesheet, ok)`` (a ``Timesheet`` record
+    whose names are in the catalog cache, or None) instead of polling on
+    their own. Bound-method callbacks are held weakly, so a subscription
+    never keeps a discarded action alive. Refresh requests while a fetch is in flight are coalesced into
+    one follow-up fetch, and the periodic timer only runs while at least one
+    subscriber asked for periodic updates. The timer lives in the plugin's
+    source scheduler and is suspended while none of those subscribers'
+    pages is shown, and paused while the plugin is idle.
+    """
+
+    def __init__(self, kimai_api, profile, scheduler, interval: int = 30):
+        self.kimai_api = kimai_api
+        self.profile = profile
+        self.scheduler = scheduler
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._subscribers = {}  # callback reference -> wants periodic updates
+        self._timer_id = None
+        self._in_flight = False
+        self._refresh_again = False
+
+        # Last delivered result
+        self.last_timesheet = None
+        self.last_ok = False
+        self.last_polled_at = None
+
+    def subscribe(self, callback: Callable[[Optional[Timesheet], bool], None], periodic: bool = False) -> None:
+        """Receive every poll result; ``periodic`` keeps the interval timer running"""
+        ref = _callback_ref(callback)
+        with self._lock:
+            self._subscribers[ref] = periodic or self._subscribers.get(ref, False)
+        self._update_timer()
+
+    def unsubscribe(self, callback) -> None:
+        with self._lock:
+            self._subscribers.pop(_callback_ref(callback), None)
+        self._update_timer()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            self._prune_locked()
+            return len(self._subscribers)
+
+    def adopt(self, other: "ActiveTimesheetPoller") -> None:
+        """Take over the subscribers of a poller for a replaced profile"""
+        with other._lock:
+            subscribers = [(ref(), periodic) for ref, periodic in other._subscribers.items()]
+        other.stop()
+        with self._lock:
+            for callback, periodic in subscribers:
+                if callback is not None:
+                    self._subscribers[_callback_ref(callback)] = periodic
+        self._update_timer()
+
+    def refresh(self) -> None:
+        """Fetch the active timesheet now (coalesced with a fetch already running)"""
+        if not self.profile.is_configured:
+            return
+
+        with self._lock:
+            if self._in_flight:
+                self._refresh_again = True
+                return
+            self._in_flight = True
+
+        threading.Thread(target=self._poll, daemon=True).start()
+
+    @property
+    def has_periodic_subscribers(self) -> bool:
+        with self._lock:
+            self._prune_locked()
+            return any(self._subscribers.values())
+
+    def stop(self) -> None:
+        """Stop the timer and drop all subscribers"""
+        with self._lock:
+            self._subscribers = {}
+        self._update_timer()
+
+    def _poll(self) -> None:
+        while True:
+            ok = False
+            timesheet = None
+            try:
+                timesheet = self.kimai_api.get_active_timesheet_record(self.profile)
+                ok = True
+            except Exception as e:
+                # Repeats on every poll while Kimai is unreachable
+                log.every(f"poll-error:{self.profile.name}", 300).error("Error polling active timesheet for profile '{}': {}", self.profile.name, e)
+
+            with self._lock:
+                self.last_timesheet = timesheet
+                self.last_ok = ok
+                self.last_polled_at = time.monotonic()
+                self._prune_locked()
+                subscribers = [ref() for ref in self._subscribers]
+
+            for callback in subscribers:
+                if callback is None:
+                    continue
+                try:
+                    callback(timesheet, ok)
+                except Exception as e:
+                    log.error("Error delivering active timesheet to subscriber: {}", e)
+
+            with self._lock:
+                # A refresh was requested while we were fetching; the state may have changed since
+                if not self._refresh_again:
+                    self._in_flight = False
+                    return
+                self._refresh_again = False
+
+    def _update_timer(self) -> None:
+        with self._lock:
+            self._prune_locked()
+            wants_timer = any(self._subscribers.values())
+            timer_id = self._timer_id
+            if not wants_timer:
+                self._timer_id = None
+
+        if wants_timer and timer_id is None:
+            timer_id = self.scheduler.timeout_add_seconds(self, self.interval, self._on_timer,
+                                                          is_visible=ActiveTimesheetPoller._has_visible_subscriber,
+                                                          when_idle=WHEN_IDLE_PAUSE)
+            with self._lock:
+                self._timer_id = timer_id
+        elif wants_timer:
+            # A subscriber may have come back into view
+            self.scheduler.resume_owner(self)
+        elif timer_id is not None:
+            self.scheduler.remove(timer_id)
+
+    def _has_visible_subscriber(self) -> bool:
+        """Whether any periodic subscriber's action is on the page currently shown"""
+        with self._lock:
+            periodic = [ref() for ref, wants in self._subscribers.items() if wants]
+        return any(action_is_visible(getattr(callback, "__self__", None)) for callback in periodic if callback is not None)
+
+    def _prune_locked(self) -> None:
+        """Forget subscriptions of actions that were garbage collected without unsubscribing"""
+        if any(ref() is None for ref in self._subscribers):
+            self._subscribers = {ref: periodic for ref, periodic in self._subscribers.items() if ref() is not None}
+
+    def _on_timer(self) -> bool:
+        if not self.has_periodic_subscribers:
+            # The buttons that wanted periodic updates are gone
+            with self._lock:
+                self._timer_id = None
+            return False
+        self.refresh()
+        return True  # Continue the timer
+
+
+def _callback_ref(callback):
+    """Weak reference to a bound method, or a strong stand-in for plain functions"""
+    if hasattr(callback, "__self__"):
+        return weakref.WeakMethod(callback)
+    return _StrongRef(callback)
+
+
+class _StrongRef:
+    """Same interface as a weak reference, for callbacks that are not bound methods"""
+    __slots__ = ("callback",)
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def __call__(self):
+        return self.callback
+
+    def __eq__(self, other):
+        return isinstance(other, _StrongRef) and other.callback == self.callback
+
+    def __hash__(self):
+        return hash(self.callback)
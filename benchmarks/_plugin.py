@@ -0,0 +1,17 @@
+"""Import the plugin's modules as a package without loading main.py (and StreamController)."""
+import importlib
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "kimai_plugin"
+
+
+def plugin_module(name: str):
+    """Import ``<repo root>/<name>.py`` as ``kimai_plugin.<name>`` so its relative imports work"""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [ROOT]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{name}")
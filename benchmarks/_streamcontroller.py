@@ -0,0 +1,263 @@
+"""Headless stand-ins for StreamController's plugin API and for GLib, used by the soak harness.
+
+``install()`` registers fake ``src.backend`` and ``gi`` modules so main.py and
+the actions import without StreamController or PyGObject. GLib is replaced by
+``VirtualLoop``, which runs timeouts on a virtual clock: a simulated work
+week takes minutes, and every live source is countable. GTK widgets are
+inert placeholders; configuration panels are not exercised.
+"""
+import heapq
+import itertools
+import os
+import sys
+import threading
+import traceback
+import types
+
+
+class VirtualLoop:
+    """GLib timeouts and idle callbacks on a virtual clock.
+
+    Time only advances inside ``run_for``. ``idle_add`` may be called from
+    any thread (the plugin's workers do); queued callbacks run on the thread
+    that drives the loop, like GLib's default main context.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.callbacks_run = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._order = itertools.count()
+        self._sources = {}  # source id -> (interval in seconds, callback, args)
+        self._queue = []    # (due, order, source id)
+
+    @property
+    def live_sources(self) -> int:
+        with self._lock:
+            return len(self._sources)
+
+    def timeout_add(self, interval_ms, callback, *args, **kwargs) -> int:
+        return self._add(interval_ms / 1000, callback, args)
+
+    def timeout_add_seconds(self, interval, callback, *args, **kwargs) -> int:
+        return self._add(float(interval), callback, args)
+
+    def idle_add(self, callback, *args, **kwargs) -> int:
+        return self._add(0.0, callback, args)
+
+    def source_remove(self, source_id) -> bool:
+        with self._lock:
+            return self._sources.pop(source_id, None) is not None
+
+    def _add(self, interval: float, callback, args: tuple) -> int:
+        with self._lock:
+            source_id = next(self._ids)
+            self._sources[source_id] = (interval, callback, args)
+            heapq.heappush(self._queue, (self.now + interval, next(self._order), source_id))
+            return source_id
+
+    def run_for(self, seconds: float) -> None:
+        """Dispatch everything due within the next ``seconds`` of virtual time"""
+        end = self.now + seconds
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > end:
+                    self.now = end
+                    return
+                due, _, source_id = heapq.heappop(self._queue)
+                source = self._sources.get(source_id)
+                if source is None:
+                    continue  # Removed before it fired
+                self.now = max(self.now, due)
+
+            interval, callback, args = source
+            try:
+                keep = callback(*args)
+            except Exception:
+                self.errors += 1
+                traceback.print_exc()
+                keep = False
+            self.callbacks_run += 1
+
+            with self._lock:
+                if source_id not in self._sources:
+                    continue  # Removed itself while running
+                if keep:
+                    heapq.heappush(self._queue, (self.now + interval, next(self._order), source_id))
+                else:
+                    del self._sources[source_id]
+
+
+class _Inert:
+    """Accepts any attribute access or call; stands in for GTK/Adw widgets"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _Inert()
+
+    def __call__(self, *args, **kwargs):
+        return _Inert()
+
+
+class _InputType:
+    """An input identifier such as a key or a dial at a position"""
+
+    def __init__(self, json_identifier: str):
+        self.json_identifier = json_identifier
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.json_identifier!r})"
+
+
+class Input:
+    class Key(_InputType):
+        class Events:
+            DOWN = "key-down"
+            UP = "key-up"
+
+    class Dial(_InputType):
+        class Events:
+            DOWN = "dial-down"
+            UP = "dial-up"
+            TURN_CW = "dial-turn-cw"
+            TURN_CCW = "dial-turn-ccw"
+
+    class Touchscreen(_InputType):
+        class Events:
+            DRAG_LEFT = "drag-left"
+            DRAG_RIGHT = "drag-right"
+
+
+class ActionInputSupport:
+    SUPPORTED = "supported"
+    UNTESTED = "untested"
+    UNSUPPORTED = "unsupported"
+
+
+class ActionHolder:
+    def __init__(self, plugin_base=None, action_base=None, action_id=None, action_name=None, action_support=None):
+        self.plugin_base = plugin_base
+        self.action_base = action_base
+        self.action_id = action_id
+        self.action_name = action_name
+        self.action_support = action_support or {}
+
+
+class Page:
+    def __init__(self, json_path: str):
+        self.json_path = json_path
+
+
+class DeckController:
+    def __init__(self, active_page=None):
+        self.active_page = active_page
+
+
+class PluginBase:
+    # Set by the harness before the plugin is constructed
+    PATH = None
+    initial_settings = {}
+
+    def __init__(self):
+        self._settings = dict(self.initial_settings)
+        self.action_holders = {}
+
+    def get_settings(self) -> dict:
+        return dict(self._settings)
+
+    def set_settings(self, settings) -> None:
+        self._settings = dict(settings)
+
+    def add_icon(self, *args, **kwargs) -> None:
+        pass
+
+    def add_color(self, *args, **kwargs) -> None:
+        pass
+
+    def add_action_holder(self, holder) -> None:
+        self.action_holders[holder.action_id] = holder
+
+    def register(self, **kwargs) -> None:
+        pass
+
+    def get_asset_path(self, name: str) -> str:
+        return os.path.join(self.PATH or "", "assets", name)
+
+
+class ActionBase:
+    def __init__(self, action_id, action_name, deck_controller, page, plugin_base, state=0, input_ident=None, settings=None):
+        self.action_id = action_id
+        self.action_name = action_name
+        self.deck_controller = deck_controller
+        self.page = page
+        self.plugin_base = plugin_base
+        self.state = state
+        self.input_ident = input_ident
+        self._settings = dict(settings or {})
+        self.renders = 0
+
+    def get_settings(self) -> dict:
+        return dict(self._settings)
+
+    def set_settings(self, settings) -> None:
+        self._settings = dict(settings)
+
+    def _render(self, *args, **kwargs) -> None:
+        self.renders += 1
+
+    set_media = set_top_label = set_center_label = set_bottom_label = set_label = set_background_color = _render
+
+    def get_config_rows(self) -> list:
+        return []
+
+    def event_callback(self, event, data=None) -> None:
+        if event in (Input.Key.Events.DOWN, Input.Dial.Events.DOWN):
+            self.on_key_down()
+        elif event in (Input.Key.Events.UP, Input.Dial.Events.UP):
+            self.on_key_up()
+
+    def on_ready(self) -> None:
+        pass
+
+    def on_key_down(self) -> None:
+        pass
+
+    def on_key_up(self) -> None:
+        pass
+
+
+def _module(name: str, **attributes) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    module.__path__ = []  # Importable as a package
+    sys.modules[name] = module
+    return module
+
+
+def install(loop: VirtualLoop) -> None:
+    """Register the fake StreamController and gi modules (before importing the plugin)"""
+    for name in ("src", "src.backend", "src.backend.PluginManager", "src.backend.DeckManagement", "src.backend.PageManagement"):
+        _module(name)
+    _module("src.backend.PluginManager.ActionBase", ActionBase=ActionBase)
+    _module("src.backend.PluginManager.PluginBase", PluginBase=PluginBase)
+    _module("src.backend.PluginManager.ActionHolder", ActionHolder=ActionHolder)
+    _module("src.backend.PluginManager.ActionInputSupport", ActionInputSupport=ActionInputSupport)
+    _module("src.backend.DeckManagement.DeckController", DeckController=DeckController)
+    _module("src.backend.DeckManagement.InputIdentifier", Input=Input)
+    _module("src.backend.PageManagement.Page", Page=Page)
+
+    glib = types.SimpleNamespace(
+        timeout_add=loop.timeout_add,
+        timeout_add_seconds=loop.timeout_add_seconds,
+        idle_add=loop.idle_add,
+        source_remove=loop.source_remove,
+        PRIORITY_DEFAULT_IDLE=200,
+    )
+    gtk = _Inert()
+    gtk.INVALID_LIST_POSITION = 4294967295
+    _module("gi", require_version=lambda *args: None)
+    _module("gi.repository", GLib=glib, Gtk=gtk, Adw=_Inert(), Gio=_Inert())
@@ -0,0 +1,210 @@
+"""In-process stub of the Kimai endpoints the plugin uses, for the soak harness.
+
+Serves a small catalog and keeps timesheets in memory: starting an entry
+stops the running one, stop/restart work on existing ids (stopping a
+finished entry is a 400, as in Kimai), and list queries
+honour the filters and pagination headers the plugin relies on.
+"""
+import json
+import re
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TOKEN = "soak-test-token-0123456789"
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+class KimaiState:
+    def __init__(self, customers: int = 5, projects: int = 40, activities: int = 12):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.customers = [{"id": c, "name": f"Customer {c}", "visible": True} for c in range(1, customers + 1)]
+        self.projects = [{"id": p, "name": f"Project {p}", "customer": (p - 1) % customers + 1, "visible": True}
+                         for p in range(1, projects + 1)]
+        self.activities = [{"id": a, "name": f"Activity {a}", "project": None if a <= activities // 2 else (a % projects) + 1,
+                            "visible": True} for a in range(1, activities + 1)]
+        self.timesheets = {}
+        self._next_id = 1
+
+    def expanded(self, timesheet: dict) -> dict:
+        project = dict(self.projects[timesheet["project"] - 1])
+        project["customer"] = dict(self.customers[project["customer"] - 1])
+        return dict(timesheet, project=project, activity=dict(self.activities[timesheet["activity"] - 1]))
+
+    def start(self, project: int, activity: int, description: str = "") -> dict:
+        now = datetime.now().strftime(DATETIME_FORMAT)
+        for timesheet in self.timesheets.values():
+            if timesheet["end"] is None:
+                self._stop(timesheet, now)
+        timesheet = {"id": self._next_id, "begin": now, "end": None, "duration": 0, "project": project,
+                     "activity": activity, "description": description, "modified": now}
+        self.timesheets[self._next_id] = timesheet
+        self._next_id += 1
+        return timesheet
+
+    def stop(self, timesheet_id: int):
+        timesheet = self.timesheets.get(timesheet_id)
+        if timesheet is None:
+            return None
+        if timesheet["end"] is None:
+            self._stop(timesheet, datetime.now().strftime(DATETIME_FORMAT))
+        return timesheet
+
+    def _stop(self, timesheet: dict, now: str) -> None:
+        timesheet["end"] = now
+        timesheet["modified"] = now
+        begin = datetime.strptime(timesheet["begin"], DATETIME_FORMAT)
+        timesheet["duration"] = int((datetime.now() - begin).total_seconds())
+
+
+def _catalog_filter(entries: list, query: dict) -> list:
+    """Kimai's visible (1 visible, 2 hidden, 3 both) and term filters of the catalog lists"""
+    visible = query.get("visible", "1")
+    term = query.get("term", "").casefold()
+    return [entry for entry in entries
+            if (visible == "3" or entry["visible"] == (visible == "1")) and term in entry["name"].casefold()]
+
+
+def _local_datetime(value: str) -> datetime:
+    """A query datetime, with or without UTC offset, as naive local time like the stub's own"""
+    try:
+        return datetime.strptime(value, DATETIME_FORMAT + "%z").astimezone().replace(tzinfo=None)
+    except ValueError:
+        return datetime.strptime(value, DATETIME_FORMAT)
+
+
+def _make_handler(state: KimaiState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass  # Keep the harness output readable
+
+        def _send(self, status: int, body=None, headers: dict = None) -> None:
+            payload = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _authorized(self) -> bool:
+            if self.headers.get("Authorization") == f"Bearer {TOKEN}":
+                return True
+            self._send(401, {"message": "Unauthorized"})
+            return False
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        def do_GET(self) -> None:
+            if not self._authorized():
+                return
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            with state.lock:
+                state.requests += 1
+                if url.path == "/api/customers":
+                    return self._send(200, _catalog_filter(state.customers, query))
+                if url.path == "/api/projects":
+                    customer = query.get("customer")
+                    return self._send(200, _catalog_filter(
+                        [p for p in state.projects if not customer or str(p["customer"]) == customer], query))
+                if url.path == "/api/activities":
+                    if query.get("globals") == "true":
+                        return self._send(200, _catalog_filter([a for a in state.activities if a["project"] is None], query))
+                    project = query.get("project")
+                    return self._send(200, _catalog_filter([a for a in state.activities
+                                                            if not project or a["project"] is None or str(a["project"]) == project], query))
+                if url.path == "/api/timesheets/active":
+                    return self._send(200, [state.expanded(t) for t in state.timesheets.values() if t["end"] is None])
+                if url.path == "/api/timesheets/recent":
+                    recent = sorted(state.timesheets.values(), key=lambda t: t["begin"], reverse=True)
+                    return self._send(200, [state.expanded(t) for t in recent[:int(query.get("size", 10))]])
+                if url.path == "/api/timesheets":
+                    return self._list_timesheets(query)
+            self._send(404, {"message": "Not found"})
+
+        def _list_timesheets(self, query: dict) -> None:
+            timesheets = sorted(state.timesheets.values(), key=lambda t: t["begin"], reverse=True)
+            if query.get("active") == "1":
+                timesheets = [t for t in timesheets if t["end"] is None]
+            if query.get("begin"):
+                timesheets = [t for t in timesheets if t["begin"] >= query["begin"]]
+            if query.get("end"):
+                timesheets = [t for t in timesheets if t["begin"] <= query["end"]]
+            if query.get("modified_after"):
+                since = _local_datetime(query["modified_after"])
+                timesheets = [t for t in timesheets if datetime.strptime(t["modified"], DATETIME_FORMAT) >= since]
+
+            size = int(query.get("size", 50))
+            page = int(query.get("page", 1))
+            total_pages = max(1, -(-len(timesheets) // size))
+            page_items = timesheets[(page - 1) * size:page * size]
+            self._send(200, page_items, {"X-Total-Pages": str(total_pages), "X-Total-Count": str(len(timesheets))})
+
+        def do_POST(self) -> None:
+            if not self._authorized():
+                return
+            body = self._body()
+            with state.lock:
+                state.requests += 1
+                if urlparse(self.path).path == "/api/timesheets":
+                    timesheet = state.start(int(body["project"]), int(body["activity"]), body.get("description") or "")
+                    return self._send(200, timesheet)
+            self._send(404, {"message": "Not found"})
+
+        def do_PATCH(self) -> None:
+            if not self._authorized():
+                return
+            self._body()
+            match = re.fullmatch(r"/api/timesheets/(\d+)/(stop|restart)", urlparse(self.path).path)
+            with state.lock:
+                state.requests += 1
+                timesheet = state.timesheets.get(int(match.group(1))) if match else None
+                if timesheet is None:
+                    return self._send(404, {"message": "Not found"})
+                if match.group(2) == "stop":
+                    if timesheet["end"] is not None:
+                        return self._send(400, {"message": "Timesheet entry already stopped"})
+                    return self._send(200, state.stop(timesheet["id"]))
+                restarted = state.start(timesheet["project"], timesheet["activity"], timesheet["description"])
+                return self._send(200, restarted)
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def process_request(self, request, client_address) -> None:
+        # Named so the harness can tell server threads from the plugin's
+        threading.Thread(target=self.process_request_thread, args=(request, client_address),
+                         name="stub-kimai-request", daemon=True).start()
+
+
+class StubKimai:
+    """Threaded stub server on a free localhost port"""
+
+    def __init__(self, **catalog):
+        self.state = KimaiState(**catalog)
+        self.server = _Server(("127.0.0.1", 0), _make_handler(self.state))
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-kimai", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubKimai":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
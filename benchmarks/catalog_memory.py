@@ -0,0 +1,108 @@
+"""Memory benchmark: 10k-project catalog as decoded JSON dicts vs. compact records.
+
+Run from the repository root:
+
+    python benchmarks/catalog_memory.py [--projects 10000]
+
+Each variant runs in a fresh interpreter and reports the Python heap it keeps
+(tracemalloc) and the growth of the resident set size (Linux only).
+"""
+import argparse
+import ctypes
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def project_payload(count: int) -> str:
+    """A /api/projects response shaped like Kimai's (including the fields the plugin never reads)"""
+    projects = [{
+        "parentTitle": f"Customer {i % 250}",
+        "customer": i % 250 + 1,
+        "id": i + 1,
+        "name": f"Project {i + 1} - Website relaunch phase {i % 7}",
+        "start": None,
+        "end": None,
+        "comment": None,
+        "visible": i % 10 != 0,
+        "billable": True,
+        "metaFields": [],
+        "teams": [],
+        "globalActivities": True,
+        "number": f"P-{i + 1:05d}",
+        "color": "#3b82f6",
+    } for i in range(count)]
+    return json.dumps(projects)
+
+
+def rss_kib() -> int:
+    """Resident set size of this process in KiB (0 where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return 0
+
+
+def release_free_memory() -> None:
+    """Hand freed heap back to the OS (glibc) so RSS reflects what is still referenced"""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def measure(variant: str, count: int) -> dict:
+    payload = project_payload(count)
+    release_free_memory()
+    rss_before = rss_kib()
+    tracemalloc.start()
+
+    if variant == "dicts":
+        catalog = {project["id"]: project for project in json.loads(payload)}
+    else:
+        from kimai_records import Project
+        # Decode each object straight into a record so the dicts die young and don't fragment the heap
+        catalog = {project.id: project for project in json.loads(payload, object_hook=Project.from_api)}
+
+    heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    release_free_memory()
+    rss_after = rss_kib()
+    assert len(catalog) == count
+    return {"variant": variant, "heap_bytes": heap, "rss_kib": rss_after - rss_before}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--variant", choices=["dicts", "records"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(measure(args.variant, args.projects)))
+        return
+
+    results = {}
+    for variant in ("dicts", "records"):
+        output = subprocess.run([sys.executable, __file__, "--projects", str(args.projects), "--variant", variant],
+                                check=True, capture_output=True, text=True).stdout
+        results[variant] = json.loads(output)
+
+    print(f"{args.projects} projects")
+    print(f"{'variant':<10}{'heap (KiB)':>14}{'RSS growth (KiB)':>20}")
+    for variant, result in results.items():
+        print(f"{variant:<10}{result['heap_bytes'] / 1024:>14.0f}{result['rss_kib']:>20}")
+    ratio = results["records"]["heap_bytes"] / results["dicts"]["heap_bytes"]
+    print(f"records use {ratio:.0%} of the dict-of-dicts heap")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Parse-time benchmark: decoding a 3,000-project /api/projects payload.
+
+Run from the repository root:
+
+    python benchmarks/decode_projects.py [--projects 3000] [--payload recorded.json]
+
+Without ``--payload`` a synthetic response with the shape of Kimai's
+``/api/projects`` (meta fields, teams, budgets) is generated. Compares the
+plain ``response.json()`` equivalent with the plugin's selective decoders on
+every backend installed here.
+"""
+import argparse
+import json
+import random
+import timeit
+
+from _plugin import plugin_module
+
+
+def synthetic_payload(count: int) -> bytes:
+    rng = random.Random(42)
+    projects = []
+    for i in range(count):
+        projects.append({
+            "parentTitle": f"Customer {i % 120}",
+            "customer": {"id": i % 120 + 1, "name": f"Customer {i % 120}", "number": f"C-{i % 120:04d}",
+                         "comment": None, "visible": True, "billable": True, "currency": "EUR",
+                         "metaFields": [], "teams": [], "color": "#10b981"},
+            "id": i + 1,
+            "name": f"Project {i + 1} {rng.choice(['Relaunch', 'Support', 'Maintenance', 'Migration'])}",
+            "start": "2024-01-01T00:00:00+0100",
+            "end": None,
+            "comment": rng.choice([None, "Internal project with a longer description " * 3]),
+            "visible": rng.random() > 0.1,
+            "billable": True,
+            "metaFields": [{"name": "cost_center", "value": f"CC{rng.randint(100, 999)}"}],
+            "teams": [{"id": t, "name": f"Team {t}", "color": "#6366f1"} for t in range(rng.randint(0, 3))],
+            "globalActivities": True,
+            "number": f"P-{i + 1:05d}",
+            "color": "#3b82f6",
+            "budget": 10000.0,
+            "timeBudget": 360000,
+            "budgetType": "month",
+            "orderNumber": None,
+            "orderDate": None,
+        })
+    return json.dumps(projects).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=3000)
+    parser.add_argument("--payload", help="Recorded /api/projects response to decode instead")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    kimai_decode = plugin_module("kimai_decode")
+    if args.payload:
+        with open(args.payload, "rb") as recorded:
+            payload = recorded.read()
+    else:
+        payload = synthetic_payload(args.projects)
+
+    cases = {"json.loads (response.json())": lambda: json.loads(payload)}
+    for backend in kimai_decode.available_backends():
+        cases[f"decode_projects [{backend}]"] = lambda backend=backend: kimai_decode.decode_projects(payload, backend)
+
+    count = len(json.loads(payload))
+    print(f"{count} projects, {len(payload) / 1024:.0f} KiB payload, best of {args.repeat}")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print(f"{name:<32}{best * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
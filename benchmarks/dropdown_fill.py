@@ -0,0 +1,86 @@
+"""Main-loop stall benchmark: filling a dropdown model with thousands of projects.
+
+Run from the repository root (needs PyGObject with GTK 4, as StreamController does):
+
+    python benchmarks/dropdown_fill.py [--rows 3000]
+
+Compares the old population (one ``append`` per row inside a single main-loop
+callback) with the plugin's chunked ``ModelFill``. A 1 ms probe timeout runs
+alongside; the longest gap between two probe ticks is the longest time the
+UI could not redraw or react to input. Without a display the model is bound
+to a ``Gtk.SingleSelection`` instead of a ``Gtk.DropDown``.
+"""
+import argparse
+import time
+
+import gi
+gi.require_version("Gtk", "4.0")
+from gi.repository import GLib, Gtk
+
+from _plugin import plugin_module
+
+
+def bind_view(model):
+    """Something that listens to the model the way the config dropdown does"""
+    if Gtk.init_check():
+        return Gtk.DropDown(model=model)
+    return Gtk.SingleSelection(model=model)
+
+
+def run(fill_starter) -> tuple:
+    """Run ``fill_starter(model, done)`` on a fresh main loop; return (longest stall ms, total ms)"""
+    loop = GLib.MainLoop()
+    model = Gtk.StringList()
+    view = bind_view(model)  # Kept alive for the whole run
+    ticks = []
+    result = {}
+
+    def probe() -> bool:
+        ticks.append(time.perf_counter())
+        return True
+
+    probe_id = GLib.timeout_add(1, probe)
+    started = time.perf_counter()
+    ticks.append(started)
+
+    def done() -> None:
+        result["total_ms"] = (time.perf_counter() - started) * 1000
+        ticks.append(time.perf_counter())
+        GLib.source_remove(probe_id)
+        loop.quit()
+
+    def start() -> bool:
+        fill_starter(model, done)
+        return False
+
+    GLib.idle_add(start)
+    loop.run()
+
+    gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+    return max(gaps, default=0) * 1000, result["total_ms"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=3000)
+    args = parser.parse_args()
+
+    model_fill = plugin_module("model_fill")
+    rows = [f"Project {i} (ID: {i})" for i in range(1, args.rows + 1)]
+
+    def per_row_append(model, done) -> None:
+        for row in rows:
+            model.append(row)
+        done()
+
+    def chunked(model, done) -> None:
+        model_fill.ModelFill(model, rows, on_done=done).start()
+
+    print(f"{args.rows} rows")
+    for label, starter in (("append per row (before)", per_row_append), ("ModelFill (after)", chunked)):
+        stall, total = run(starter)
+        print(f"{label:<26} longest stall {stall:8.1f} ms   total {total:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Flow benchmark on recorded Kimai exchanges: start, display refresh and stop, offline.
+
+Run from the repository root (needs requests and loguru, not StreamController):
+
+    python benchmarks/replay_flows.py [--cassette kimai.jsonl] [--latency 40] [--iterations 50]
+
+Without ``--cassette`` the flows are first recorded against the in-process
+stub Kimai server. To benchmark against exchanges with a real Kimai, record
+a cassette by starting StreamController with
+``KIMAI_CASSETTE_RECORD=/path/kimai.jsonl`` and using a Start Tracking, a
+Stop Tracking and a Display Active Tracking button in that order a few
+times; tokens are scrubbed while recording.
+
+The flows then run headless (see benchmarks/soak.py) with the plugin's HTTP
+session served by the cassette. ``--latency`` is a fixed per-request delay
+in milliseconds (deterministic, the default), or ``recorded`` to replay the
+recorded timings. Each flow is timed from the key press until the buttons
+have rendered the result.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import _streamcontroller as sc
+from _plugin import plugin_module
+from _stub_kimai import TOKEN, StubKimai
+from soak import Deck, action_classes, settle
+
+LAYOUT = {
+    "flows": [
+        ("StartTracking", sc.Input.Key("0x0"), {"project_id": "1", "activity_id": "1", "description": "Benchmark"}),
+        ("StopTracking", sc.Input.Key("1x0"), {}),
+        ("DisplayActiveTracking", sc.Input.Key("2x0"), {}),
+    ],
+}
+FLOWS = (("start", 0), ("display", 2), ("stop", 1), ("display (idle)", 2))
+
+
+def start_plugin(loop, plugin_dir: str, url: str, token: str):
+    sc.PluginBase.PATH = plugin_dir
+    sc.PluginBase.initial_settings = {"global_kimai_url": url, "global_api_token": token, "log_level": "WARNING"}
+    plugin_main = plugin_module("main")
+    plugin = plugin_main.PluginTemplate()
+    deck = Deck(plugin, action_classes(plugin_main), LAYOUT)
+    deck.show("flows")
+    settle(loop)
+    return plugin, deck
+
+
+def run_flows(loop, deck: Deck, iterations: int) -> dict:
+    """Flow name -> durations in ms"""
+    actions = deck.loaded["flows"]
+    timings = {name: [] for name, _ in FLOWS}
+    for _ in range(iterations):
+        for name, index in FLOWS:
+            started = time.perf_counter()
+            actions[index].on_key_down()
+            actions[index].on_key_up()
+            settle(loop)
+            timings[name].append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def record_from_stub(loop, cassette_path: str, iterations: int) -> None:
+    os.environ["KIMAI_CASSETTE_RECORD"] = cassette_path
+    try:
+        with StubKimai() as kimai, tempfile.TemporaryDirectory() as plugin_dir:
+            _, deck = start_plugin(loop, plugin_dir, kimai.url, TOKEN)
+            run_flows(loop, deck, iterations)
+    finally:
+        del os.environ["KIMAI_CASSETTE_RECORD"]
+
+
+def replay_adapters(plugin) -> list:
+    """The replay adapter of each Kimai profile"""
+    return [instance.kimai_api.session.get_adapter("http://") for instance in plugin.kimai_instances.values()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cassette", help="Recorded cassette (JSON Lines); recorded from the stub server if omitted")
+    parser.add_argument("--latency", default="40", help="Milliseconds per request, or 'recorded' (default: 40)")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    latency = args.latency if args.latency == "recorded" else float(args.latency)
+
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    loop = sc.VirtualLoop()
+    sc.install(loop)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        cassette_path = args.cassette
+        if cassette_path is None:
+            cassette_path = os.path.join(work_dir, "stub.jsonl")
+            # The first round starts fresh entries, later ones restart recent ones
+            record_from_stub(loop, cassette_path, iterations=3)
+
+        # Replay ignores the host and never connects; a literal address keeps the DNS warm-up offline
+        os.environ["KIMAI_CASSETTE_REPLAY"] = cassette_path
+        try:
+            with tempfile.TemporaryDirectory() as plugin_dir:
+                plugin, deck = start_plugin(loop, plugin_dir, "http://127.0.0.1:9", "replay-token")
+                adapters = replay_adapters(plugin)
+                for adapter in adapters:
+                    adapter.latency = latency
+                timings = run_flows(loop, deck, args.iterations)
+        finally:
+            del os.environ["KIMAI_CASSETTE_REPLAY"]
+
+    adapter = adapters[0]
+    print(f"{adapter.recorded} recorded exchanges, latency {args.latency}{'' if latency == 'recorded' else ' ms'}, "
+          f"{args.iterations} iterations")
+    print(f"{'flow':<16} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, durations in timings.items():
+        durations.sort()
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        print(f"{name:<16} {statistics.median(durations):8.1f} {p95:8.1f} {durations[-1]:8.1f}")
+    print(f"served {sum(a.served for a in adapters)}, unmatched {sum(a.missed for a in adapters)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Soak test: simulated days of page switching, presses and polls, watching for leaks.
+
+Run from the repository root (needs requests and loguru, not StreamController):
+
+    python benchmarks/soak.py [--hours 40] [--seed 1] [--reload-probability 0.25]
+
+The plugin runs headless on fake StreamController shims and a virtual-clock
+GLib loop (benchmarks/_streamcontroller.py) against an in-process stub Kimai
+server (benchmarks/_stub_kimai.py). Every simulated minute the deck may
+switch pages (sometimes reloading the page, which replaces its action
+objects), buttons get pressed and dials turned, and now and then the user is
+away long enough for idle mode. Once per simulated hour the harness samples
+live action objects, registered action instances, GLib sources, scheduler
+sources, poller subscriptions, threads and RSS.
+
+After a warm-up, each metric must stay flat: the run fails (exit status 1)
+if a metric's maximum in the second half of the samples exceeds its maximum
+in the first half by more than its tolerance, or if more action objects are
+alive than buttons exist.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import weakref
+
+import _streamcontroller as sc
+from _plugin import plugin_module
+from _stub_kimai import TOKEN, StubKimai
+
+ACTION_PREFIX = "com_thiritin_kimai_plugin::"
+
+# Page name -> buttons: (action class name, input, action settings)
+PAGES = {
+    "work": [
+        ("StartTracking", sc.Input.Key("0x0"), {"project_id": "1", "activity_id": "1", "description": "Support"}),
+        ("StartTracking", sc.Input.Key("1x0"), {"project_id": "2", "activity_id": "2"}),
+        ("StartTracking", sc.Input.Key("2x0"), {"project_id": "3", "activity_id": "3", "description": "Review"}),
+        ("StopTracking", sc.Input.Key("3x0"), {}),
+        ("DisplayActiveTracking", sc.Input.Key("4x0"), {}),
+    ],
+    "overview": [
+        ("TrackedTotals", sc.Input.Key("0x0"), {}),
+        ("ResumeRecent", sc.Input.Key("1x0"), {}),
+        ("DisplayActiveTracking", sc.Input.Key("2x0"), {}),
+        ("StartTracking", sc.Input.Dial("0"), {"project_id": "4", "activity_id": "4"}),
+    ],
+    "other": [],  # Another plugin's page: every Kimai button is hidden
+}
+BUTTON_COUNT = sum(len(buttons) for buttons in PAGES.values())
+
+# Metric -> allowed growth between the first and second half of the samples
+TOLERANCES = {
+    "actions_alive": 0,
+    "action_instances": 0,
+    "glib_sources": 2,
+    "scheduler_sources": 2,
+    "poller_subscribers": 0,
+    "threads": 2,
+    "rss_mib": 8.0,
+}
+
+
+class Deck:
+    """One deck with a few pages; pages keep their action objects until reloaded"""
+
+    def __init__(self, plugin, classes: dict, layout: dict = PAGES):
+        self.plugin = plugin
+        self.classes = classes
+        self.layout = layout
+        self.controller = sc.DeckController()
+        self.pages = {name: sc.Page(f"pages/{name}.json") for name in layout}
+        self.loaded = {}  # page name -> action objects
+        self.created = weakref.WeakSet()
+        self.active = None
+
+    def show(self, name: str, reload: bool = False) -> None:
+        page = self.pages[name]
+        self.controller.active_page = page
+        self.active = name
+        if reload or name not in self.loaded:
+            self.loaded[name] = [self._create(page, *button) for button in self.layout[name]]
+        for action in self.loaded[name]:
+            action.on_ready()
+
+    def _create(self, page, class_name: str, input_ident, settings: dict):
+        action = self.classes[class_name](
+            action_id=f"{ACTION_PREFIX}{class_name}", action_name=class_name,
+            deck_controller=self.controller, page=page, plugin_base=self.plugin,
+            state=0, input_ident=input_ident, settings=settings,
+        )
+        self.created.add(action)
+        return action
+
+    def press(self, rng: random.Random) -> None:
+        actions = self.loaded.get(self.active) or []
+        if not actions:
+            return
+        action = rng.choice(actions)
+        if isinstance(action.input_ident, sc.Input.Dial):
+            event = sc.Input.Dial.Events.TURN_CW if rng.random() < 0.6 else sc.Input.Dial.Events.TURN_CCW
+            for _ in range(rng.randint(1, 4)):
+                action.event_callback(event)
+            if rng.random() < 0.3:
+                action.event_callback(sc.Input.Dial.Events.DOWN)
+        else:
+            action.on_key_down()
+            action.on_key_up()
+
+
+def action_classes(plugin_main) -> dict:
+    """Action class name -> class, as registered by main.py"""
+    return {name: getattr(plugin_main, name)
+            for name in ("StartTracking", "StopTracking", "DisplayActiveTracking", "ResumeRecent", "TrackedTotals")}
+
+
+def plugin_threads() -> list:
+    """Threads other than the harness itself and the stub server"""
+    return [thread for thread in threading.enumerate()
+            if thread is not threading.main_thread() and not thread.name.startswith("stub-kimai")]
+
+
+def settle(loop: sc.VirtualLoop, timeout: float = 10.0) -> None:
+    """Let background requests finish, then dispatch the callbacks they queued"""
+    deadline = time.monotonic() + timeout
+    while plugin_threads() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    loop.run_for(0)
+
+
+def rss_mib() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Peak, not current
+
+
+def sample(plugin, deck: Deck, loop: sc.VirtualLoop) -> dict:
+    gc.collect()
+    return {
+        "actions_alive": len(deck.created),
+        "action_instances": len(plugin.action_instances),
+        "glib_sources": loop.live_sources,
+        "scheduler_sources": plugin.source_scheduler.stats()["live"],
+        "poller_subscribers": sum(instance.active_poller.subscriber_count for instance in plugin.kimai_instances.values()),
+        "threads": len(plugin_threads()),
+        "rss_mib": rss_mib(),
+    }
+
+
+def unbounded_growth(samples: list, warmup: float = 0.2) -> list:
+    """Metrics that kept growing after the warm-up, with a description"""
+    steady = samples[int(len(samples) * warmup):]
+    if len(steady) < 4:
+        return []
+    half = len(steady) // 2
+    failures = []
+    for metric, tolerance in TOLERANCES.items():
+        first = max(row[metric] for row in steady[:half])
+        second = max(row[metric] for row in steady[half:])
+        if second > first + tolerance:
+            failures.append(f"{metric} grew from {first:g} to {second:g} (tolerance {tolerance:g})")
+    worst = max(row["actions_alive"] for row in samples)
+    if worst > BUTTON_COUNT:
+        failures.append(f"{worst} action objects alive for {BUTTON_COUNT} buttons")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=40, help="Simulated hours (default: a work week)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reload-probability", type=float, default=0.25,
+                        help="Chance that a page switch reloads the page, replacing its action objects")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    loop = sc.VirtualLoop()
+    sc.install(loop)
+
+    with StubKimai() as kimai, tempfile.TemporaryDirectory() as plugin_dir:
+        sc.PluginBase.PATH = plugin_dir
+        sc.PluginBase.initial_settings = {
+            "global_kimai_url": kimai.url,
+            "global_api_token": TOKEN,
+            "log_level": "WARNING",
+        }
+
+        plugin_main = plugin_module("main")
+        plugin = plugin_main.PluginTemplate()
+        deck = Deck(plugin, action_classes(plugin_main))
+        deck.show("work")
+        settle(loop)
+
+        samples = []
+        away_until = None
+        minutes = int(args.hours * 60)
+        started = time.monotonic()
+        print(f"{'hour':>5} {'alive':>6} {'registered':>10} {'glib':>5} {'sched':>6} {'subs':>5} {'threads':>7} {'rss MiB':>8}")
+
+        for minute in range(1, minutes + 1):
+            if away_until is not None and minute >= away_until:
+                # Back at the desk: leave idle mode with a press
+                plugin.idle_monitor.idle_after = 900
+                away_until = None
+                deck.press(rng)
+            elif away_until is None:
+                if rng.random() < 1 / 240:
+                    # Away for a while; idle mode kicks in right away instead of after real minutes
+                    away_until = minute + rng.randint(30, 120)
+                    plugin.idle_monitor.idle_after = 1e-6
+                else:
+                    if rng.random() < 0.08:
+                        deck.show(rng.choice(list(PAGES)), reload=rng.random() < args.reload_probability)
+                    if rng.random() < 0.05:
+                        deck.press(rng)
+
+            settle(loop)
+            loop.run_for(60)
+            settle(loop)
+
+            if minute % 60 == 0:
+                row = sample(plugin, deck, loop)
+                samples.append(row)
+                print(f"{minute // 60:>5} {row['actions_alive']:>6} {row['action_instances']:>10} {row['glib_sources']:>5} "
+                      f"{row['scheduler_sources']:>6} {row['poller_subscribers']:>5} {row['threads']:>7} {row['rss_mib']:>8.1f}")
+
+        print(f"\n{args.hours:g} simulated hours in {time.monotonic() - started:.0f}s, "
+              f"{loop.callbacks_run} main-loop callbacks ({loop.errors} raised), {kimai.state.requests} Kimai requests")
+
+        failures = unbounded_growth(samples)
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if not failures:
+            print("OK: no unbounded growth")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
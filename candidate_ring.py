@@ -0,0 +1,88 @@
+# Import python modules
+import threading
+from collections import deque
+from typing import NamedTuple, Optional
+
+
+class TaskCandidate(NamedTuple):
+    """A project/activity pair a dial can scroll to"""
+    project_id: str
+    activity_id: str
+    description: str
+    project_name: str
+    activity_name: str
+
+    @property
+    def key(self) -> tuple:
+        return (self.project_id, self.activity_id, self.description)
+
+
+class CandidateRing:
+    """Prefetched ring of task candidates for dial scrolling.
+
+    Built once from data that is already local (favorite buttons, the
+    recent-timesheets cache, the timesheet mirror), so each detent only
+    rotates an in-memory deque and re-renders the label.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ring = deque()
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    @property
+    def current(self) -> Optional[TaskCandidate]:
+        with self._lock:
+            return self._ring[0] if self._ring else None
+
+    def replace(self, candidates: list, keep: tuple = None) -> None:
+        """Load new candidates, keeping ``keep`` (a candidate key) in front when present"""
+        unique = []
+        seen = set()
+        for candidate in candidates:
+            if candidate.key not in seen:
+                seen.add(candidate.key)
+                unique.append(candidate)
+
+        ring = deque(unique)
+        for offset, candidate in enumerate(unique):
+            if candidate.key == keep:
+                ring.rotate(-offset)
+                break
+        with self._lock:
+            self._ring = ring
+
+    def rotate(self, steps: int) -> Optional[TaskCandidate]:
+        """Move ``steps`` forward (negative: backward) and return the new current candidate"""
+        with self._lock:
+            if not self._ring:
+                return None
+            self._ring.rotate(-steps)
+            return self._ring[0]
+
+
+def build_candidates(favorites: list, recent_timesheets: list, recent_combinations: list, catalog_cache) -> list:
+    """Candidates in ring order: favorite pairs, then recent entries, then mirrored history.
+
+    ``favorites`` and ``recent_combinations`` are (project id, activity id,
+    description) tuples; ``recent_timesheets`` are ``Timesheet`` records. Names come
+    from one locked catalog cache lookup; pairs it doesn't know are labelled by id.
+    """
+    pairs = list(favorites)
+    for timesheet in recent_timesheets:
+        pairs.append((timesheet.project_id, timesheet.activity_id, timesheet.description))
+    pairs.extend(recent_combinations)
+
+    pairs = [pair for pair in pairs if pair[0] and pair[1]]
+    records = catalog_cache.task_records([(project_id, activity_id) for project_id, activity_id, _ in pairs])
+
+    candidates = []
+    for (project_id, activity_id, description), (project, activity) in zip(pairs, records):
+        candidates.append(TaskCandidate(
+            str(project_id), str(activity_id), description or "",
+            project.name if project else f"Project {project_id}",
+            activity.name if activity else f"Activity {activity_id}",
+        ))
+    return candidates
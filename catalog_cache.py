@@ -0,0 +1,171 @@
+# Import python modules
+import threading
+from typing import Optional
+
+from .kimai_records import Activity, Customer, Project, Timesheet
+from .plugin_log import get_logger
+
+log = get_logger("cache")
+
+class CatalogCache:
+    """Local id -> record cache for customers, projects and activities.
+
+    Filled from the catalog lists the config panel fetches and from any
+    fully expanded timesheet the plugin happens to see, so display buttons
+    can resolve names for a lean (id-only) timesheet without asking Kimai
+    to re-expand the nested objects on every poll. Entries are compact
+    records decoded once from the API responses.
+
+    Once a full catalog snapshot is loaded (at startup), the cache also knows
+    which projects and activities Kimai currently lists, so Start buttons can
+    be checked against it without any request. Entries learned from
+    timesheets only provide names; they may belong to deleted or hidden
+    projects and never make a task valid.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.customers = {}   # customer id -> Customer
+        self.projects = {}    # project id -> Project
+        self.activities = {}  # activity id -> Activity
+        self.snapshot_loaded = False
+        self.listed_projects = set()    # ids of projects seen in catalog lists
+        self.listed_activities = set()  # ids of activities seen in catalog lists
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        """Forget everything (e.g. after switching to another Kimai instance)"""
+        with self._lock:
+            self.customers = {}
+            self.projects = {}
+            self.activities = {}
+            self.snapshot_loaded = False
+            self.listed_projects = set()
+            self.listed_activities = set()
+
+    def load_snapshot(self, customers_data: list, projects_data: list, activities_data: list) -> None:
+        """Store complete customer, project and activity lists; only they make tasks valid from now on"""
+        with self._lock:
+            self.listed_projects = set()
+            self.listed_activities = set()
+        self.remember_customers(customers_data)
+        self.remember_projects(projects_data)
+        self.remember_activities(activities_data)
+        with self._lock:
+            self.snapshot_loaded = True
+        log.info("Catalog snapshot loaded: {} customers, {} projects, {} activities",
+                 len(customers_data), len(projects_data), len(activities_data))
+
+    def task_problem(self, project_id, activity_id) -> Optional[str]:
+        """Why a configured project/activity pair cannot be started, or None if it can (or no snapshot is loaded)"""
+        try:
+            project_id, activity_id = int(project_id), int(activity_id)
+        except (TypeError, ValueError):
+            return None  # Missing ids are reported when the button is pressed
+
+        with self._lock:
+            if not self.snapshot_loaded:
+                return None
+            if project_id not in self.listed_projects:
+                return f"project {project_id} was deleted or hidden in Kimai"
+            if activity_id not in self.listed_activities:
+                return f"activity {activity_id} was deleted or hidden in Kimai"
+            activity = self.activities.get(activity_id)
+            if activity is not None and activity.project_id is not None and activity.project_id != project_id:
+                return f"activity {activity_id} belongs to project {activity.project_id}, not {project_id}"
+        return None
+
+    def search_projects(self, term: str, customer_id=None, limit: Optional[int] = None) -> list:
+        """Visible listed projects whose name contains the term, by name (no request).
+
+        An empty term returns every listed project, e.g. to fill a filter dropdown.
+        """
+        needle = (term or "").strip().casefold()
+        with self._lock:
+            matches = [
+                project for project_id, project in self.projects.items()
+                if project_id in self.listed_projects and project.visible and needle in project.name.casefold()
+                and (customer_id is None or project.customer_id == customer_id)
+            ]
+        matches.sort(key=lambda project: project.name.casefold())
+        return matches[:limit] if limit else matches
+
+    def task_records(self, pairs: list) -> list:
+        """(Project, Activity) for each (project id, activity id) pair, None where not cached, under one lock"""
+        with self._lock:
+            return [(self.projects.get(_catalog_key(project_id)), self.activities.get(_catalog_key(activity_id)))
+                    for project_id, activity_id in pairs]
+
+    def remember_customers(self, customers_data: list) -> None:
+        """Store customers from a /api/customers response (records or raw dicts)"""
+        with self._lock:
+            for customer in customers_data:
+                record = _as_record(customer, Customer)
+                if record.id is not None:
+                    self.customers[record.id] = record
+
+    def remember_projects(self, projects_data: list, listed: bool = True) -> None:
+        """Store projects from a /api/projects response (records or raw dicts)"""
+        with self._lock:
+            for project in projects_data:
+                record = _as_record(project, Project)
+                if record.id is not None:
+                    self.projects[record.id] = record
+                    if listed:
+                        self.listed_projects.add(record.id)
+
+    def remember_activities(self, activities_data: list, listed: bool = True) -> None:
+        """Store activities from a /api/activities response (records or raw dicts)"""
+        with self._lock:
+            for activity in activities_data:
+                record = _as_record(activity, Activity)
+                if record.id is not None:
+                    self.activities[record.id] = record
+                    if listed:
+                        self.listed_activities.add(record.id)
+
+    def remember_timesheet(self, timesheet: dict) -> None:
+        """Learn names from a fully expanded timesheet"""
+        project = timesheet.get('project')
+        activity = timesheet.get('activity')
+        customer = project.get('customer') if isinstance(project, dict) else None
+
+        if isinstance(customer, dict):
+            self.remember_customers([customer])
+        if isinstance(project, dict):
+            self.remember_projects([project], listed=False)
+        if isinstance(activity, dict):
+            self.remember_activities([activity], listed=False)
+
+    def describe(self, timesheet: Timesheet) -> Optional[tuple]:
+        """(Customer, Project, Activity) of a timesheet, or None if any of them is not cached"""
+        with self._lock:
+            project = self.projects.get(timesheet.project_id)
+            activity = self.activities.get(timesheet.activity_id)
+            if project is None or activity is None:
+                log.debug("Catalog cache miss for project {} / activity {}", timesheet.project_id, timesheet.activity_id)
+                self.misses += 1
+                return None
+
+            customer = self.customers.get(project.customer_id)
+            if customer is None:
+                log.debug("Catalog cache miss for customer {}", project.customer_id)
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return customer, project, activity
+
+
+def _catalog_key(value):
+    """Entries are keyed by the integer ids Kimai returns; settings store them as strings"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _as_record(item, record_type):
+    """Decoded record as-is, or decode a raw API dict"""
+    return item if isinstance(item, record_type) else record_type.from_api(item)
@@ -0,0 +1,81 @@
+# Import python modules
+from typing import Optional
+
+# Kimai's ``visible`` filter values
+VISIBLE = 1
+HIDDEN = 2
+BOTH = 3
+
+
+class CatalogQuery:
+    """Filters for one of Kimai's catalog lists, applied by the server.
+
+    Start from ``customers()``, ``projects()`` or ``activities()`` and narrow
+    the query with ``search``, ``order_by`` and ``page``; every step returns
+    a new query. Queries only ask for visible entries unless told otherwise,
+    so hidden customers, projects and activities are never downloaded just
+    to be dropped again. Kimai versions that do not page the catalog lists
+    ignore ``page``/``size``; ``KimaiApi.get_catalog`` then cuts the result
+    to ``size`` itself.
+    """
+
+    ENTITIES = ("customers", "projects", "activities")
+
+    def __init__(self, entity: str, params: Optional[dict] = None):
+        if entity not in self.ENTITIES:
+            raise ValueError(f"Unknown catalog list '{entity}'")
+        self.entity = entity
+        self.params = dict(params) if params is not None else {"visible": VISIBLE}
+
+    @classmethod
+    def customers(cls) -> "CatalogQuery":
+        return cls("customers")
+
+    @classmethod
+    def projects(cls, customer_id=None) -> "CatalogQuery":
+        """Projects, optionally of one customer"""
+        return cls("projects").where(customer=customer_id)
+
+    @classmethod
+    def activities(cls, project_id=None, globals_only: bool = False) -> "CatalogQuery":
+        """Activities of a project (plus the global ones), only global ones, or all"""
+        return cls("activities").where(project=project_id, globals="true" if globals_only else None)
+
+    def where(self, **filters) -> "CatalogQuery":
+        """Add or replace filters; a None value removes a filter"""
+        params = dict(self.params)
+        for name, value in filters.items():
+            if value is None or value == "":
+                params.pop(name, None)
+            else:
+                params[name] = value
+        return CatalogQuery(self.entity, params)
+
+    def visible(self, visibility: int) -> "CatalogQuery":
+        """VISIBLE (default), HIDDEN or BOTH"""
+        return self.where(visible=visibility)
+
+    def search(self, term: str) -> "CatalogQuery":
+        """Only entries whose name (or other searchable fields) contain the term"""
+        return self.where(term=(term or "").strip() or None)
+
+    def order_by(self, field: str = "name", descending: bool = False) -> "CatalogQuery":
+        return self.where(orderBy=field, order="DESC" if descending else "ASC")
+
+    def page(self, page: int, size: int) -> "CatalogQuery":
+        return self.where(page=page, size=size)
+
+    @property
+    def path(self) -> str:
+        return f"/api/{self.entity}"
+
+    @property
+    def size(self) -> Optional[int]:
+        return self.params.get("size")
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CatalogQuery) and (self.entity, self.params) == (other.entity, other.params)
+
+    def __repr__(self) -> str:
+        filters = "&".join(f"{name}={value}" for name, value in sorted(self.params.items()))
+        return f"{self.path}?{filters}"
@@ -0,0 +1,91 @@
+# Import python modules
+import threading
+import weakref
+from typing import Any, Callable, Optional
+from .request_budget import action_deadline, deadline_budget
+from .plugin_log import get_logger
+
+log = get_logger("api")
+
+class CommandQueue:
+    """Runs one action's mutating Kimai requests one at a time, latest intent wins.
+
+    Commands are any values ``run`` accepts, compared with ``==``.
+    ``submit`` never blocks: the command runs on the queue's worker thread,
+    and commands submitted while one is in flight wait in a single slot. A
+    newer submission replaces the waiting one, and submitting the command
+    that is already in flight clears the slot, since that request achieves
+    the intent anyway. A burst of presses therefore costs at most the
+    in-flight request plus one more, and never two requests in parallel.
+
+    Each command runs under the request deadline of the press that submitted
+    it (see ``request_budget``), so its feedback is shown within the budget
+    counted from that press, including the time spent waiting in the slot.
+    """
+
+    def __init__(self, owner, run: Callable[[Any], None]):
+        self.owner_type = type(owner).__name__
+        # Don't keep the action alive through its bound method
+        self.run_ref = weakref.WeakMethod(run) if hasattr(run, "__self__") else (lambda: run)
+        self._lock = threading.Lock()
+        self._pending = None
+        self._pending_deadline = None
+        self._in_flight = None
+        self._worker_active = False
+        self.submitted = 0
+        self.collapsed = 0
+        self.executed = 0
+
+    def submit(self, command: Any) -> None:
+        """Queue a command (run right away if the queue is idle)"""
+        with self._lock:
+            self.submitted += 1
+            if command == self._in_flight:
+                # Already being done; whatever waits would only undo it
+                self._pending = None
+                self.collapsed += 1
+            else:
+                if self._pending is not None:
+                    self.collapsed += 1
+                self._pending = command
+                self._pending_deadline = action_deadline()
+            if self._worker_active or self._pending is None:
+                return
+            self._worker_active = True
+
+        threading.Thread(target=self._drain, name=f"{self.owner_type}-commands", daemon=True).start()
+
+    def latest(self) -> Optional[Any]:
+        """The command that will have run last once the queue is drained, or None if it is idle"""
+        with self._lock:
+            return self._pending if self._pending is not None else self._in_flight
+
+    @property
+    def busy(self) -> bool:
+        with self._lock:
+            return self._worker_active
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                command, self._pending = self._pending, None
+                deadline, self._pending_deadline = self._pending_deadline, None
+                self._in_flight = command
+                if command is None:
+                    self._worker_active = False
+                    return
+
+            run = self.run_ref()
+            if run is None:
+                # The action is gone; nobody is waiting for the rest
+                with self._lock:
+                    self._pending = self._in_flight = None
+                    self._worker_active = False
+                return
+
+            try:
+                with deadline_budget(deadline):
+                    run(command)
+                self.executed += 1
+            except Exception as e:
+                log.error("Error running {} command '{}': {}", self.owner_type, command, e)
@@ -0,0 +1,137 @@
+# Import python modules
+import statistics
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from .catalog_query import CatalogQuery
+from .settings_cache import ConnectionProfile
+from .plugin_log import get_logger
+
+log = get_logger("plugin")
+
+# Latency percentiles are shown from the first sample on (timeouts wait for more, see request_budget)
+DIAGNOSTICS_MIN_SAMPLES = 1
+# Throughput is measured on one page of projects; Kimai versions that ignore paging are cut off by bytes
+PROBE_QUERY = CatalogQuery.projects().order_by("name").page(1, 50)
+PROBE_MAX_BYTES = 256 * 1024
+
+
+class EndpointStats(NamedTuple):
+    key: str
+    count: int
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+
+
+class Diagnostics(NamedTuple):
+    requests_sent: int
+    requests_failed: int
+    requests_in_flight: int
+    over_budget: int
+    hedged: int
+    endpoints: list     # EndpointStats, busiest first
+    cache_hits: dict    # cache name -> (hits, misses)
+    threads: int
+    daemon_threads: int
+    sources_live: int
+    sources_suspended: int
+
+
+def collect(plugin) -> Diagnostics:
+    """Counters of the plugin's Kimai instances, caches, threads and scheduled sources right now"""
+    instances = list(plugin.kimai_instances.values())
+    label_endpoints = len(instances) > 1
+    sent = failed = in_flight = over_budget = hedged = 0
+    endpoints = []
+    caches = {"Catalog": [0, 0], "Restart candidates": [0, 0], "Week totals": [0, 0]}
+
+    for instance in instances:
+        session = instance.kimai_api.session
+        sent += session.sent
+        failed += session.failed
+        in_flight += session.in_flight
+        over_budget += session.deadline_exceeded
+        hedged += session.hedged
+        for key, stats in list(session.latency.items()):
+            p50 = stats.percentile(50, DIAGNOSTICS_MIN_SAMPLES)
+            p95 = stats.percentile(95, DIAGNOSTICS_MIN_SAMPLES)
+            name = f"{instance.profile.name or 'Default'}: {key}" if label_endpoints else key
+            endpoints.append(EndpointStats(name, stats.count,
+                                           p50 * 1000 if p50 is not None else None,
+                                           p95 * 1000 if p95 is not None else None))
+        for name, cache in (("Catalog", instance.catalog_cache), ("Restart candidates", instance.recent_timesheets),
+                            ("Week totals", instance.tracked_totals)):
+            caches[name][0] += cache.hits
+            caches[name][1] += cache.misses
+
+    state_cache = plugin.action_state_cache
+    caches["Button state"] = [state_cache.hits, state_cache.misses]
+
+    sources = plugin.source_scheduler.stats()
+    threads = threading.enumerate()
+    endpoints.sort(key=lambda endpoint: endpoint.count, reverse=True)
+    return Diagnostics(
+        sent, failed, in_flight, over_budget, hedged, endpoints,
+        {name: tuple(counts) for name, counts in caches.items()},
+        len(threads), sum(1 for thread in threads if thread.daemon),
+        sources["live"], sources["suspended"],
+    )
+
+
+def hit_rate(hits: int, misses: int) -> Optional[float]:
+    """Share of hits in percent, or None before the first lookup"""
+    total = hits + misses
+    return hits * 100.0 / total if total else None
+
+
+class ConnectionProbe(NamedTuple):
+    rtt_ms: list            # Round trips of a tiny request, in order
+    payload_bytes: int      # Size of the project page download
+    download_seconds: float
+    status: int             # Status of the project page download
+
+    @property
+    def kib_per_second(self) -> Optional[float]:
+        if self.download_seconds <= 0:
+            return None
+        return self.payload_bytes / 1024 / self.download_seconds
+
+    def describe(self) -> str:
+        """One line for the settings panel"""
+        if self.status != 200:
+            return f"Round trip {min(self.rtt_ms):.0f}–{max(self.rtt_ms):.0f} ms; project page download failed (status {self.status})"
+        throughput = self.kib_per_second
+        return (f"Round trip {min(self.rtt_ms):.0f} ms min, {statistics.median(self.rtt_ms):.0f} ms median; "
+                f"{self.payload_bytes / 1024:.0f} KiB project page in {self.download_seconds * 1000:.0f} ms"
+                + (f" ({throughput:.0f} KiB/s)" if throughput is not None else ""))
+
+
+def probe_connection(session, profile: ConnectionProfile, round_trips: int = 5) -> ConnectionProbe:
+    """Measure round-trip time with Kimai's version endpoint and throughput with one page of projects.
+
+    Blocks for a few requests; run it off the main thread. Raises the
+    session's request exceptions when Kimai cannot be reached.
+    """
+    rtt_ms = []
+    for _ in range(round_trips):
+        started = time.monotonic()
+        response = session.get(profile.url("/api/version"), headers=profile.headers, timeout=10)
+        rtt_ms.append((time.monotonic() - started) * 1000)
+        response.close()
+
+    started = time.monotonic()
+    response = session.get(profile.url(PROBE_QUERY.path), headers=profile.headers, params=PROBE_QUERY.params,
+                           timeout=10, stream=True)
+    payload_bytes = 0
+    try:
+        for chunk in response.iter_content(64 * 1024):
+            payload_bytes += len(chunk)
+            if payload_bytes >= PROBE_MAX_BYTES:
+                break
+    finally:
+        response.close()
+    download_seconds = time.monotonic() - started
+    probe = ConnectionProbe(rtt_ms, payload_bytes, download_seconds, response.status_code)
+    log.info("Connection probe for '{}': {}", profile.name, probe.describe())
+    return probe
@@ -0,0 +1,170 @@
+# Import python modules
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+import requests.adapters
+from requests.structures import CaseInsensitiveDict
+
+from .plugin_log import get_logger, redact
+
+log = get_logger("api")
+
+# Set to a file path to record every Kimai exchange of the plugin into a cassette
+RECORD_ENV = "KIMAI_CASSETTE_RECORD"
+# Set to a cassette path to serve the plugin's requests from it instead of Kimai
+REPLAY_ENV = "KIMAI_CASSETTE_REPLAY"
+
+# Response headers worth keeping; the rest (cookies, server details) is dropped
+KEPT_HEADERS = ("Content-Type", "X-Total-Count", "X-Total-Pages", "X-Page", "X-Per-Page")
+SCRUBBED = "[REDACTED]"
+
+
+# Query parameters holding the current time, which never repeat between runs
+VOLATILE_PARAMS = ("begin", "end", "modified_after")
+
+
+def request_key(method: str, url: str) -> str:
+    """Host-independent key of a request: method, path and sorted query (times masked)"""
+    parts = urlsplit(url)
+    params = [(name, "*" if name in VOLATILE_PARAMS else value)
+              for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    query = urlencode(sorted(params))
+    return f"{method.upper()} {parts.path}{'?' + query if query else ''}"
+
+
+def _id_shape(key: str) -> str:
+    """Request key with numeric path segments masked, e.g. ``PATCH /api/timesheets/{id}/stop``"""
+    return re.sub(r"/\d+(?=/|\?|$)", "/{id}", key)
+
+
+def _scrub(text: str, token: Optional[str]) -> str:
+    if token:
+        text = text.replace(token, SCRUBBED)
+    return redact(text)
+
+
+class RecordingAdapter(requests.adapters.HTTPAdapter):
+    """Pooled HTTP adapter that also appends every exchange to a cassette.
+
+    Cassettes are JSON Lines, one interaction per line, so concurrent
+    requests from the plugin's worker threads can be appended safely. Only
+    the path and query are stored (not the host), the Authorization header
+    is not stored at all, and the bearer token is scrubbed from bodies.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content  # Reads the body once; requests keeps it for the caller
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        authorization = request.headers.get("Authorization", "")
+        token = authorization.split(" ", 1)[1] if " " in authorization else None
+        body = request.body.decode() if isinstance(request.body, bytes) else request.body
+        interaction = {
+            "request": {"key": request_key(request.method, request.url), "body": _scrub(body, token) if body else None},
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+                "body": _scrub(content.decode(response.encoding or "utf-8", errors="replace"), token),
+            },
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as cassette:
+                cassette.write(json.dumps(interaction) + "\n")
+        except OSError as e:
+            log.error("Could not write cassette {}: {}", self.path, e)
+        return response
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """Serves a recorded cassette instead of talking to Kimai.
+
+    Requests are matched by method, path and query (see ``request_key``),
+    falling back to the same request on another entity id, since ids
+    handed out during replay need not match the recorded ones. Repeated
+    requests get the recorded responses in recording order and
+    start over when exhausted, so replaying the recorded flows in the same
+    order is deterministic. ``latency`` is ``"recorded"`` (sleep as long as
+    the original exchange took), a fixed number of milliseconds, or None.
+    Unknown requests raise ``ConnectionError``, like an unreachable server.
+    """
+
+    def __init__(self, path: str, latency: Union[str, float, None] = "recorded"):
+        super().__init__()
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._interactions = defaultdict(list)  # request key or id shape -> recorded interactions
+        self._next = defaultdict(int)
+        self.recorded = 0
+        self.served = 0
+        self.missed = 0
+        with open(path, encoding="utf-8") as cassette:
+            for line in cassette:
+                if line.strip():
+                    interaction = json.loads(line)
+                    key = interaction["request"]["key"]
+                    self._interactions[key].append(interaction)
+                    if _id_shape(key) != key:
+                        self._interactions[_id_shape(key)].append(interaction)
+                    self.recorded += 1
+
+    def send(self, request, **kwargs):
+        key = request_key(request.method, request.url)
+        with self._lock:
+            if key not in self._interactions:
+                key = _id_shape(key)
+            recorded = self._interactions.get(key)
+            if not recorded:
+                self.missed += 1
+                raise requests.exceptions.ConnectionError(f"No recorded response for {key}", request=request)
+            interaction = recorded[self._next[key] % len(recorded)]
+            self._next[key] += 1
+            self.served += 1
+
+        delay_ms = interaction.get("elapsed_ms", 0) if self.latency == "recorded" else (self.latency or 0)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        recorded_response = interaction["response"]
+        response = requests.Response()
+        response.status_code = recorded_response["status"]
+        response.reason = recorded_response.get("reason")
+        response.headers = CaseInsensitiveDict(recorded_response.get("headers") or {})
+        response._content = (recorded_response.get("body") or "").encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(milliseconds=delay_ms)
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def pooled_adapter(**pool_kwargs) -> requests.adapters.BaseAdapter:
+    """The plugin's HTTP adapter: pooled, or recording/replaying a cassette if the environment asks for it"""
+    replay_path = os.environ.get(REPLAY_ENV)
+    if replay_path:
+        log.warning("Serving Kimai requests from cassette {}", replay_path)
+        return ReplayAdapter(replay_path)
+    record_path = os.environ.get(RECORD_ENV)
+    if record_path:
+        log.warning("Recording Kimai exchanges into cassette {}", record_path)
+        return RecordingAdapter(record_path, **pool_kwargs)
+    return requests.adapters.HTTPAdapter(**pool_kwargs)
@@ -0,0 +1,113 @@
+# Import python modules
+import threading
+import time
+from typing import Callable
+from .plugin_log import get_logger
+
+log = get_logger("scheduler")
+
+class NullLockDetector:
+    """Default lock detector: never reports the screen as locked"""
+
+    def is_locked(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class ScreenSaverLockDetector:
+    """Follows ``org.freedesktop.ScreenSaver.ActiveChanged`` on the session bus.
+
+    ``on_unlocked`` is called (on the main loop) when the screen saver goes
+    away, so returning to the desk wakes the plugin without a key press.
+    """
+
+    def __init__(self, on_unlocked: Callable[[], None] = None):
+        self.on_unlocked = on_unlocked
+        self.locked = False
+        self._connection = None
+        self._subscription_id = None
+
+        try:
+            from gi.repository import Gio
+            self._connection = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+            self._subscription_id = self._connection.signal_subscribe(
+                None, "org.freedesktop.ScreenSaver", "ActiveChanged", None, None,
+                Gio.DBusSignalFlags.NONE, self._on_active_changed
+            )
+        except Exception as e:
+            log.warning("Screen lock detection unavailable: {}", e)
+
+    def is_locked(self) -> bool:
+        return self.locked
+
+    def close(self) -> None:
+        if self._connection is not None and self._subscription_id is not None:
+            self._connection.signal_unsubscribe(self._subscription_id)
+            self._subscription_id = None
+
+    def _on_active_changed(self, connection, sender, path, interface, signal, parameters):
+        locked = bool(parameters.unpack()[0])
+        was_locked, self.locked = self.locked, locked
+        log.debug("Screen saver active: {}", locked)
+        if was_locked and not locked and self.on_unlocked is not None:
+            self.on_unlocked()
+
+
+class IdleMonitor:
+    """Decides whether nobody is at the deck.
+
+    The plugin counts as idle after ``idle_after`` seconds without a key press
+    on one of its buttons (0 disables this), or while the lock detector says
+    the screen is locked. Idle state is evaluated lazily by whoever asks; the
+    transition back is explicit: ``touch()`` on activity calls the resume
+    subscribers once if anyone saw the plugin idle in the meantime.
+    """
+
+    def __init__(self, idle_after: float = 900.0, detector=None):
+        self.idle_after = idle_after
+        self.detector = detector or NullLockDetector()
+        self._lock = threading.Lock()
+        self._last_activity = time.monotonic()
+        self._observed_idle = False
+        self._subscribers = []
+
+    @property
+    def is_idle(self) -> bool:
+        idle = self.detector.is_locked() or (
+            bool(self.idle_after) and time.monotonic() - self._last_activity >= self.idle_after
+        )
+        if idle:
+            # Something is about to pause or stretch because of this; touch() must undo it
+            self._observed_idle = True
+        return idle
+
+    def set_detector(self, detector) -> None:
+        """Swap the lock detector, closing the previous one"""
+        previous, self.detector = self.detector, detector or NullLockDetector()
+        if previous is not self.detector:
+            previous.close()
+
+    def touch(self) -> None:
+        """Record activity; wakes the plugin up if it was idle"""
+        with self._lock:
+            self._last_activity = time.monotonic()
+            was_idle, self._observed_idle = self._observed_idle, False
+
+        if was_idle:
+            log.info("Activity after idle period - resuming polling")
+            for callback in list(self._subscribers):
+                try:
+                    callback()
+                except Exception as e:
+                    log.error("Error notifying idle resume subscriber: {}", e)
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Called once each time the plugin leaves the idle state"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
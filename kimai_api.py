@@ -0,0 +1,216 @@
+# Import python modules
+import requests
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from .catalog_query import CatalogQuery
+from .http_cassette import pooled_adapter
+from .kimai_decode import decode_activities, decode_customers, decode_projects, decode_timesheets, loads
+from .kimai_records import Timesheet
+from .request_budget import BudgetedSession
+from .settings_cache import ConnectionProfile
+from .plugin_log import get_logger
+
+log = get_logger("api")
+
+class ActiveTimesheetQuery:
+    """How much of the active timesheet a caller needs, smallest payload first"""
+    # Flat record: id, begin, project/activity ids (stop paths, button matching,
+    # display with cached names). Kimai can't return less than the flat record,
+    # so callers that only need the id use this too.
+    REFS = "refs"
+    # Nested customer/project/activity objects from the dedicated /active endpoint
+    FULL = "full"
+
+
+class KimaiApi:
+    """Active timesheet queries that fetch only what each caller needs"""
+
+    def __init__(self, catalog_cache):
+        self.catalog_cache = catalog_cache
+
+        # One pooled session for all actions so connections (and TLS) are reused; its
+        # timeouts adapt to observed latency and the deadline of the press being handled
+        self.session = BudgetedSession()
+        adapter = pooled_adapter(pool_connections=1, pool_maxsize=10)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_active_timesheet(self, profile: ConnectionProfile, query: str = ActiveTimesheetQuery.REFS) -> Optional[dict]:
+        """Get the currently active timesheet in the requested shape.
+
+        REFS uses the collection endpoint filtered to the active entry,
+        which returns related entities as plain ids. FULL uses Kimai's
+        dedicated /api/timesheets/active endpoint, which returns nested
+        objects; those are remembered in the catalog cache so later REFS
+        queries can be expanded locally.
+        """
+        if query == ActiveTimesheetQuery.FULL:
+            response = self.session.get(profile.url("/api/timesheets/active"), headers=profile.headers, timeout=10)
+        else:
+            params = {"active": "1", "size": 1, "orderBy": "begin", "order": "DESC"}
+            response = self.session.get(profile.url("/api/timesheets"), headers=profile.headers, params=params, timeout=10)
+
+        if response.status_code != 200:
+            # Polled, so a persistent failure is reported every few minutes instead of every poll
+            log.every(f"active-timesheet-status:{profile.name}", 300).error(
+                "Failed to get active timesheet ({}). Status: {}, response body: {}", query, response.status_code, lambda: response.text)
+            return None
+
+        timesheets = loads(response.content)
+        if not timesheets:
+            return None
+
+        timesheet = timesheets[0]
+        if timesheet.get('end') is not None:
+            return None
+
+        if query == ActiveTimesheetQuery.FULL:
+            self.catalog_cache.remember_timesheet(timesheet)
+        return timesheet
+
+    def get_active_timesheet_id(self, profile: ConnectionProfile) -> Optional[int]:
+        """Get the id of the currently active timesheet (from the flat REFS record)"""
+        timesheet = self.get_active_timesheet(profile, ActiveTimesheetQuery.REFS)
+        return timesheet.get('id') if timesheet else None
+
+    def get_active_timesheet_record(self, profile: ConnectionProfile) -> Optional[Timesheet]:
+        """Get the active timesheet as a record whose names are resolvable from the catalog cache.
+
+        Falls back to the FULL query only when the cache does not know one of
+        the referenced customer/project/activity names yet.
+        """
+        timesheet = self.get_active_timesheet(profile, ActiveTimesheetQuery.REFS)
+        if timesheet is None:
+            return None
+
+        record = Timesheet.from_api(timesheet)
+        if self.catalog_cache.describe(record) is not None:
+            return record
+
+        log.info("Catalog cache incomplete, fetching expanded active timesheet")
+        timesheet = self.get_active_timesheet(profile, ActiveTimesheetQuery.FULL)
+        return Timesheet.from_api(timesheet) if timesheet else None
+
+    def get_recent_timesheets(self, profile: ConnectionProfile, size: int = 10) -> Optional[list]:
+        """Get the user's recently tracked project/activity combinations"""
+        url = profile.url("/api/timesheets/recent")
+
+        response = self.session.get(url, headers=profile.headers, params={"size": size}, timeout=10)
+        if response.status_code != 200:
+            log.error("Failed to get recent timesheets. Status: {}", response.status_code)
+            log.error("Response body: {}", response.text)
+            return None
+
+        # Nested customer/project/activity objects feed the catalog; the cache keeps records
+        timesheets = loads(response.content)
+        for timesheet in timesheets:
+            self.catalog_cache.remember_timesheet(timesheet)
+        return [Timesheet.from_api(timesheet) for timesheet in timesheets]
+
+    def restart_timesheet(self, profile: ConnectionProfile, timesheet_id: int) -> requests.Response:
+        """Restart a previous timesheet as a new running entry.
+
+        Kimai stops the currently running entry server-side when the user's
+        active entry limit is reached, so this replaces the stop + create pair.
+        The caller inspects the response status.
+        """
+        url = profile.url(f"/api/timesheets/{timesheet_id}/restart")
+
+        return self.session.patch(url, json={"copy": "all"}, headers=profile.headers, timeout=10)
+
+    def load_catalog(self, profile: ConnectionProfile) -> bool:
+        """Fetch all customers, projects and activities into the catalog cache as one snapshot.
+
+        Returns False (leaving the previous snapshot, if any) when one of the
+        lists could not be fetched.
+        """
+        lists = {}
+        for query in (CatalogQuery.customers(), CatalogQuery.projects(), CatalogQuery.activities()):
+            records = self.get_catalog(profile, query, remember=False)
+            if records is None:
+                return False
+            lists[query.entity] = records
+
+        self.catalog_cache.load_snapshot(lists["customers"], lists["projects"], lists["activities"])
+        return True
+
+    def get_catalog(self, profile: ConnectionProfile, query: CatalogQuery, remember: bool = True) -> Optional[list]:
+        """Get one catalog list filtered by Kimai as records (None on failure).
+
+        The records are remembered in the catalog cache for name lookups
+        unless ``remember`` is False.
+        """
+        response = self.session.get(profile.url(query.path), headers=profile.headers, params=query.params, timeout=10)
+        if response.status_code != 200:
+            log.error("Failed to get {}. Status: {}", query.entity, response.status_code)
+            log.error("Request URL: {}", response.url)
+            log.error("Response body: {}", response.text)
+            return None
+
+        records = _CATALOG_DECODERS[query.entity](response.content)
+        if query.size:
+            records = records[:query.size]
+        log.debug("Fetched {} {} for {}", len(records), query.entity, query)
+
+        if remember:
+            getattr(self.catalog_cache, f"remember_{query.entity}")(records)
+        return records
+
+    def get_timesheets(self, profile: ConnectionProfile, page_size: int = 100, **filters) -> Optional[list]:
+        """Get all of the user's timesheets matching the filters (e.g. ``begin``/``end``) as records.
+
+        Pages through /api/timesheets using Kimai's pagination headers.
+        Returns None if any page fails, so callers never see a partial range.
+        """
+        result = self.get_timesheets_with_server_time(profile, page_size, **filters)
+        return result[0] if result is not None else None
+
+    def get_timesheets_with_server_time(self, profile: ConnectionProfile, page_size: int = 100, **filters) -> Optional[tuple]:
+        """Like ``get_timesheets``, plus Kimai's clock (timezone-aware) when it served the first page.
+
+        The time comes from the response's ``Date`` header, so cursors such as
+        ``modified_after`` don't depend on this machine's clock; it is None if
+        the server sent no usable header.
+        """
+        url = profile.url("/api/timesheets")
+        timesheets = []
+        server_time = None
+        page = 1
+
+        while True:
+            params = dict(filters, page=page, size=page_size)
+            response = self.session.get(url, headers=profile.headers, params=params, timeout=10)
+            if response.status_code != 200:
+                log.error("Failed to get timesheets (page {}). Status: {}", page, response.status_code)
+                log.error("Response body: {}", response.text)
+                return None
+
+            if page == 1:
+                server_time = _server_time(response)
+            batch = decode_timesheets(response.content)
+            timesheets.extend(batch)
+
+            total_pages = int(response.headers.get("X-Total-Pages", page) or page)
+            if page >= total_pages or len(batch) < page_size:
+                return timesheets, server_time
+            page += 1
+
+
+_CATALOG_DECODERS = {
+    "customers": decode_customers,
+    "projects": decode_projects,
+    "activities": decode_activities,
+}
+
+
+def _server_time(response) -> Optional[datetime]:
+    """The response's ``Date`` header as a UTC datetime, or None"""
+    try:
+        server_time = parsedate_to_datetime(response.headers["Date"])
+    except (KeyError, TypeError, ValueError, IndexError):
+        return None
+    if server_time.tzinfo is None:
+        server_time = server_time.replace(tzinfo=timezone.utc)
+    return server_time.astimezone(timezone.utc)
@@ -0,0 +1,125 @@
+# Import python modules
+import json
+from typing import List, Optional, Union
+
+from .kimai_records import Activity, Customer, Project, Timesheet
+
+# Optional fast JSON backends, best first. msgspec decodes straight into
+# structs that only declare the fields the plugin reads, skipping the rest
+# (meta fields, teams, budgets) without building Python objects for them.
+# orjson decodes everything but much faster than the standard library.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if msgspec is not None:
+    BACKEND = "msgspec"
+elif orjson is not None:
+    BACKEND = "orjson"
+else:
+    BACKEND = "json"
+
+
+def available_backends() -> list:
+    """Backends usable in this environment, fastest first"""
+    return [name for name, module in (("msgspec", msgspec), ("orjson", orjson), ("json", json)) if module is not None]
+
+
+def loads(content: Union[bytes, str], backend: Optional[str] = None):
+    """Decode a whole JSON document with the fastest available backend"""
+    backend = backend or BACKEND
+    if backend == "msgspec":
+        return msgspec.json.decode(content)
+    if backend == "orjson":
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def decode_customers(content: Union[bytes, str], backend: Optional[str] = None) -> List[Customer]:
+    """Decode a /api/customers response into records"""
+    return _decode_list(content, Customer, backend)
+
+
+def decode_projects(content: Union[bytes, str], backend: Optional[str] = None) -> List[Project]:
+    """Decode a /api/projects response into records"""
+    return _decode_list(content, Project, backend)
+
+
+def decode_activities(content: Union[bytes, str], backend: Optional[str] = None) -> List[Activity]:
+    """Decode a /api/activities response into records"""
+    return _decode_list(content, Activity, backend)
+
+
+def decode_timesheets(content: Union[bytes, str], backend: Optional[str] = None) -> List[Timesheet]:
+    """Decode a /api/timesheets response into records"""
+    return _decode_list(content, Timesheet, backend)
+
+
+def _decode_list(content, record_type, backend: Optional[str]) -> list:
+    backend = backend or BACKEND
+    if backend == "msgspec":
+        decoder, convert = _msgspec_decoders()[record_type]
+        return [convert(item) for item in decoder.decode(content)]
+    return [record_type.from_api(item) for item in loads(content, backend)]
+
+
+_MSGSPEC_DECODERS = None
+
+
+def _msgspec_decoders() -> dict:
+    """Record type -> (list decoder, struct -> record), built on first use"""
+    global _MSGSPEC_DECODERS
+    if _MSGSPEC_DECODERS is not None:
+        return _MSGSPEC_DECODERS
+
+    class Ref(msgspec.Struct):
+        id: int
+
+    # Kimai sends null for some of these; accept it and fall back like ``from_api`` does
+    class CustomerFields(msgspec.Struct):
+        id: int
+        name: Optional[str] = None
+        visible: Optional[bool] = True
+
+    class ProjectFields(msgspec.Struct):
+        id: int
+        name: Optional[str] = None
+        customer: Union[int, Ref, None] = None
+        visible: Optional[bool] = True
+
+    class ActivityFields(msgspec.Struct):
+        id: int
+        name: Optional[str] = None
+        project: Union[int, Ref, None] = None
+        visible: Optional[bool] = True
+
+    class TimesheetFields(msgspec.Struct):
+        id: int
+        begin: Optional[str] = None
+        end: Optional[str] = None
+        duration: Optional[int] = None
+        project: Union[int, Ref, None] = None
+        activity: Union[int, Ref, None] = None
+        description: Optional[str] = None
+
+    def ref(value):
+        return value.id if isinstance(value, Ref) else value
+
+    _MSGSPEC_DECODERS = {
+        Customer: (msgspec.json.Decoder(List[CustomerFields]),
+                   lambda c: Customer(c.id, c.name or f"Customer {c.id}", bool(c.visible))),
+        Project: (msgspec.json.Decoder(List[ProjectFields]),
+                  lambda p: Project(p.id, p.name or f"Project {p.id}", ref(p.customer), bool(p.visible))),
+        Activity: (msgspec.json.Decoder(List[ActivityFields]),
+                   lambda a: Activity(a.id, a.name or f"Activity {a.id}", ref(a.project), bool(a.visible))),
+        Timesheet: (msgspec.json.Decoder(List[TimesheetFields]),
+                    lambda t: Timesheet(t.id, t.begin or "", t.end, t.duration, ref(t.project), ref(t.activity),
+                                        t.description or "")),
+    }
+    return _MSGSPEC_DECODERS
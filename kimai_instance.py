@@ -0,0 +1,65 @@
+# Import python modules
+import threading
+
+from .active_poller import ActiveTimesheetPoller
+from .catalog_cache import CatalogCache
+from .kimai_api import KimaiApi
+from .recent_cache import RecentTimesheetsCache
+from .settings_cache import ConnectionProfile
+from .startup_prefetch import StartupPrefetch
+from .timesheet_store import TimesheetStore, store_path
+from .totals_cache import TrackedTotalsCache
+from .plugin_log import get_logger
+
+log = get_logger("plugin")
+
+class KimaiInstance:
+    """Everything tied to one Kimai connection profile.
+
+    Each profile gets its own pooled session, catalog cache, recent list,
+    startup prefetch, active-timesheet poller, week totals and local
+    timesheet mirror (in ``data_dir``), so buttons on different Kimai
+    instances never share state or connections. ``on_catalog_loaded(instance)``
+    is called after the startup catalog snapshot was loaded.
+    """
+
+    def __init__(self, profile: ConnectionProfile, scheduler, data_dir: str, on_catalog_loaded=None):
+        self.profile = profile
+        self.catalog_cache = CatalogCache()
+        self.kimai_api = KimaiApi(self.catalog_cache)
+        self.recent_timesheets = RecentTimesheetsCache(self.kimai_api)
+        self.timesheet_store = None
+        if profile.is_configured:
+            try:
+                self.timesheet_store = TimesheetStore(store_path(data_dir, profile))
+            except Exception as e:
+                log.error("Could not open the local timesheet mirror for '{}': {}", profile.name, e)
+        self.startup_prefetch = StartupPrefetch(
+            self.kimai_api, self.recent_timesheets, self.timesheet_store,
+            on_catalog_loaded=(lambda: on_catalog_loaded(self)) if on_catalog_loaded else None,
+        )
+        self.active_poller = ActiveTimesheetPoller(self.kimai_api, profile, scheduler)
+        self.tracked_totals = TrackedTotalsCache(self.kimai_api, self.timesheet_store)
+
+    def sync_timesheet_store(self) -> None:
+        """Pull changed timesheets into the local mirror in the background"""
+        if self.timesheet_store is None:
+            return
+
+        def sync():
+            try:
+                self.timesheet_store.sync(self.kimai_api, self.profile)
+            except Exception as e:
+                log.error("Error syncing local timesheet mirror: {}", e)
+
+        threading.Thread(target=sync, daemon=True).start()
+
+    def close(self) -> None:
+        """Release the pooled connections and stop polling"""
+        try:
+            self.active_poller.stop()
+            self.kimai_api.session.close()
+            if self.timesheet_store is not None:
+                self.timesheet_store.close()
+        except Exception as e:
+            log.error("Error closing Kimai instance '{}': {}", self.profile.name, e)
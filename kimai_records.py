@@ -0,0 +1,69 @@
+# Import python modules
+from typing import NamedTuple, Optional
+
+# Compact, immutable records for the Kimai entities the plugin keeps around.
+# Named tuples have no per-instance __dict__, so a 10k-project catalog costs a
+# fraction of the decoded JSON. Decode with ``from_api`` where a response
+# enters the plugin and pass the records on from there.
+
+
+def reference_id(value) -> Optional[int]:
+    """Return the id of a related entity, whether it is a plain id or a nested object"""
+    if isinstance(value, dict):
+        return value.get('id')
+    return value
+
+
+class Customer(NamedTuple):
+    id: int
+    name: str
+    visible: bool = True
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Customer":
+        return cls(data['id'], data.get('name') or f"Customer {data['id']}", bool(data.get('visible', True)))
+
+
+class Project(NamedTuple):
+    id: int
+    name: str
+    customer_id: Optional[int]
+    visible: bool = True
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Project":
+        return cls(data['id'], data.get('name') or f"Project {data['id']}",
+                   reference_id(data.get('customer')), bool(data.get('visible', True)))
+
+
+class Activity(NamedTuple):
+    id: int
+    name: str
+    project_id: Optional[int] = None
+    visible: bool = True
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Activity":
+        return cls(data['id'], data.get('name') or f"Activity {data['id']}",
+                   reference_id(data.get('project')), bool(data.get('visible', True)))
+
+
+class Timesheet(NamedTuple):
+    id: int
+    begin: str
+    end: Optional[str]
+    duration: Optional[int]
+    project_id: Optional[int]
+    activity_id: Optional[int]
+    description: str = ""
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Timesheet":
+        """Decode a timesheet, lean (ids) or ``full=true`` (nested objects)"""
+        return cls(data['id'], data.get('begin') or "", data.get('end'), data.get('duration'),
+                   reference_id(data.get('project')), reference_id(data.get('activity')),
+                   data.get('description') or "")
+
+    @property
+    def is_running(self) -> bool:
+        return self.end is None
@@ -1,3 +1,9 @@
+# Import python modules
+import atexit
+import os
+import weakref
+from typing import Optional
+
 # Import StreamController modules
 from src.backend.PluginManager.PluginBase import PluginBase
 from src.backend.PluginManager.ActionHolder import ActionHolder
@@ -8,10 +14,23 @@ from src.backend.PluginManager.ActionInputSupport import ActionInputSupport
 from .actions.StartTracking.StartTracking import StartTracking
 from .actions.StopTracking.StopTracking import StopTracking
 from .actions.DisplayActiveTracking.DisplayActiveTracking import DisplayActiveTracking
+from .actions.ResumeRecent.ResumeRecent import ResumeRecent
+from .actions.TrackedTotals.TrackedTotals import TrackedTotals
 
 # Import settings
 from .settings import KimaiPluginSettings
 
+# Import shared Kimai services
+from .kimai_instance import KimaiInstance
+from .idle_monitor import IdleMonitor, NullLockDetector, ScreenSaverLockDetector
+from .plugin_log import configure as configure_logging, get_logger
+from .request_budget import DEFAULT_ACTION_SECONDS, configure as configure_requests
+from .source_scheduler import SourceScheduler
+from .state_cache import ActionStateCache
+from .settings_cache import DEFAULT_PROFILE, ConnectionProfile, SettingsSnapshot, connection_profiles
+
+log = get_logger("plugin")
+
 class PluginTemplate(PluginBase):
     def _add_icons(self):
         """Add icons for the actions"""
@@ -35,7 +54,7 @@ class PluginTemplate(PluginBase):
             action_name="Start Time Tracking",
             action_support={
                 Input.Key: ActionInputSupport.SUPPORTED,
-                Input.Dial: ActionInputSupport.UNTESTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
                 Input.Touchscreen: ActionInputSupport.UNTESTED,
             }
         )
@@ -69,17 +88,75 @@ class PluginTemplate(PluginBase):
         )
         self.add_action_holder(self.display_active_tracking_holder)
 
+        # Resume Recent Action
+        self.resume_recent_holder = ActionHolder(
+            plugin_base=self,
+            action_base=ResumeRecent,
+            action_id="com_thiritin_kimai_plugin::ResumeRecent",
+            action_name="Resume Recent Task",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.UNTESTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED,
+            }
+        )
+        self.add_action_holder(self.resume_recent_holder)
+
+        # Tracked Totals Action
+        self.tracked_totals_holder = ActionHolder(
+            plugin_base=self,
+            action_base=TrackedTotals,
+            action_id="com_thiritin_kimai_plugin::TrackedTotals",
+            action_name="Tracked Totals (Today / Week)",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.UNTESTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED,
+            }
+        )
+        self.add_action_holder(self.tracked_totals_holder)
+
     def __init__(self):
         super().__init__()
 
         # Enable plugin settings
         self.has_plugin_settings = True
         
+        # Idle/away detection: polling pauses and clocks slow down while nobody is at the deck
+        self.idle_monitor = IdleMonitor()
+        self.idle_monitor.subscribe(self._on_idle_resumed)
+        
+        # Local data (timesheet mirrors) lives with the plugin's settings, not in its install folder
+        self.data_dir = self._data_dir()
+        
+        # Every GLib timeout of the actions and pollers, suspended while their page is hidden
+        self.source_scheduler = SourceScheduler(self.idle_monitor)
+
+        # Cached settings snapshot; connection profiles and per-instance services derive from it
+        self.settings_snapshot = SettingsSnapshot(self.get_settings)
+        self._kimai_instances = None
+        self.connection_profile_subscribers = []
+        self.settings_snapshot.subscribe(self._apply_log_settings)
+        self._apply_log_settings(self.settings_snapshot.get())
+        self.settings_snapshot.subscribe(self._on_settings_changed)
+        self.settings_snapshot.subscribe(self._apply_idle_settings)
+        self._apply_idle_settings(self.settings_snapshot.get())
+        self.settings_snapshot.subscribe(self._apply_request_settings)
+        self._apply_request_settings(self.settings_snapshot.get())
+        
         # Initialize settings manager
         self.settings_manager = KimaiPluginSettings(self)
+        atexit.register(self.settings_manager.flush)
         
-        # Simple notification system for inter-action communication
-        self.action_instances = []
+        # Simple notification system for inter-action communication; held weakly so a
+        # discarded action (e.g. after a page reload) can be collected and clean up after itself
+        self.action_instances = weakref.WeakSet()
+        
+        # Last known state per action so revisited pages render instantly
+        self.action_state_cache = ActionStateCache()
+
+        # Rebuild a Kimai instance (pool, caches, poller) when its profile changes
+        self.subscribe_connection_profile(self._on_connection_profile_changed)
 
         # Initialize components
         self._add_icons()
@@ -93,36 +170,214 @@ class PluginTemplate(PluginBase):
             plugin_version="1.0.0",
             app_version="1.0.0",
         )
+
+        # Warm the connection and fetch the active timesheet once per Kimai instance
+        for instance in self.kimai_instances.values():
+            instance.startup_prefetch.start(instance.profile)
+    
+    def _data_dir(self) -> str:
+        """Per-plugin directory in StreamController's data path; updates and reinstalls replace the plugin folder"""
+        settings_path = getattr(self, "settings_path", None)
+        if settings_path:
+            return os.path.join(os.path.dirname(settings_path), "data")
+        try:
+            import globals as gl
+            plugin_id = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+            return os.path.join(gl.DATA_PATH, "settings", "plugins", plugin_id, "data")
+        except (ImportError, AttributeError):
+            # Outside StreamController (benchmarks)
+            return os.path.join(getattr(self, "PATH", None) or os.path.dirname(os.path.abspath(__file__)), "data")
+    
+    def set_settings(self, settings):
+        """Save plugin settings and refresh the cached snapshot"""
+        super().set_settings(settings)
+        self.settings_snapshot.invalidate()
+    
+    @property
+    def kimai_instances(self) -> dict:
+        """Profile id -> KimaiInstance, built from the settings snapshot on first use"""
+        if self._kimai_instances is None:
+            self._kimai_instances = {
+                key: KimaiInstance(profile, self.source_scheduler, self.data_dir, self.validate_start_buttons)
+                for key, profile in connection_profiles(self.settings_snapshot.get()).items()
+            }
+        return self._kimai_instances
+    
+    def get_kimai_instance(self, profile_id: str = DEFAULT_PROFILE) -> KimaiInstance:
+        """The Kimai instance for a profile id, falling back to the default profile"""
+        instances = self.kimai_instances
+        return instances.get(profile_id) or instances[DEFAULT_PROFILE]
+    
+    def get_profiles(self) -> list:
+        """All configured profiles, default profile first"""
+        return [instance.profile for instance in self.kimai_instances.values()]
+    
+    @property
+    def connection_profile(self) -> ConnectionProfile:
+        """The default profile (global Kimai URL and API token)"""
+        return self.get_kimai_instance().profile
+    
+    def subscribe_connection_profile(self, callback):
+        """Call callback(profile) whenever the Kimai URL or API token changes"""
+        if callback not in self.connection_profile_subscribers:
+            self.connection_profile_subscribers.append(callback)
+    
+    def unsubscribe_connection_profile(self, callback):
+        if callback in self.connection_profile_subscribers:
+            self.connection_profile_subscribers.remove(callback)
+    
+    def _apply_log_settings(self, settings):
+        """Log levels per subsystem, and every configured API token for redaction"""
+        configure_logging(
+            settings.get("log_level"),
+            settings.get("log_levels") or {},
+            secrets=[profile.api_token for profile in connection_profiles(settings).values()],
+        )
+    
+    def _apply_idle_settings(self, settings):
+        """Idle timeout and screen lock detection from the power saving settings"""
+        try:
+            self.idle_monitor.idle_after = max(0, int(settings.get("idle_after_minutes", 15))) * 60
+        except (TypeError, ValueError):
+            self.idle_monitor.idle_after = 15 * 60
+        
+        wants_lock_detection = bool(settings.get("idle_when_locked", False))
+        if wants_lock_detection != isinstance(self.idle_monitor.detector, ScreenSaverLockDetector):
+            self.idle_monitor.set_detector(
+                ScreenSaverLockDetector(self.idle_monitor.touch) if wants_lock_detection else NullLockDetector()
+            )
+    
+    def _apply_request_settings(self, settings):
+        """Deadline per button press and GET hedging from the network settings"""
+        try:
+            action_seconds = float(settings.get("action_deadline_seconds", DEFAULT_ACTION_SECONDS))
+        except (TypeError, ValueError):
+            action_seconds = DEFAULT_ACTION_SECONDS
+        configure_requests(action_seconds, settings.get("hedge_requests", False))
+    
+    def _on_idle_resumed(self):
+        """Back from idle: restore timers and refresh every polled instance once"""
+        self.source_scheduler.resume_idle()
+        if self._kimai_instances is None:
+            return
+        for instance in self._kimai_instances.values():
+            if instance.active_poller.has_periodic_subscribers:
+                instance.active_poller.refresh()
+    
+    def _on_settings_changed(self, settings):
+        """Rebuild changed connection profiles and notify subscribers"""
+        if self._kimai_instances is None:
+            return
+        
+        profiles = connection_profiles(settings)
+        
+        # Drop instances whose profile was removed; their buttons fall back to the default profile
+        removed = [key for key in self._kimai_instances if key not in profiles]
+        for key in removed:
+            self._kimai_instances.pop(key).close()
+        if removed:
+            self._notify_actions_profile_changed(profiles[DEFAULT_PROFILE])
+        
+        for key, profile in profiles.items():
+            current = self._kimai_instances.get(key)
+            if current is not None and current.profile == profile:
+                continue
+            
+            for callback in list(self.connection_profile_subscribers):
+                try:
+                    callback(profile)
+                except Exception as e:
+                    log.error("Error notifying connection profile subscriber: {}", e)
+    
+    def _on_connection_profile_changed(self, profile):
+        """Replace the instance: cached catalog, recent entries and connections belong to the old one"""
+        instance = KimaiInstance(profile, self.source_scheduler, self.data_dir, self.validate_start_buttons)
+        previous = self._kimai_instances.get(profile.id)
+        if previous is not None:
+            instance.active_poller.adopt(previous.active_poller)
+            previous.close()
+        self._kimai_instances[profile.id] = instance
+        self._notify_actions_profile_changed(profile)
+        
+        # Same warm-up as at startup, so the new instance's catalog snapshot backs button validation
+        instance.startup_prefetch.start(profile)
+    
+    def _notify_actions_profile_changed(self, profile):
+        """Let actions resubscribe to the (possibly replaced) instance of their profile"""
+        for action in list(self.action_instances):
+            if hasattr(action, 'on_connection_profile_changed'):
+                try:
+                    action.on_connection_profile_changed(profile)
+                except Exception as e:
+                    log.error("Error notifying action instance: {}", e)
     
     def register_action_instance(self, action_instance):
         """Register an action instance for notifications"""
-        if action_instance not in self.action_instances:
-            self.action_instances.append(action_instance)
+        self.action_instances.add(action_instance)
     
     def unregister_action_instance(self, action_instance):
         """Unregister an action instance"""
-        if action_instance in self.action_instances:
-            self.action_instances.remove(action_instance)
+        self.action_instances.discard(action_instance)
     
-    def notify_timesheet_stopped(self):
-        """Notify all StartTracking instances that a timesheet has been stopped"""
-        for instance in self.action_instances:
+    def known_active_timesheet_id(self, profile_id: str = DEFAULT_PROFILE) -> Optional[int]:
+        """The running timesheet's id as known locally, without asking Kimai (None if unknown).
+
+        A running Start button knows the entry it started; otherwise the last
+        successful shared poll does. Either may be stale, so callers must cope
+        with Kimai rejecting the id.
+        """
+        kimai_instance = self.get_kimai_instance(profile_id)
+        for action in list(self.action_instances):
+            if isinstance(action, StartTracking) and action.is_running and action.current_timesheet_id:
+                if action.kimai_instance() is kimai_instance:
+                    return action.current_timesheet_id
+        
+        poller = kimai_instance.active_poller
+        if poller.last_ok and poller.last_timesheet is not None:
+            return poller.last_timesheet.id
+        return None
+    
+    def validate_start_buttons(self, kimai_instance: KimaiInstance):
+        """Check every Start button of an instance against its catalog snapshot in one pass (no requests)"""
+        invalid = 0
+        for action in list(self.action_instances):
+            if isinstance(action, StartTracking) and action.kimai_instance() is kimai_instance:
+                try:
+                    if action.validate_task() is not None:
+                        invalid += 1
+                except Exception as e:
+                    log.error("Error validating Start button: {}", e)
+        if invalid:
+            log.warning("{} Start button(s) of '{}' are configured with a task Kimai no longer offers", invalid, kimai_instance.profile.name)
+    
+    def notify_timesheet_stopped(self, profile_id: str = DEFAULT_PROFILE):
+        """Notify all action instances that a timesheet has been stopped"""
+        # One shared poll per instance instead of one request per button
+        kimai_instance = self.get_kimai_instance(profile_id)
+        kimai_instance.active_poller.refresh()
+        
+        # The finished entry is history now; pull it into the local mirror and the restart candidates
+        kimai_instance.sync_timesheet_store()
+        kimai_instance.recent_timesheets.invalidate()
+        
+        for instance in list(self.action_instances):
             if hasattr(instance, 'on_timesheet_stopped_notification'):
                 try:
                     instance.on_timesheet_stopped_notification()
                 except Exception as e:
-                    from loguru import logger as log
-                    log.error(f"Error notifying action instance: {e}")
+                    log.error("Error notifying action instance: {}", e)
     
-    def notify_timesheet_started(self):
+    def notify_timesheet_started(self, profile_id: str = DEFAULT_PROFILE):
         """Notify all action instances that a timesheet has been started"""
-        for instance in self.action_instances:
+        # One shared poll per instance instead of one request per button
+        self.get_kimai_instance(profile_id).active_poller.refresh()
+        
+        for instance in list(self.action_instances):
             if hasattr(instance, 'on_timesheet_started_notification'):
                 try:
                     instance.on_timesheet_started_notification()
                 except Exception as e:
-                    from loguru import logger as log
-                    log.error(f"Error notifying action instance: {e}")
+                    log.error("Error notifying action instance: {}", e)
     
     def get_settings_area(self):
         """Return the settings area for the plugin"""
@@ -0,0 +1,106 @@
+# Import python modules
+import time
+from typing import Callable, Optional
+from .plugin_log import get_logger
+
+log = get_logger("ui")
+
+# Main-loop time one fill slice may use before yielding to redraws and input
+FRAME_BUDGET_MS = 8
+INITIAL_CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = 2000
+
+
+class ModelFill:
+    """Fills a Gtk.StringList in bounded chunks from idle callbacks.
+
+    Appending rows one by one emits an items-changed signal per row, and a
+    dropdown bound to the model re-validates on each of them, so a few
+    thousand projects used to block the main loop for seconds. Rows are
+    inserted with one ``splice`` per chunk instead, and each idle callback
+    stops after ``budget_ms`` so the UI keeps drawing in between. The chunk
+    size adapts to how long the previous splice took.
+
+    The dropdown's selection handler is blocked until the model is complete,
+    then ``on_done`` runs (typically to restore the saved selection).
+    """
+
+    def __init__(self, model, rows: list, dropdown=None, handler: Optional[Callable] = None,
+                 on_done: Optional[Callable] = None, budget_ms: float = FRAME_BUDGET_MS):
+        self.model = model
+        self.rows = rows
+        self.dropdown = dropdown
+        self.handler = handler
+        self.on_done = on_done
+        self.budget = budget_ms / 1000
+
+        self.position = 0
+        self.chunk_size = INITIAL_CHUNK_SIZE
+        self.slices = 0
+        self.longest_slice_ms = 0.0
+        self.source_id = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.source_id is not None
+
+    def start(self) -> None:
+        """Clear the model and schedule the first chunk"""
+        from gi.repository import GLib
+        if self.dropdown is not None and self.handler is not None:
+            self.dropdown.handler_block_by_func(self.handler)
+        self.model.splice(0, self.model.get_n_items(), [])
+        self.source_id = GLib.idle_add(self._fill_slice)
+
+    def cancel(self) -> None:
+        """Stop filling (e.g. a newer fetch replaced the rows); the model keeps what was inserted"""
+        if self.source_id is None:
+            return
+        from gi.repository import GLib
+        GLib.source_remove(self.source_id)
+        self._finish()
+
+    def _fill_slice(self) -> bool:
+        try:
+            slice_start = time.perf_counter()
+            while self.position < len(self.rows):
+                chunk_start = time.perf_counter()
+                chunk = self.rows[self.position:self.position + self.chunk_size]
+                self.model.splice(self.model.get_n_items(), 0, chunk)
+                self.position += len(chunk)
+                self._adapt_chunk_size(time.perf_counter() - chunk_start)
+
+                if time.perf_counter() - slice_start >= self.budget:
+                    break
+
+            self.slices += 1
+            self.longest_slice_ms = max(self.longest_slice_ms, (time.perf_counter() - slice_start) * 1000)
+        except Exception as e:
+            log.error("Error filling dropdown model: {}", e)
+            self.position = len(self.rows)
+
+        if self.position < len(self.rows):
+            return True  # Continue in the next idle callback
+
+        log.debug("Filled {} rows in {} slice(s), longest slice {:.1f} ms", len(self.rows), self.slices, self.longest_slice_ms)
+        self.source_id = None
+        self._finish()
+        if self.on_done is not None:
+            try:
+                self.on_done()
+            except Exception as e:
+                log.error("Error finishing dropdown fill: {}", e)
+        return False
+
+    def _adapt_chunk_size(self, elapsed: float) -> None:
+        """Aim for chunks that take about half the budget"""
+        if elapsed > self.budget / 2:
+            self.chunk_size = max(1, self.chunk_size // 2)
+        elif elapsed < self.budget / 8:
+            self.chunk_size = min(MAX_CHUNK_SIZE, self.chunk_size * 2)
+
+    def _finish(self) -> None:
+        self.source_id = None
+        if self.dropdown is not None and self.handler is not None:
+            self.dropdown.handler_unblock_by_func(self.handler)
+            self.dropdown = None  # Unblock exactly once
@@ -0,0 +1,176 @@
+# Import python modules
+import re
+import threading
+import time
+from loguru import logger as _loguru
+
+# Level names the settings offer, with loguru's numeric severities
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+DEFAULT_LEVEL = "INFO"
+
+# Subsystem -> what it covers (shown in the settings)
+SUBSYSTEMS = {
+    "api": "Kimai API requests and responses",
+    "poller": "Active timesheet polling",
+    "cache": "Catalog, totals and timesheet caches",
+    "scheduler": "Timers and idle detection",
+    "ui": "Buttons and their configuration panels",
+    "plugin": "Plugin setup and settings",
+}
+
+_BEARER = re.compile(r"(Bearer\s+)[^\s'\",}]+")
+REDACTED = "[REDACTED]"
+
+
+class _Redactor:
+    """Loguru patcher that masks API tokens in every emitted plugin message.
+
+    Runs after the message is formatted, i.e. only for records that pass the
+    level gate, so it costs nothing for suppressed messages.
+    """
+
+    def __init__(self):
+        self.secrets = ()
+
+    def __call__(self, record) -> None:
+        record["message"] = self.redact(record["message"])
+
+    def redact(self, text: str) -> str:
+        for secret in self.secrets:
+            if secret in text:
+                text = text.replace(secret, REDACTED)
+        return _BEARER.sub(rf"\g<1>{REDACTED}", text)
+
+
+_redactor = _Redactor()
+_sink = _loguru.patch(_redactor)
+
+_lock = threading.Lock()
+_default_level = LEVELS[DEFAULT_LEVEL]
+_levels = {}    # subsystem -> numeric level overriding the default
+_samples = {}   # (subsystem, key) -> [last emitted at, suppressed since]
+_loggers = {}   # subsystem -> PluginLogger
+
+
+def configure(default_level: str = DEFAULT_LEVEL, levels: dict = None, secrets=()) -> None:
+    """Apply the logging settings: default level, per-subsystem levels and the tokens to redact"""
+    global _default_level, _levels
+    _default_level = LEVELS.get(str(default_level or DEFAULT_LEVEL).upper(), LEVELS[DEFAULT_LEVEL])
+    _levels = {
+        subsystem: LEVELS[str(level).upper()]
+        for subsystem, level in (levels or {}).items()
+        if str(level).upper() in LEVELS
+    }
+    # Longest first so a token containing another one is masked whole
+    _redactor.secrets = tuple(sorted({secret for secret in secrets if secret and len(secret) >= 4}, key=len, reverse=True))
+
+
+def redact(text: str) -> str:
+    """Mask configured tokens and bearer credentials in text"""
+    return _redactor.redact(text)
+
+
+def get_logger(subsystem: str) -> "PluginLogger":
+    """The shared logger of a subsystem (one of ``SUBSYSTEMS``)"""
+    logger = _loggers.get(subsystem)
+    if logger is None:
+        logger = _loggers.setdefault(subsystem, PluginLogger(subsystem))
+    return logger
+
+
+class PluginLogger:
+    """Level-gated, lazily formatting front end to loguru for one subsystem.
+
+    Pass values as arguments instead of building f-strings on hot paths:
+    ``log.debug("Fetched {} projects", len(projects))`` is formatted only if
+    the subsystem's level lets the message through, and callable arguments
+    (``lambda: ...``) are only evaluated then.
+    """
+
+    __slots__ = ("subsystem",)
+
+    def __init__(self, subsystem: str):
+        self.subsystem = subsystem
+
+    def is_enabled(self, level: str) -> bool:
+        return LEVELS[level] >= _levels.get(self.subsystem, _default_level)
+
+    def debug(self, message: str, *args, **kwargs) -> None:
+        if self.is_enabled("DEBUG"):
+            self._emit("DEBUG", message, args, kwargs)
+
+    def info(self, message: str, *args, **kwargs) -> None:
+        if self.is_enabled("INFO"):
+            self._emit("INFO", message, args, kwargs)
+
+    def warning(self, message: str, *args, **kwargs) -> None:
+        if self.is_enabled("WARNING"):
+            self._emit("WARNING", message, args, kwargs)
+
+    def error(self, message: str, *args, **kwargs) -> None:
+        if self.is_enabled("ERROR"):
+            self._emit("ERROR", message, args, kwargs)
+
+    def every(self, key: str, seconds: float):
+        """This logger at most once per ``seconds`` for ``key``, a muted one in between.
+
+        For messages that repeat on every poll or timer tick; the next emitted
+        message reports how many were dropped.
+        """
+        now = time.monotonic()
+        with _lock:
+            sample = _samples.setdefault((self.subsystem, key), [None, 0])
+            if sample[0] is not None and now - sample[0] < seconds:
+                sample[1] += 1
+                return _MUTED
+            suppressed = sample[1]
+            sample[0], sample[1] = now, 0
+        return _Sampled(self, suppressed) if suppressed else self
+
+    def _emit(self, level: str, message: str, args: tuple, kwargs: dict, suffix: str = "", depth: int = 2) -> None:
+        try:
+            # Not loguru's lazy mode: that would call every argument, not just the callables
+            args = tuple(value() if callable(value) else value for value in args)
+            kwargs = {name: value() if callable(value) else value for name, value in kwargs.items()}
+            _sink.opt(depth=depth).log(level, message + suffix, *args, **kwargs)
+        except Exception as e:
+            # Never let a malformed log call break the code path that made it
+            _sink.error(f"Failed to log message from {self.subsystem}: {e}")
+
+
+class _Sampled:
+    """One emission through a sampled logger, noting how many messages were dropped"""
+
+    __slots__ = ("logger", "suffix")
+
+    def __init__(self, logger: PluginLogger, suppressed: int):
+        self.logger = logger
+        self.suffix = f" ({suppressed} similar message(s) suppressed)"
+
+    def debug(self, message: str, *args, **kwargs) -> None:
+        self._log("DEBUG", message, args, kwargs)
+
+    def info(self, message: str, *args, **kwargs) -> None:
+        self._log("INFO", message, args, kwargs)
+
+    def warning(self, message: str, *args, **kwargs) -> None:
+        self._log("WARNING", message, args, kwargs)
+
+    def error(self, message: str, *args, **kwargs) -> None:
+        self._log("ERROR", message, args, kwargs)
+
+    def _log(self, level: str, message: str, args: tuple, kwargs: dict) -> None:
+        if self.logger.is_enabled(level):
+            self.logger._emit(level, message, args, kwargs, suffix=self.suffix, depth=3)
+
+
+class _Muted:
+    """Stands in for a logger while a sampled message is suppressed"""
+
+    def debug(self, *args, **kwargs) -> None:
+        pass
+
+    info = warning = error = debug
+
+
+_MUTED = _Muted()
@@ -0,0 +1,100 @@
+# Import python modules
+import time
+import threading
+from typing import Optional
+
+from .kimai_records import Timesheet
+from .plugin_log import get_logger
+
+log = get_logger("cache")
+
+class RecentTimesheetsCache:
+    """Locally cached copy of /api/timesheets/recent used as restart candidates.
+
+    Switching to a project/activity pair that was tracked recently only needs a
+    single PATCH /api/timesheets/{id}/restart, so the candidate lookup must not
+    cost another round trip. The list is refreshed at most once per ``max_age``.
+    """
+
+    def __init__(self, kimai_api, max_age: int = 300):
+        self.kimai_api = kimai_api
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._timesheets = []
+        self._fetched_at = 0.0
+        # Restart candidate lookups answered from the list vs. falling back to stop + create
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, profile, refresh: bool = False) -> list:
+        """Return the recent timesheets, fetching them if the cache is stale"""
+        # Only one thread fetches; concurrent callers wait and reuse its result
+        with self._fetch_lock:
+            with self._lock:
+                is_fresh = self._fetched_at and time.monotonic() - self._fetched_at < self.max_age
+                if is_fresh and not refresh:
+                    return list(self._timesheets)
+
+            timesheets = self.kimai_api.get_recent_timesheets(profile)
+
+            with self._lock:
+                if timesheets is not None:
+                    self._timesheets = timesheets
+                    self._fetched_at = time.monotonic()
+                    log.info("Cached {} recent timesheets", len(timesheets))
+                # Keep serving the old list if the refresh failed
+                return list(self._timesheets)
+
+    def cached(self) -> list:
+        """Return the cached list without touching the network"""
+        with self._lock:
+            return list(self._timesheets)
+
+    def find(self, project_id, activity_id, description: str = None) -> Optional[Timesheet]:
+        """Find a cached timesheet for the given project/activity pair.
+
+        When a description is given, only an entry with the same description
+        matches, because a restart copies the original description.
+        """
+        with self._lock:
+            for timesheet in self._timesheets:
+                if str(timesheet.project_id) == str(project_id) and str(timesheet.activity_id) == str(activity_id):
+                    if description is None or timesheet.description == description:
+                        self.hits += 1
+                        return timesheet
+            self.misses += 1
+        return None
+
+    def remember(self, timesheet: Timesheet) -> None:
+        """Put a freshly started timesheet at the front of the cached list.
+
+        Finished entries stay where they are, including the one just restarted:
+        Resume Recent buttons pick finished entries by position, so dropping it
+        would shift every button until the next refresh. Only an older running
+        entry of the same pair is replaced. Entries the start stopped still
+        look running here, so the list is marked stale for the next ``get``.
+        """
+        with self._lock:
+            self._timesheets = [timesheet] + [
+                t for t in self._timesheets
+                if t.id != timesheet.id and not (t.is_running and t.project_id == timesheet.project_id and
+                                                 t.activity_id == timesheet.activity_id)
+            ]
+            self._fetched_at = 0.0
+
+    def forget(self, timesheet_id) -> None:
+        """Drop a timesheet that no longer exists on the server"""
+        with self._lock:
+            self._timesheets = [t for t in self._timesheets if t.id != timesheet_id]
+
+    def clear(self) -> None:
+        """Drop the cached list entirely"""
+        with self._lock:
+            self._timesheets = []
+            self._fetched_at = 0.0
+
+    def invalidate(self) -> None:
+        """Force the next get() to refetch"""
+        with self._lock:
+            self._fetched_at = 0.0
@@ -0,0 +1,247 @@
+# Import python modules
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from .plugin_log import get_logger
+
+log = get_logger("api")
+
+# The call sites' fixed timeout; never exceeded, and used until an endpoint has enough samples
+DEFAULT_TIMEOUT = 10.0
+# Adaptive timeouts never drop below this, however fast an endpoint usually answers
+MIN_TIMEOUT = 2.0
+# Adaptive timeout = p95 latency times this
+TIMEOUT_FACTOR = 4.0
+# Samples per endpoint before its percentiles are trusted
+MIN_SAMPLES = 20
+DEFAULT_ACTION_SECONDS = 8
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+_local = threading.local()
+_action_seconds = float(DEFAULT_ACTION_SECONDS)
+_hedge_gets = False
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The press that issued the request has used up its time budget"""
+
+
+class Deadline:
+    """Point in (monotonic) time by which a user action must have its feedback"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+def configure(action_seconds: float = DEFAULT_ACTION_SECONDS, hedge_gets: bool = False) -> None:
+    """Apply the request settings: budget per button press (0 disables) and GET hedging"""
+    global _action_seconds, _hedge_gets
+    _action_seconds = max(0.0, float(action_seconds))
+    _hedge_gets = bool(hedge_gets)
+
+
+def action_deadline() -> Optional[Deadline]:
+    """A new deadline for a button press, or None when budgets are disabled"""
+    return Deadline(_action_seconds) if _action_seconds > 0 else None
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The deadline of the action running on this thread, if any"""
+    return getattr(_local, "deadline", None)
+
+
+@contextmanager
+def deadline_budget(deadline: Optional[Deadline]):
+    """Bound every Kimai request made on this thread by ``deadline`` (an earlier outer one wins)"""
+    outer = current_deadline()
+    if deadline is None or (outer is not None and outer.expires_at <= deadline.expires_at):
+        yield outer
+        return
+    _local.deadline = deadline
+    try:
+        yield deadline
+    finally:
+        _local.deadline = outer
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Method and path with numeric ids masked, e.g. ``PATCH /api/timesheets/{id}/stop``"""
+    return f"{method.upper()} {_ID_SEGMENT.sub('/{id}', urlsplit(url).path)}"
+
+
+class LatencyStats:
+    """Recent response times of one endpoint"""
+
+    def __init__(self, size: int = 100):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p: float, min_samples: int = MIN_SAMPLES) -> Optional[float]:
+        """The p-th percentile (0-100) of the recent samples, or None until there are enough"""
+        samples = list(self.samples)
+        if len(samples) < max(1, min_samples):
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class BudgetedSession(requests.Session):
+    """Session whose timeouts follow observed latency and the current action's deadline.
+
+    Each request's timeout is the smallest of the caller's, the endpoint's
+    adaptive timeout (its p95 latency times ``TIMEOUT_FACTOR``, once enough
+    responses were seen) and the time left on the deadline of the button
+    press being handled on this thread. Only idempotent GETs get the
+    adaptive timeout: giving up early on a write that Kimai may still
+    complete invites a duplicate on retry. A request started after the deadline
+    has passed raises ``DeadlineExceeded`` right away, so a multi-request
+    sequence such as stop + start fails within the budget instead of after
+    several full timeouts. With hedging enabled, a GET that takes longer than
+    its endpoint's p95 is sent a second time and the first answer is used.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._stats_lock = threading.Lock()
+        self.latency = {}  # endpoint key -> LatencyStats
+        self.sent = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.hedged = 0
+        self.hedges_won = 0
+        self.deadline_exceeded = 0
+
+    def stats(self, key: str) -> LatencyStats:
+        with self._stats_lock:
+            stats = self.latency.get(key)
+            if stats is None:
+                stats = self.latency[key] = LatencyStats()
+            return stats
+
+    def adaptive_timeout(self, key: str) -> float:
+        """Timeout for an endpoint derived from its recent latency"""
+        p95 = self.stats(key).percentile(95)
+        if p95 is None:
+            return DEFAULT_TIMEOUT
+        return min(DEFAULT_TIMEOUT, max(MIN_TIMEOUT, p95 * TIMEOUT_FACTOR))
+
+    def request(self, method, url, *args, **kwargs):
+        key = endpoint_key(method, url)
+        is_get = method.upper() == "GET"
+        timeout = _as_seconds(kwargs.get("timeout"))
+        if is_get:
+            timeout = min(timeout, self.adaptive_timeout(key))
+
+        deadline = current_deadline()
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                with self._stats_lock:
+                    self.deadline_exceeded += 1
+                raise DeadlineExceeded(f"{key}: action deadline of {deadline.seconds:g}s exceeded")
+            timeout = min(timeout, remaining)
+        kwargs["timeout"] = timeout
+
+        p95 = self.stats(key).percentile(95)
+        if _hedge_gets and is_get and p95 is not None and p95 < timeout:
+            return self._hedged_request(key, p95, method, url, *args, **kwargs)
+
+        return self._send(key, method, url, *args, **kwargs)
+
+    def _send(self, key, method, url, *args, **kwargs):
+        """Send one request, counting it and recording its latency"""
+        with self._stats_lock:
+            self.sent += 1
+            self.in_flight += 1
+        started = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception:
+            with self._stats_lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+        self.stats(key).add(time.monotonic() - started)
+        return response
+
+    def _hedged_request(self, key, hedge_after, method, url, *args, **kwargs):
+        """Send a second copy of a slow idempotent GET and return whichever answers first"""
+        done = threading.Condition()
+        results = []  # (attempt, response or None, exception or None), in completion order
+
+        def attempt(number):
+            try:
+                response = self._send(key, method, url, *args, **kwargs)
+            except Exception as e:
+                with done:
+                    results.append((number, None, e))
+                    done.notify_all()
+                return
+            with done:
+                late = any(earlier is not None for _, earlier, _ in results)
+                results.append((number, response, None))
+                done.notify_all()
+            if late:
+                # The other copy already answered; give the connection back to the pool
+                response.close()
+
+        def answered():
+            return any(response is not None for _, response, _ in results)
+
+        timeout = kwargs["timeout"]
+        end = time.monotonic() + timeout
+        attempts = 1
+        threading.Thread(target=attempt, args=(1,), name="kimai-request", daemon=True).start()
+        with done:
+            done.wait_for(lambda: results, hedge_after)
+            if not results:
+                attempts = 2
+                with self._stats_lock:
+                    self.hedged += 1
+                log.debug("{} slower than p95 ({:.0f} ms), hedging", key, hedge_after * 1000)
+                threading.Thread(target=attempt, args=(2,), name="kimai-request-hedge", daemon=True).start()
+
+            # Only when every copy failed does the request fail
+            while not answered() and len(results) < attempts:
+                left = end - time.monotonic()
+                if left <= 0:
+                    break
+                done.wait(left)
+
+            for number, response, _ in results:
+                if response is not None:
+                    if number == 2:
+                        with self._stats_lock:
+                            self.hedges_won += 1
+                    return response
+            if results:
+                raise results[-1][2]
+        raise requests.exceptions.Timeout(f"{key}: no response within {timeout:.1f}s")
+
+
+def _as_seconds(timeout) -> float:
+    """Upper bound of a requests timeout value (number or (connect, read) tuple)"""
+    if timeout is None:
+        return DEFAULT_TIMEOUT
+    if isinstance(timeout, tuple):
+        bounds = [value for value in timeout if value is not None]
+        return max(bounds) if bounds else DEFAULT_TIMEOUT
+    return float(timeout)
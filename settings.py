@@ -1,13 +1,27 @@
+# Import python modules
+import threading
+
 # Import gtk modules
 import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, GLib
+
+from .diagnostics import collect as collect_diagnostics, hit_rate, probe_connection
+from .plugin_log import DEFAULT_LEVEL, LEVELS, SUBSYSTEMS, get_logger
+from .request_budget import DEFAULT_ACTION_SECONDS
+from .settings_cache import new_profile_id, profile_id
+from .settings_writer import DebouncedSettingsWriter
+
+log = get_logger("ui")
 
 class KimaiPluginSettings:
     def __init__(self, plugin_base):
         self.plugin_base = plugin_base
         
+        # Text fields write through this so typing doesn't rewrite the settings file per keystroke
+        self.writer = DebouncedSettingsWriter(plugin_base.get_settings, plugin_base.set_settings)
+        
     def get_settings_area(self):
         """Create and return the global settings UI for the plugin"""
         group = Adw.PreferencesGroup()
@@ -17,25 +31,347 @@ class KimaiPluginSettings:
         # Kimai URL setting
         self.kimai_url_row = Adw.EntryRow(title="Kimai URL")
         self.kimai_url_row.set_text(self.plugin_base.get_settings().get("global_kimai_url", ""))
-        self.kimai_url_row.connect("notify::text", self.on_kimai_url_changed)
+        self._apply_on_leave(self.kimai_url_row, self.on_kimai_url_changed)
         group.add(self.kimai_url_row)
         
         # API Token setting
         self.api_token_row = Adw.PasswordEntryRow(title="API Token")
         self.api_token_row.set_text(self.plugin_base.get_settings().get("global_api_token", ""))
-        self.api_token_row.connect("notify::text", self.on_api_token_changed)
+        self._apply_on_leave(self.api_token_row, self.on_api_token_changed)
         group.add(self.api_token_row)
         
-        return group
+        # Additional Kimai instances (e.g. client-hosted) selectable per action
+        self.profiles_group = Adw.PreferencesGroup()
+        self.profiles_group.set_title("Additional Kimai Instances")
+        self.profiles_group.set_description("Named connections that Start, Stop, Display Active Tracking, Resume Recent and Tracked Totals buttons can select instead of the global one. Each instance has its own connection pool and caches.")
+        
+        add_button = Gtk.Button(icon_name="list-add-symbolic")
+        add_button.add_css_class("flat")
+        add_button.connect("clicked", self.on_add_profile_clicked)
+        self.profiles_group.set_header_suffix(add_button)
+        
+        # Entries saved before ids existed keep their name as id, so buttons using them stay put
+        self.profiles = [dict(entry, id=profile_id(entry)) for entry in self.plugin_base.get_settings().get("kimai_profiles", [])]
+        self.profile_rows = []
+        self._build_profile_rows()
+        
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        box.append(group)
+        box.append(self.profiles_group)
+        box.append(self._build_power_saving_group())
+        box.append(self._build_network_group())
+        box.append(self._build_logging_group())
+        box.append(self._build_diagnostics_group())
+        return box
+    
+    def _build_power_saving_group(self):
+        """Idle/away mode: pause polling and slow down clocks while nobody is at the deck"""
+        settings = self.plugin_base.get_settings()
+        
+        power_group = Adw.PreferencesGroup()
+        power_group.set_title("Power Saving")
+        power_group.set_description("While idle, network polling pauses and elapsed time updates once a minute. Pressing any Kimai button resumes with one immediate refresh.")
+        
+        self.idle_after_row = Adw.SpinRow.new_with_range(0, 240, 5)
+        self.idle_after_row.set_title("Idle After (minutes)")
+        self.idle_after_row.set_subtitle("Minutes without a Kimai button press; 0 disables")
+        self.idle_after_row.set_value(settings.get("idle_after_minutes", 15))
+        self.idle_after_row.connect("notify::value", self.on_idle_after_changed)
+        power_group.add(self.idle_after_row)
+        
+        self.idle_when_locked_row = Adw.SwitchRow(title="Idle While Screen Is Locked")
+        self.idle_when_locked_row.set_subtitle("Uses the desktop screen saver over D-Bus")
+        self.idle_when_locked_row.set_active(settings.get("idle_when_locked", False))
+        self.idle_when_locked_row.connect("notify::active", self.on_idle_when_locked_changed)
+        power_group.add(self.idle_when_locked_row)
+        
+        return power_group
+    
+    def _build_network_group(self):
+        """Time budget per button press and hedging of slow lookups"""
+        settings = self.plugin_base.get_settings()
+        
+        network_group = Adw.PreferencesGroup()
+        network_group.set_title("Network")
+        network_group.set_description("Request timeouts follow how fast your Kimai instance usually answers. A button press that needs several requests gives up as a whole once its time budget is spent.")
+        
+        self.action_deadline_row = Adw.SpinRow.new_with_range(0, 60, 1)
+        self.action_deadline_row.set_title("Time Budget per Press (seconds)")
+        self.action_deadline_row.set_subtitle("Longest wait before a button shows success or failure; 0 disables")
+        self.action_deadline_row.set_value(settings.get("action_deadline_seconds", DEFAULT_ACTION_SECONDS))
+        self.action_deadline_row.connect("notify::value", self.on_action_deadline_changed)
+        network_group.add(self.action_deadline_row)
+        
+        self.hedge_requests_row = Adw.SwitchRow(title="Hedge Slow Lookups")
+        self.hedge_requests_row.set_subtitle("Repeat a read request that is slower than usual and use the first answer")
+        self.hedge_requests_row.set_active(settings.get("hedge_requests", False))
+        self.hedge_requests_row.connect("notify::active", self.on_hedge_requests_changed)
+        network_group.add(self.hedge_requests_row)
+        
+        return network_group
+    
+    def _build_logging_group(self):
+        """Log level overall and per subsystem; API tokens are always redacted"""
+        settings = self.plugin_base.get_settings()
+        level_names = list(LEVELS)
+        
+        logging_group = Adw.PreferencesGroup()
+        logging_group.set_title("Logging")
+        logging_group.set_description("Messages below the selected level are skipped before they are formatted. Raise a single subsystem to Debug when tracking down a problem.")
+        
+        self.log_level_row = Adw.ComboRow(title="Log Level")
+        self.log_level_row.set_model(Gtk.StringList.new([name.capitalize() for name in level_names]))
+        current_level = str(settings.get("log_level") or DEFAULT_LEVEL).upper()
+        self.log_level_row.set_selected(level_names.index(current_level) if current_level in level_names else level_names.index(DEFAULT_LEVEL))
+        self.log_level_row.connect("notify::selected", self.on_log_level_changed)
+        logging_group.add(self.log_level_row)
+        
+        subsystem_levels = settings.get("log_levels") or {}
+        subsystems_row = Adw.ExpanderRow(title="Per Subsystem")
+        subsystems_row.set_subtitle("Override the log level for parts of the plugin")
+        for subsystem, description in SUBSYSTEMS.items():
+            row = Adw.ComboRow(title=subsystem.capitalize())
+            row.set_subtitle(description)
+            row.set_model(Gtk.StringList.new(["Default"] + [name.capitalize() for name in level_names]))
+            level = str(subsystem_levels.get(subsystem, "")).upper()
+            row.set_selected(level_names.index(level) + 1 if level in level_names else 0)
+            row.connect("notify::selected", self.on_subsystem_log_level_changed, subsystem)
+            subsystems_row.add_row(row)
+        logging_group.add(subsystems_row)
+        
+        return logging_group
+    
+    def _build_diagnostics_group(self):
+        """Live request, cache, thread and source counters, and a connection probe"""
+        self.diagnostics_group = Adw.PreferencesGroup()
+        self.diagnostics_group.set_title("Diagnostics")
+        self.diagnostics_group.set_description("What the plugin is doing right now, updated every two seconds while this page is open.")
+        
+        self.requests_row = Adw.ActionRow(title="Requests")
+        self.diagnostics_group.add(self.requests_row)
+        
+        self.endpoints_row = Adw.ExpanderRow(title="Latency per Endpoint")
+        self.endpoints_row.set_subtitle("Median and 95th percentile of recent responses")
+        self.endpoint_rows = {}
+        self.diagnostics_group.add(self.endpoints_row)
+        
+        self.caches_row = Adw.ActionRow(title="Cache Hit Rates")
+        self.diagnostics_group.add(self.caches_row)
+        
+        self.threads_row = Adw.ActionRow(title="Threads")
+        self.diagnostics_group.add(self.threads_row)
+        
+        self.sources_row = Adw.ActionRow(title="GLib Sources")
+        self.diagnostics_group.add(self.sources_row)
+        
+        self.probe_row = Adw.ActionRow(title="Connection")
+        self.probe_row.set_subtitle("Measure round-trip time and throughput to the global Kimai instance")
+        self.probe_button = Gtk.Button(label="Measure")
+        self.probe_button.set_valign(Gtk.Align.CENTER)
+        self.probe_button.connect("clicked", self.on_measure_connection_clicked)
+        self.probe_row.add_suffix(self.probe_button)
+        self.diagnostics_group.add(self.probe_row)
+        
+        # Only refresh while the page is shown
+        self.diagnostics_timer_id = None
+        self.diagnostics_group.connect("map", self._on_diagnostics_mapped)
+        self.diagnostics_group.connect("unmap", self._on_diagnostics_unmapped)
+        self._refresh_diagnostics()
+        
+        return self.diagnostics_group
+    
+    def _on_diagnostics_mapped(self, *args):
+        if self.diagnostics_timer_id is None:
+            self.diagnostics_timer_id = GLib.timeout_add_seconds(2, self._refresh_diagnostics)
+    
+    def _on_diagnostics_unmapped(self, *args):
+        if self.diagnostics_timer_id is not None:
+            GLib.source_remove(self.diagnostics_timer_id)
+            self.diagnostics_timer_id = None
+    
+    def _refresh_diagnostics(self):
+        """Show the current counters (timer callback, keeps running while mapped)"""
+        try:
+            stats = collect_diagnostics(self.plugin_base)
+            
+            self.requests_row.set_subtitle(
+                f"{stats.requests_sent} sent, {stats.requests_in_flight} in flight, {stats.requests_failed} failed, "
+                f"{stats.over_budget} over the time budget, {stats.hedged} hedged")
+            
+            for endpoint in stats.endpoints:
+                row = self.endpoint_rows.get(endpoint.key)
+                if row is None:
+                    row = self.endpoint_rows[endpoint.key] = Adw.ActionRow(title=endpoint.key)
+                    self.endpoints_row.add_row(row)
+                latency = (f"p50 {endpoint.p50_ms:.0f} ms, p95 {endpoint.p95_ms:.0f} ms"
+                           if endpoint.p50_ms is not None else "no completed responses")
+                row.set_subtitle(f"{endpoint.count} requests, {latency}")
+            
+            rates = []
+            for name, (hits, misses) in stats.cache_hits.items():
+                rate = hit_rate(hits, misses)
+                rates.append(f"{name} {rate:.0f}%" if rate is not None else f"{name} –")
+            self.caches_row.set_subtitle(", ".join(rates))
+            
+            self.threads_row.set_subtitle(f"{stats.threads} running ({stats.daemon_threads} background)")
+            self.sources_row.set_subtitle(f"{stats.sources_live} armed, {stats.sources_suspended} suspended for hidden pages")
+        except Exception as e:
+            log.error("Error refreshing diagnostics: {}", e)
+        return self.diagnostics_timer_id is not None
+    
+    def on_measure_connection_clicked(self, button):
+        """Run the connection probe in the background and show its result"""
+        instance = self.plugin_base.get_kimai_instance()
+        if not instance.profile.is_configured:
+            self.probe_row.set_subtitle("Configure the Kimai URL and API token first")
+            return
+        
+        button.set_sensitive(False)
+        self.probe_row.set_subtitle("Measuring…")
+        
+        def probe():
+            try:
+                result = probe_connection(instance.kimai_api.session, instance.profile).describe()
+            except Exception as e:
+                log.error("Connection probe failed: {}", e)
+                result = f"Could not reach Kimai: {e}"
+            GLib.idle_add(self._show_probe_result, result)
+        
+        threading.Thread(target=probe, daemon=True).start()
+    
+    def _show_probe_result(self, result: str):
+        self.probe_row.set_subtitle(result)
+        self.probe_button.set_sensitive(True)
+        return False
+    
+    def _build_profile_rows(self):
+        """(Re)create one expander row per additional Kimai instance"""
+        for row in self.profile_rows:
+            self.profiles_group.remove(row)
+        self.profile_rows = []
+        
+        for index, profile in enumerate(self.profiles):
+            expander = Adw.ExpanderRow(title=profile.get("name", "") or "Unnamed")
+            expander.set_subtitle(profile.get("url", ""))
+            
+            name_row = Adw.EntryRow(title="Name")
+            name_row.set_text(profile.get("name", ""))
+            name_row.connect("notify::text", self.on_profile_field_changed, index, "name", expander)
+            self._apply_on_leave(name_row, self.on_profile_applied)
+            expander.add_row(name_row)
+            
+            url_row = Adw.EntryRow(title="Kimai URL")
+            url_row.set_text(profile.get("url", ""))
+            url_row.connect("notify::text", self.on_profile_field_changed, index, "url", expander)
+            self._apply_on_leave(url_row, self.on_profile_applied)
+            expander.add_row(url_row)
+            
+            token_row = Adw.PasswordEntryRow(title="API Token")
+            token_row.set_text(profile.get("token", ""))
+            token_row.connect("notify::text", self.on_profile_field_changed, index, "token", expander)
+            self._apply_on_leave(token_row, self.on_profile_applied)
+            expander.add_row(token_row)
+            
+            remove_button = Gtk.Button(label="Remove Instance")
+            remove_button.add_css_class("destructive-action")
+            remove_button.connect("clicked", self.on_remove_profile_clicked, index)
+            remove_row = Adw.ActionRow()
+            remove_row.add_suffix(remove_button)
+            expander.add_row(remove_row)
+            
+            self.profiles_group.add(expander)
+            self.profile_rows.append(expander)
+    
+    def _apply_on_leave(self, row, callback):
+        """Call ``callback(row)`` on the row's apply button, when focus leaves it and on teardown.
+
+        Connection fields replace a whole Kimai instance (pool, caches, poller)
+        when saved, so half-typed URLs and names must not be written.
+        """
+        row.set_show_apply_button(True)
+        row.connect("apply", callback)
+        focus_controller = Gtk.EventControllerFocus()
+        focus_controller.connect("leave", lambda _controller: callback(row))
+        row.add_controller(focus_controller)
+        row.connect("unrealize", callback)
+    
+    def _write_if_changed(self, key: str, value, default):
+        """Save a setting right away, unless it already holds ``value``"""
+        if self.writer.get(key, default) != value:
+            self.writer.update(key, value)
+            self.writer.flush()
     
     def on_kimai_url_changed(self, entry, *args):
         """Handle Kimai URL changes"""
-        settings = self.plugin_base.get_settings()
-        settings["global_kimai_url"] = entry.get_text()
-        self.plugin_base.set_settings(settings)
+        self._write_if_changed("global_kimai_url", entry.get_text(), "")
     
     def on_api_token_changed(self, entry, *args):
         """Handle API token changes"""
-        settings = self.plugin_base.get_settings()
-        settings["global_api_token"] = entry.get_text()
-        self.plugin_base.set_settings(settings)
+        self._write_if_changed("global_api_token", entry.get_text(), "")
+    
+    def on_idle_after_changed(self, spin_row, *args):
+        """Handle idle timeout changes"""
+        self.writer.update("idle_after_minutes", int(spin_row.get_value()))
+    
+    def on_idle_when_locked_changed(self, switch_row, *args):
+        """Handle screen lock detection toggle"""
+        self.writer.update("idle_when_locked", switch_row.get_active())
+        self.writer.flush()
+    
+    def on_action_deadline_changed(self, spin_row, *args):
+        """Handle time budget changes"""
+        self.writer.update("action_deadline_seconds", int(spin_row.get_value()))
+    
+    def on_hedge_requests_changed(self, switch_row, *args):
+        """Handle request hedging toggle"""
+        self.writer.update("hedge_requests", switch_row.get_active())
+        self.writer.flush()
+    
+    def on_log_level_changed(self, combo_row, *args):
+        """Handle default log level changes"""
+        self.writer.update("log_level", list(LEVELS)[combo_row.get_selected()])
+        self.writer.flush()
+    
+    def on_subsystem_log_level_changed(self, combo_row, _param, subsystem):
+        """Handle a subsystem's log level override (index 0 follows the default level)"""
+        levels = dict(self.writer.get("log_levels") or {})
+        selected = combo_row.get_selected()
+        if selected == 0:
+            levels.pop(subsystem, None)
+        else:
+            levels[subsystem] = list(LEVELS)[selected - 1]
+        self.writer.update("log_levels", levels)
+        self.writer.flush()
+    
+    def on_add_profile_clicked(self, button):
+        """Add a new, empty Kimai instance"""
+        self.profiles.append({"id": new_profile_id(), "name": f"Instance {len(self.profiles) + 1}", "url": "", "token": ""})
+        self.writer.update("kimai_profiles", [dict(profile) for profile in self.profiles])
+        self.writer.flush()
+        self._build_profile_rows()
+    
+    def on_remove_profile_clicked(self, button, index):
+        """Remove a Kimai instance; buttons using it fall back to the global connection"""
+        if index < len(self.profiles):
+            self.profiles.pop(index)
+            self.writer.update("kimai_profiles", [dict(profile) for profile in self.profiles])
+            self.writer.flush()
+            self._build_profile_rows()
+    
+    def on_profile_field_changed(self, entry, _param, index, field, expander):
+        """Track name/URL/token edits of an additional Kimai instance; saved by ``on_profile_applied``"""
+        if index >= len(self.profiles):
+            return
+        self.profiles[index][field] = entry.get_text()
+        if field == "name":
+            expander.set_title(entry.get_text() or "Unnamed")
+        elif field == "url":
+            expander.set_subtitle(entry.get_text())
+    
+    def on_profile_applied(self, entry, *args):
+        """Save the additional Kimai instances once an edit is applied or the field is left"""
+        self._write_if_changed("kimai_profiles", [dict(profile) for profile in self.profiles], [])
+    
+    def flush(self):
+        """Write any pending settings changes (called on shutdown)"""
+        self.writer.flush()
@@ -0,0 +1,136 @@
+# Import python modules
+import threading
+import uuid
+from types import MappingProxyType
+from typing import Callable, Mapping, NamedTuple
+from .plugin_log import get_logger
+
+log = get_logger("plugin")
+
+# Id (and name) of the profile built from the global Kimai URL / API token
+DEFAULT_PROFILE = ""
+
+# Problems with ``kimai_profiles`` entries already warned about
+_reported_problems = set()
+
+
+class ConnectionProfile(NamedTuple):
+    """Everything needed to talk to one Kimai instance, derived once from settings"""
+    name: str
+    base_url: str
+    api_token: str
+    headers: Mapping[str, str]
+    id: str = DEFAULT_PROFILE
+
+    @classmethod
+    def create(cls, name: str, url: str, api_token: str, profile_id: str = DEFAULT_PROFILE) -> "ConnectionProfile":
+        """Build a profile with a normalized base URL and prebuilt request headers"""
+        base_url = str(url or "").strip().rstrip('/')
+        api_token = str(api_token or "").strip()
+        headers = MappingProxyType({
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        })
+        return cls(name, base_url, api_token, headers, profile_id)
+
+    @classmethod
+    def from_settings(cls, settings: Mapping) -> "ConnectionProfile":
+        """The default profile from the global Kimai URL and API token"""
+        return cls.create(DEFAULT_PROFILE, settings.get("global_kimai_url", ""), settings.get("global_api_token", ""))
+
+    @property
+    def label(self) -> str:
+        """Name shown in the instance selectors"""
+        if self.id == DEFAULT_PROFILE:
+            return "Default"
+        return self.name or "Unnamed"
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.base_url and self.api_token)
+
+    def url(self, path: str) -> str:
+        """Absolute URL for an API path such as ``/api/timesheets``"""
+        return f"{self.base_url}{path}"
+
+
+def new_profile_id() -> str:
+    """Stable id for a new ``kimai_profiles`` entry; buttons keep it when the profile is renamed"""
+    return uuid.uuid4().hex
+
+
+def profile_id(entry: Mapping) -> str:
+    """Id of a ``kimai_profiles`` entry; entries saved before ids existed are keyed by their name"""
+    return str(entry.get("id") or entry.get("name", "")).strip()
+
+
+def action_profile_id(settings: Mapping) -> str:
+    """Profile an action's settings select; ``profile_name`` is the key used before ids existed"""
+    return settings.get("profile_id", settings.get("profile_name", DEFAULT_PROFILE))
+
+
+def connection_profiles(settings: Mapping) -> dict:
+    """All configured profiles by id: the default one plus the ``kimai_profiles`` entries"""
+    profiles = {DEFAULT_PROFILE: ConnectionProfile.from_settings(settings)}
+    for entry in settings.get("kimai_profiles", []) or []:
+        key = profile_id(entry)
+        if not key or key in profiles:
+            _warn_once(f"Ignoring Kimai profile without a name or with a duplicate id: '{key}'")
+            continue
+        name = str(entry.get("name", "")).strip()
+        profiles[key] = ConnectionProfile.create(name, entry.get("url", ""), entry.get("token", ""), key)
+    return profiles
+
+
+def _warn_once(message: str) -> None:
+    """Warn about a settings problem once, not on every snapshot rebuild"""
+    if message not in _reported_problems:
+        _reported_problems.add(message)
+        log.warning(message)
+
+
+class SettingsSnapshot:
+    """Cached, read-only view of a settings dict.
+
+    ``get()`` returns the same immutable mapping until ``invalidate()`` is
+    called after a write, so hot paths don't hit the settings store on every
+    call. Subscribers are called with the new snapshot after each change.
+    """
+
+    def __init__(self, load: Callable[[], dict]):
+        self._load = load
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._subscribers = []
+
+    def get(self) -> Mapping:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = MappingProxyType(dict(self._load()))
+                snapshot = self._snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot and notify subscribers of the new one"""
+        with self._lock:
+            self._snapshot = None
+
+        if not self._subscribers:
+            return
+
+        snapshot = self.get()
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                log.error("Error notifying settings subscriber: {}", e)
+
+    def subscribe(self, callback: Callable[[Mapping], None]) -> None:
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Mapping], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
@@ -0,0 +1,86 @@
+# Import python modules
+from typing import Callable
+from .plugin_log import get_logger
+
+log = get_logger("plugin")
+
+class DebouncedSettingsWriter:
+    """Coalesce rapid settings changes into a single read-modify-write.
+
+    Text fields emit ``notify::text`` on every keystroke. Instead of writing the
+    settings file per character, changes are kept in memory and flushed once
+    the field has been idle for ``delay_ms``, on focus-out or on shutdown.
+    Must be used from the GLib main loop.
+    """
+
+    def __init__(self, get_settings: Callable[[], dict], set_settings: Callable[[dict], None], delay_ms: int = 500):
+        self.get_settings = get_settings
+        self.set_settings = set_settings
+        self.delay_ms = delay_ms
+        self.pending = {}
+        self.timer_id = None
+
+        # Statistics
+        self.updates = 0
+        self.writes = 0
+
+    @property
+    def writes_saved(self) -> int:
+        """Number of settings writes avoided by coalescing"""
+        # Pending changes still need one more write
+        return max(0, self.updates - self.writes - (1 if self.pending else 0))
+
+    def update(self, key: str, value) -> None:
+        """Queue a settings change and (re)start the idle timer"""
+        from gi.repository import GLib
+
+        self.pending[key] = value
+        self.updates += 1
+
+        if self.timer_id is not None:
+            GLib.source_remove(self.timer_id)
+        self.timer_id = GLib.timeout_add(self.delay_ms, self._on_idle)
+
+    def get(self, key: str, default=None):
+        """Read a value, preferring a pending unsaved change"""
+        if key in self.pending:
+            return self.pending[key]
+        return self.get_settings().get(key, default)
+
+    def _on_idle(self) -> bool:
+        self.timer_id = None
+        self.flush()
+        return False  # Don't repeat the timer
+
+    def flush(self, *args) -> None:
+        """Write all pending changes now (safe to call when nothing is pending)"""
+        if self.timer_id is not None:
+            from gi.repository import GLib
+            GLib.source_remove(self.timer_id)
+            self.timer_id = None
+
+        if not self.pending:
+            return
+
+        try:
+            settings = self.get_settings()
+            settings.update(self.pending)
+            self.set_settings(settings)
+        except Exception as e:
+            # Keep the changes; the next update or flush writes them again
+            log.error("Error flushing settings: {}", e)
+            return
+
+        flushed = len(self.pending)
+        self.pending = {}
+        self.writes += 1
+        log.debug("Flushed {} settings change(s), {} write(s) saved so far", flushed, self.writes_saved)
+
+    def attach(self, widget) -> None:
+        """Flush when the widget loses focus or is torn down"""
+        from gi.repository import Gtk
+
+        focus_controller = Gtk.EventControllerFocus()
+        focus_controller.connect("leave", self.flush)
+        widget.add_controller(focus_controller)
+        widget.connect("unrealize", self.flush)
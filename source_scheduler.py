@@ -0,0 +1,198 @@
+# Import python modules
+import threading
+import weakref
+from typing import Callable, Optional
+from .plugin_log import get_logger
+
+log = get_logger("scheduler")
+
+# What a source does while the plugin is idle (see IdleMonitor)
+WHEN_IDLE_RUN = "run"          # Keep firing as usual (short one-shot feedback timers)
+WHEN_IDLE_PAUSE = "pause"      # Stop until activity resumes (network polling)
+WHEN_IDLE_STRETCH = "stretch"  # Fire at the scheduler's idle interval instead (UI clocks)
+
+def action_is_visible(action) -> bool:
+    """Whether an action's page is the one currently shown on its deck"""
+    deck_controller = getattr(action, "deck_controller", None)
+    page = getattr(action, "page", None)
+    if deck_controller is None or page is None:
+        return True
+    return getattr(deck_controller, "active_page", page) is page
+
+
+class _Source:
+    """One scheduled timeout and what it belongs to"""
+
+    def __init__(self, owner, interval_ms: int, seconds: bool, callback: Callable[[], bool], is_visible, when_idle: str):
+        self.owner_ref = weakref.ref(owner)
+        self.owner_type = type(owner).__name__
+        self.interval_ms = interval_ms
+        self.seconds = seconds
+        # Don't keep the owner alive through a bound method
+        self.callback_ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        self.is_visible = is_visible or action_is_visible
+        self.when_idle = when_idle
+        self.stretched = False
+        self.glib_id = None
+
+
+class SourceScheduler:
+    """Owns every GLib timeout the plugin's actions use.
+
+    Each source is tagged with its owner (usually an action). When a source
+    fires while its owner's page is not shown, it is suspended instead of
+    running; ``resume_owner`` re-arms it when the page becomes visible again
+    (actions call it from ``on_ready``). Sources of garbage-collected owners
+    are dropped on their next tick.
+
+    While the ``idle_monitor`` reports idle, sources are paused or stretched
+    to ``idle_interval`` seconds according to their ``when_idle`` policy;
+    ``resume_idle`` restores them when activity returns.
+    """
+
+    def __init__(self, idle_monitor=None, idle_interval: int = 60):
+        self.idle_monitor = idle_monitor
+        self.idle_interval = idle_interval
+        self._lock = threading.Lock()
+        self._sources = {}  # handle -> _Source
+        self._next_handle = 1
+
+    def timeout_add(self, owner, interval_ms: int, callback: Callable[[], bool], is_visible=None,
+                    when_idle: str = WHEN_IDLE_RUN) -> int:
+        """Like GLib.timeout_add, tagged with an owner. Returns a scheduler handle"""
+        return self._add(owner, interval_ms, False, callback, is_visible, when_idle)
+
+    def timeout_add_seconds(self, owner, seconds: int, callback: Callable[[], bool], is_visible=None,
+                            when_idle: str = WHEN_IDLE_RUN) -> int:
+        """Like GLib.timeout_add_seconds, tagged with an owner. Returns a scheduler handle"""
+        return self._add(owner, seconds * 1000, True, callback, is_visible, when_idle)
+
+    def remove(self, handle: Optional[int]) -> None:
+        """Remove a source (no-op for unknown or already finished handles)"""
+        with self._lock:
+            source = self._sources.pop(handle, None)
+        if source is not None:
+            self._disarm(source)
+
+    def remove_owner(self, owner) -> None:
+        """Remove every source belonging to an owner"""
+        with self._lock:
+            handles = [h for h, s in self._sources.items() if s.owner_ref() is owner]
+            sources = [self._sources.pop(h) for h in handles]
+        for source in sources:
+            self._disarm(source)
+
+    def resume_owner(self, owner) -> None:
+        """Re-arm the suspended sources of an owner whose page is shown again"""
+        with self._lock:
+            handles = [h for h, s in self._sources.items() if s.owner_ref() is owner and s.glib_id is None]
+        for handle in handles:
+            self._arm(handle)
+        if handles:
+            log.debug("Resumed {} source(s) for {}", len(handles), type(owner).__name__)
+
+    def resume_idle(self) -> None:
+        """Restore sources paused or stretched while the plugin was idle"""
+        with self._lock:
+            sources = [(h, s) for h, s in self._sources.items()
+                       if s.stretched or (s.glib_id is None and s.when_idle == WHEN_IDLE_PAUSE)]
+        for handle, source in sources:
+            self._disarm(source)
+            source.stretched = False
+            self._arm(handle)
+        if sources:
+            log.debug("Restored {} source(s) after idle period", len(sources))
+
+    def live_count(self) -> int:
+        """Number of sources currently armed in the GLib main loop"""
+        with self._lock:
+            return sum(1 for s in self._sources.values() if s.glib_id is not None)
+
+    def stats(self) -> dict:
+        """Armed and suspended source counts, overall and per owner type"""
+        with self._lock:
+            sources = list(self._sources.values())
+        by_owner = {}
+        for source in sources:
+            counts = by_owner.setdefault(source.owner_type, {"live": 0, "suspended": 0})
+            counts["live" if source.glib_id is not None else "suspended"] += 1
+        return {
+            "live": sum(c["live"] for c in by_owner.values()),
+            "suspended": sum(c["suspended"] for c in by_owner.values()),
+            "by_owner": by_owner,
+        }
+
+    def _add(self, owner, interval_ms: int, seconds: bool, callback, is_visible, when_idle: str) -> int:
+        with self._lock:
+            handle = self._next_handle
+            self._next_handle += 1
+            self._sources[handle] = _Source(owner, interval_ms, seconds, callback, is_visible, when_idle)
+        self._arm(handle)
+        return handle
+
+    def _arm(self, handle: int) -> None:
+        from gi.repository import GLib
+
+        with self._lock:
+            source = self._sources.get(handle)
+            if source is None or source.glib_id is not None:
+                return
+            if source.stretched:
+                source.glib_id = GLib.timeout_add_seconds(max(self.idle_interval, source.interval_ms // 1000), self._tick, handle)
+            elif source.seconds:
+                source.glib_id = GLib.timeout_add_seconds(source.interval_ms // 1000, self._tick, handle)
+            else:
+                source.glib_id = GLib.timeout_add(source.interval_ms, self._tick, handle)
+
+    def _disarm(self, source: _Source) -> None:
+        if source.glib_id is not None:
+            from gi.repository import GLib
+            GLib.source_remove(source.glib_id)
+            source.glib_id = None
+
+    def _tick(self, handle: int) -> bool:
+        with self._lock:
+            source = self._sources.get(handle)
+        if source is None:
+            return False
+
+        owner = source.owner_ref()
+        callback = source.callback_ref()
+        if owner is None or callback is None:
+            # Owner was destroyed without cleaning up
+            with self._lock:
+                self._sources.pop(handle, None)
+            return False
+
+        if not source.is_visible(owner):
+            # Suspend until the owner's page is shown again
+            source.glib_id = None
+            return False
+
+        if source.when_idle != WHEN_IDLE_RUN and self.idle_monitor is not None and self.idle_monitor.is_idle:
+            if source.when_idle == WHEN_IDLE_PAUSE:
+                # Paused until resume_idle()
+                source.glib_id = None
+                return False
+            if not source.stretched:
+                # Run this tick, then re-arm at the idle interval
+                source.glib_id = None
+                source.stretched = True
+                if self._run(handle, source, callback):
+                    self._arm(handle)
+                return False
+
+        return self._run(handle, source, callback)
+
+    def _run(self, handle: int, source: _Source, callback) -> bool:
+        try:
+            keep = bool(callback())
+        except Exception as e:
+            log.error("Error in scheduled callback for {}: {}", source.owner_type, e)
+            keep = False
+
+        if not keep:
+            with self._lock:
+                self._sources.pop(handle, None)
+            source.glib_id = None
+        return keep
@@ -0,0 +1,132 @@
+# Import python modules
+import socket
+import threading
+import time
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from .kimai_api import ActiveTimesheetQuery
+from .kimai_records import Timesheet
+from .settings_cache import ConnectionProfile
+from .plugin_log import get_logger
+
+log = get_logger("cache")
+
+class StartupPrefetch:
+    """One-shot startup phase that warms the connection and fetches the active timesheet once.
+
+    Right after StreamController starts every button would otherwise fire its
+    own cold GET. Buttons that become ready while the prefetch is running (or
+    shortly after it finished) are seeded from the single shared result instead.
+    Afterwards it loads the catalog snapshot and calls ``on_catalog_loaded``,
+    so configured buttons can be validated without a request each.
+    """
+
+    def __init__(self, kimai_api, recent_timesheets, timesheet_store=None, fresh_for: float = 5.0,
+                 on_catalog_loaded: Optional[Callable[[], None]] = None):
+        self.kimai_api = kimai_api
+        self.recent_timesheets = recent_timesheets
+        self.timesheet_store = timesheet_store
+        self.on_catalog_loaded = on_catalog_loaded
+        # How long a finished prefetch may still be handed to late buttons
+        self.fresh_for = fresh_for
+
+        self._lock = threading.Lock()
+        self._running = False
+        self._finished_at = None
+        self._succeeded = False
+        self._timesheet = None
+        self._waiting = []
+
+    def start(self, profile: ConnectionProfile) -> None:
+        """Start the prefetch in a background thread (no-op without configuration)"""
+        if not profile.is_configured:
+            return
+
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+
+        threading.Thread(target=self._run, args=(profile,), daemon=True).start()
+
+    def consume(self, on_result: Callable[[Optional[Timesheet]], None], on_failure: Callable[[], None]) -> bool:
+        """Hand the shared result to a button.
+
+        Returns False if there is no prefetch to use, in which case the caller
+        fetches on its own. Otherwise ``on_result(timesheet)`` or
+        ``on_failure()`` is called (possibly later, from the prefetch thread).
+        """
+        with self._lock:
+            if self._running:
+                self._waiting.append((on_result, on_failure))
+                return True
+
+            is_fresh = self._finished_at is not None and time.monotonic() - self._finished_at < self.fresh_for
+            if not is_fresh:
+                return False
+            succeeded, timesheet = self._succeeded, self._timesheet
+
+        self._deliver(on_result, on_failure, succeeded, timesheet)
+        return True
+
+    def _run(self, profile: ConnectionProfile) -> None:
+        succeeded = False
+        timesheet = None
+        try:
+            started = time.monotonic()
+
+            # Resolve DNS up front so the first request only pays for connect + TLS
+            parsed = urlparse(profile.base_url)
+            port = parsed.port or (443 if parsed.scheme == "https" else 80)
+            socket.getaddrinfo(parsed.hostname, port, proto=socket.IPPROTO_TCP)
+
+            # The expanded active query serves StartTracking (ids) and display buttons (names)
+            # and leaves a warm connection in the session pool
+            full_timesheet = self.kimai_api.get_active_timesheet(profile, ActiveTimesheetQuery.FULL)
+            timesheet = Timesheet.from_api(full_timesheet) if full_timesheet else None
+            succeeded = True
+            log.info("Startup prefetch finished in {:.2f}s", time.monotonic() - started)
+        except Exception as e:
+            log.error("Startup prefetch failed: {}", e)
+
+        with self._lock:
+            self._running = False
+            self._finished_at = time.monotonic()
+            self._succeeded = succeeded
+            self._timesheet = timesheet
+            waiting, self._waiting = self._waiting, []
+
+        log.info("Seeding {} button(s) from the startup prefetch", len(waiting))
+        for on_result, on_failure in waiting:
+            self._deliver(on_result, on_failure, succeeded, timesheet)
+
+        # Warm the restart candidates on the same connection
+        if succeeded:
+            try:
+                self.recent_timesheets.get(profile)
+            except Exception as e:
+                log.error("Error prefetching recent timesheets: {}", e)
+
+            # One catalog snapshot to check every configured button against
+            try:
+                if self.kimai_api.load_catalog(profile) and self.on_catalog_loaded is not None:
+                    self.on_catalog_loaded()
+            except Exception as e:
+                log.error("Error loading catalog snapshot: {}", e)
+
+            # Then catch the local mirror up (incremental after the first run)
+            if self.timesheet_store is not None:
+                try:
+                    self.timesheet_store.sync(self.kimai_api, profile)
+                except Exception as e:
+                    log.error("Error syncing local timesheet mirror: {}", e)
+
+    def _deliver(self, on_result, on_failure, succeeded: bool, timesheet: Optional[Timesheet]) -> None:
+        try:
+            if succeeded:
+                on_result(timesheet)
+            else:
+                on_failure()
+        except Exception as e:
+            log.error("Error seeding button from startup prefetch: {}", e)
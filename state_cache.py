@@ -0,0 +1,59 @@
+# Import python modules
+import threading
+import time
+from typing import NamedTuple, Optional
+
+class CachedState(NamedTuple):
+    state: dict
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class ActionStateCache:
+    """Last known display state per action, surviving page switches.
+
+    Actions render the cached state immediately in ``on_ready`` and only ask
+    Kimai again when it is older than ``revalidate_after`` seconds
+    (stale-while-revalidate), so returning to a page doesn't flicker.
+    """
+
+    def __init__(self, revalidate_after: float = 30.0):
+        self.revalidate_after = revalidate_after
+        self._lock = threading.Lock()
+        self._states = {}
+        # Page visits rendered from a fresh state vs. revalidated with Kimai
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedState]:
+        with self._lock:
+            return self._states.get(key)
+
+    def put(self, key: str, state: dict) -> None:
+        with self._lock:
+            self._states[key] = CachedState(dict(state), time.monotonic())
+
+    def is_stale(self, cached: Optional[CachedState]) -> bool:
+        stale = cached is None or cached.age >= self.revalidate_after
+        with self._lock:
+            if stale:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return stale
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+
+def action_state_key(action) -> str:
+    """Stable key for an action on a deck: page, input and action type"""
+    page = getattr(action, "page", None)
+    page_key = getattr(page, "json_path", None) or str(id(page))
+    input_ident = getattr(action, "input_ident", None)
+    input_key = getattr(input_ident, "json_identifier", None) or str(input_ident)
+    return f"{page_key}:{input_key}:{action.action_id}:{getattr(action, 'state', 0)}"
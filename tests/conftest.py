@@ -0,0 +1,17 @@
+"""Make the plugin's modules importable as ``kimai_plugin.<module>`` without StreamController.
+
+The modules use relative imports and the repository root is not a package,
+so it is registered as one here, like ``benchmarks/_plugin.py`` does. Only
+modules that don't need GTK or ``src.backend`` can be tested this way.
+"""
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "kimai_plugin"
+
+if PACKAGE not in sys.modules:
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [ROOT]
+    sys.modules[PACKAGE] = package
@@ -0,0 +1,44 @@
+import threading
+
+from kimai_plugin.candidate_ring import CandidateRing, build_candidates
+from kimai_plugin.catalog_cache import CatalogCache
+from kimai_plugin.kimai_records import Activity, Project, Timesheet
+
+
+def catalog():
+    cache = CatalogCache()
+    cache.remember_projects([Project(1, "Website", 3, True)])
+    cache.remember_activities([Activity(5, "Support", None, True)])
+    return cache
+
+
+def test_build_candidates_orders_sources_and_labels_unknown_ids():
+    recent = [Timesheet(10, "2026-10-19T09:00:00", None, None, 2, 6, "Review")]
+    candidates = build_candidates([("1", "5", ""), ("", "5", "")], recent, [(1, 5, "Standup")], catalog())
+
+    assert [(c.project_name, c.activity_name, c.description) for c in candidates] == [
+        ("Website", "Support", ""), ("Project 2", "Activity 6", "Review"), ("Website", "Support", "Standup"),
+    ]
+    assert candidates[0].key == ("1", "5", "")
+
+
+def test_build_candidates_reads_names_under_the_cache_lock():
+    cache = catalog()
+    with cache._lock:
+        worker = threading.Thread(target=build_candidates, args=([("1", "5", "")], [], [], cache))
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive()
+    worker.join(1)
+    assert not worker.is_alive()
+
+
+def test_ring_deduplicates_keeps_the_current_candidate_and_rotates():
+    candidates = build_candidates([("1", "5", ""), ("1", "5", ""), ("2", "6", "")], [], [(3, 7, "")], catalog())
+    ring = CandidateRing()
+    ring.replace(candidates, keep=("2", "6", ""))
+
+    assert len(ring) == 3
+    assert ring.current.key == ("2", "6", "")
+    assert ring.rotate(1).key == ("3", "7", "")
+    assert ring.rotate(-2).key == ("1", "5", "")
@@ -0,0 +1,67 @@
+import pytest
+
+from kimai_plugin.catalog_cache import CatalogCache
+from kimai_plugin.catalog_query import BOTH, CatalogQuery
+from kimai_plugin.kimai_api import KimaiApi
+from kimai_plugin.kimai_records import Project
+from kimai_plugin.settings_cache import ConnectionProfile
+
+PROFILE = ConnectionProfile.create("", "https://kimai.example", "token")
+
+
+def test_queries_ask_for_visible_entries_and_build_immutably():
+    base = CatalogQuery.projects(customer_id=4)
+    narrowed = base.search("  web ").order_by("name", descending=True).page(2, 25)
+
+    assert base.params == {"visible": 1, "customer": 4}
+    assert narrowed.params == {"visible": 1, "customer": 4, "term": "web", "orderBy": "name", "order": "DESC",
+                               "page": 2, "size": 25}
+    assert narrowed.path == "/api/projects" and narrowed.size == 25
+    assert repr(narrowed) == "/api/projects?customer=4&order=DESC&orderBy=name&page=2&size=25&term=web&visible=1"
+
+
+def test_none_and_blank_filters_are_dropped():
+    assert CatalogQuery.projects().params == {"visible": 1}
+    assert CatalogQuery.activities(project_id=7).params == {"visible": 1, "project": 7}
+    assert CatalogQuery.activities(globals_only=True).params == {"visible": 1, "globals": "true"}
+    assert CatalogQuery.customers().search("   ").visible(BOTH).params == {"visible": 3}
+    assert CatalogQuery.projects(4).where(customer=None) == CatalogQuery.projects()
+
+
+def test_unknown_entity_is_rejected():
+    with pytest.raises(ValueError):
+        CatalogQuery("users")
+
+
+class FakeResponse:
+    status_code = 200
+    url = "https://kimai.example/api/projects"
+    text = ""
+
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeSession:
+    def __init__(self, content):
+        self.content = content
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs["params"]))
+        return FakeResponse(self.content)
+
+
+def test_get_catalog_sends_the_filters_cuts_to_size_and_remembers():
+    cache = CatalogCache()
+    api = KimaiApi(cache)
+    api.session = FakeSession(b'[{"id": 1, "name": "Website", "customer": 4},'
+                              b' {"id": 2, "name": "Webshop", "customer": 4},'
+                              b' {"id": 3, "name": "Web app", "customer": 4}]')
+    query = CatalogQuery.projects(4).search("web").page(1, 2)
+
+    records = api.get_catalog(PROFILE, query)
+
+    assert api.session.calls == [("https://kimai.example/api/projects", query.params)]
+    assert records == [Project(1, "Website", 4, True), Project(2, "Webshop", 4, True)]
+    assert [p.name for p in cache.search_projects("web", customer_id=4)] == ["Webshop", "Website"]
@@ -0,0 +1,93 @@
+import threading
+
+from kimai_plugin import request_budget
+from kimai_plugin.command_queue import CommandQueue
+
+
+class Recorder:
+    """Runs commands, holding each one until ``release`` is set"""
+
+    def __init__(self):
+        self.ran = []
+        self.deadlines = []
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+
+    def run(self, command):
+        self.ran.append(command)
+        self.deadlines.append(request_budget.current_deadline())
+        self.started.release()
+        self.release.wait(2)
+
+
+def wait_idle(queue):
+    for _ in range(200):
+        if not queue.busy:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("queue did not drain")
+
+
+def drain(queue, recorder):
+    recorder.release.set()
+    wait_idle(queue)
+
+
+def test_newer_submissions_replace_the_waiting_one():
+    recorder = Recorder()
+    queue = CommandQueue(recorder, recorder.run)
+    queue.submit("start")
+    assert recorder.started.acquire(timeout=2)
+
+    queue.submit("stop")
+    queue.submit("start:other")
+    assert queue.latest() == "start:other"
+    drain(queue, recorder)
+
+    assert recorder.ran == ["start", "start:other"]
+    assert (queue.submitted, queue.collapsed, queue.executed) == (3, 1, 2)
+
+
+def test_resubmitting_the_in_flight_command_clears_the_slot():
+    recorder = Recorder()
+    queue = CommandQueue(recorder, recorder.run)
+    queue.submit("start")
+    assert recorder.started.acquire(timeout=2)
+
+    queue.submit("stop")
+    queue.submit("start")
+    assert queue.latest() == "start"
+    drain(queue, recorder)
+
+    assert recorder.ran == ["start"]
+    assert queue.collapsed == 1
+
+
+def test_commands_run_under_the_deadline_of_their_press(monkeypatch):
+    monkeypatch.setattr(request_budget, "_action_seconds", 5.0)
+    recorder = Recorder()
+    queue = CommandQueue(recorder, recorder.run)
+    queue.submit("start")
+    drain(queue, recorder)
+
+    deadline = recorder.deadlines[0]
+    assert deadline is not None and deadline.seconds == 5.0
+    assert request_budget.current_deadline() is None
+
+
+def test_a_failing_command_does_not_stop_the_queue():
+    ran = []
+
+    def run(command):
+        ran.append(command)
+        if command == "fail":
+            raise RuntimeError("boom")
+
+    queue = CommandQueue(object(), run)
+    queue.submit("fail")
+    wait_idle(queue)
+    queue.submit("start")
+    wait_idle(queue)
+
+    assert ran == ["fail", "start"]
+    assert queue.executed == 1
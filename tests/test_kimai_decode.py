@@ -0,0 +1,42 @@
+import pytest
+
+from kimai_plugin.kimai_decode import (
+    available_backends, decode_activities, decode_customers, decode_projects, decode_timesheets
+)
+from kimai_plugin.kimai_records import Activity, Customer, Project, Timesheet
+
+CUSTOMERS = b'[{"id": 1, "name": "Acme", "visible": true}, {"id": 2, "name": null, "visible": null}]'
+
+PROJECTS = (b'[{"id": 1, "name": null, "customer": 3, "visible": true, "teams": []},'
+            b' {"id": 2, "name": "Website", "customer": {"id": 4, "name": "Acme"}},'
+            b' {"id": 3, "name": "", "customer": null, "visible": false}]')
+
+ACTIVITIES = (b'[{"id": 5, "name": "Support", "project": null},'
+              b' {"id": 6, "name": null, "project": {"id": 2}, "visible": true}]')
+
+TIMESHEETS = (b'[{"id": 10, "begin": "2026-10-19T09:00:00+0200", "end": null, "duration": null,'
+              b' "project": 1, "activity": 5, "description": null},'
+              b' {"id": 11, "begin": null, "end": "2026-10-19T11:00:00+0200", "duration": 3600,'
+              b' "project": {"id": 2}, "activity": {"id": 6}, "description": "Review"}]')
+
+CASES = [
+    (decode_customers, CUSTOMERS, [Customer(1, "Acme", True), Customer(2, "Customer 2", False)]),
+    (decode_projects, PROJECTS, [Project(1, "Project 1", 3, True), Project(2, "Website", 4, True),
+                                 Project(3, "Project 3", None, False)]),
+    (decode_activities, ACTIVITIES, [Activity(5, "Support", None, True), Activity(6, "Activity 6", 2, True)]),
+    (decode_timesheets, TIMESHEETS, [Timesheet(10, "2026-10-19T09:00:00+0200", None, None, 1, 5, ""),
+                                     Timesheet(11, "", "2026-10-19T11:00:00+0200", 3600, 2, 6, "Review")]),
+]
+IDS = ["customers", "projects", "activities", "timesheets"]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("decode, payload, expected", CASES, ids=IDS)
+def test_backends_decode_nulls_like_from_api(decode, payload, expected, backend):
+    assert decode(payload, backend=backend) == expected
+
+
+@pytest.mark.parametrize("decode, payload, expected", CASES, ids=IDS)
+def test_backends_agree(decode, payload, expected):
+    results = {backend: decode(payload, backend=backend) for backend in available_backends()}
+    assert all(result == results["json"] for result in results.values())
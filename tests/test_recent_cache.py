@@ -0,0 +1,79 @@
+from kimai_plugin.kimai_records import Timesheet
+from kimai_plugin.recent_cache import RecentTimesheetsCache
+
+
+class FakeApi:
+    def __init__(self, timesheets):
+        self.timesheets = timesheets
+        self.calls = 0
+
+    def get_recent_timesheets(self, profile):
+        self.calls += 1
+        return list(self.timesheets)
+
+
+def finished(timesheet_id, project_id, activity_id, description=""):
+    return Timesheet(timesheet_id, "2026-10-19T09:00:00", "2026-10-19T10:00:00", 3600, project_id, activity_id, description)
+
+
+def running(timesheet_id, project_id, activity_id, description=""):
+    return Timesheet(timesheet_id, "2026-10-19T11:00:00", None, None, project_id, activity_id, description)
+
+
+def finished_ids(cache):
+    return [t.id for t in cache.cached() if not t.is_running]
+
+
+def test_get_fetches_once_while_fresh():
+    api = FakeApi([finished(1, 10, 20)])
+    cache = RecentTimesheetsCache(api)
+    assert cache.get(None) == cache.get(None) == [finished(1, 10, 20)]
+    assert api.calls == 1
+    cache.invalidate()
+    cache.get(None)
+    assert api.calls == 2
+
+
+def test_remember_keeps_the_restarted_finished_entry_in_place():
+    cache = RecentTimesheetsCache(FakeApi([finished(1, 10, 20), finished(2, 11, 21), finished(3, 12, 22)]))
+    cache.get(None)
+
+    cache.remember(running(4, 11, 21))
+
+    assert cache.cached()[0].id == 4
+    assert finished_ids(cache) == [1, 2, 3]
+
+
+def test_remember_replaces_an_older_running_entry_of_the_pair():
+    cache = RecentTimesheetsCache(FakeApi([running(1, 10, 20), finished(2, 10, 20)]))
+    cache.get(None)
+
+    cache.remember(running(3, 10, 20))
+
+    assert [t.id for t in cache.cached()] == [3, 2]
+
+
+def test_find_matches_pair_and_description_and_counts():
+    cache = RecentTimesheetsCache(FakeApi([finished(1, 10, 20, "Standup"), finished(2, 10, 20)]))
+    cache.get(None)
+
+    assert cache.find("10", "20").id == 1
+    assert cache.find(10, 20, "").id == 2
+    assert cache.find(10, 20, "Review") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_forget_drops_by_id():
+    cache = RecentTimesheetsCache(FakeApi([finished(1, 10, 20), finished(2, 11, 21)]))
+    cache.get(None)
+    cache.forget(1)
+    assert [t.id for t in cache.cached()] == [2]
+
+
+def test_remember_marks_the_list_stale():
+    api = FakeApi([finished(1, 10, 20)])
+    cache = RecentTimesheetsCache(api)
+    cache.get(None)
+    cache.remember(running(2, 10, 20))
+    cache.get(None)
+    assert api.calls == 2
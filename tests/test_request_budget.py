@@ -0,0 +1,139 @@
+import io
+import threading
+import time
+
+import pytest
+import requests
+
+from kimai_plugin import request_budget
+from kimai_plugin.request_budget import (
+    BudgetedSession, Deadline, DeadlineExceeded, LatencyStats, deadline_budget, endpoint_key
+)
+
+URL = "https://kimai.example/api/projects"
+
+
+@pytest.fixture(autouse=True)
+def defaults():
+    yield
+    request_budget.configure()
+
+
+def response(status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(b"")
+    return response
+
+
+class Sent(list):
+    """Requests that reached the network layer, as (url, timeout); answered by ``respond(attempt)``"""
+
+    def respond(self, attempt):
+        return response()
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    calls = Sent()
+
+    def request(session, method, url, *args, **kwargs):
+        calls.append((url, kwargs.get("timeout")))
+        return calls.respond(len(calls))
+
+    monkeypatch.setattr(requests.Session, "request", request)
+    return calls
+
+
+def warm(session, seconds, key="GET /api/projects"):
+    for _ in range(request_budget.MIN_SAMPLES):
+        session.stats(key).add(seconds)
+
+
+def test_endpoint_key_masks_ids():
+    assert endpoint_key("patch", "https://kimai.example/api/timesheets/42/stop?x=1") == "PATCH /api/timesheets/{id}/stop"
+
+
+def test_percentile_needs_enough_samples():
+    stats = LatencyStats()
+    for value in range(1, 20):
+        stats.add(value / 100)
+    assert stats.percentile(95) is None
+    stats.add(0.2)
+    assert stats.percentile(95) == 0.2
+    assert stats.percentile(50) == 0.11
+
+
+def test_adaptive_timeout_is_bounded():
+    session = BudgetedSession()
+    assert session.adaptive_timeout("GET /api/projects") == request_budget.DEFAULT_TIMEOUT
+    warm(session, 0.1)
+    assert session.adaptive_timeout("GET /api/projects") == request_budget.MIN_TIMEOUT
+    warm(session, 5.0, "GET /api/activities")
+    assert session.adaptive_timeout("GET /api/activities") == request_budget.DEFAULT_TIMEOUT
+    warm(session, 1.0, "GET /api/customers")
+    assert session.adaptive_timeout("GET /api/customers") == 4.0
+
+
+def test_inner_deadline_only_applies_when_earlier():
+    outer, later, earlier = Deadline(5), Deadline(60), Deadline(1)
+    with deadline_budget(outer) as active:
+        assert active is outer
+        with deadline_budget(later) as active:
+            assert active is outer
+        with deadline_budget(earlier) as active:
+            assert request_budget.current_deadline() is active is earlier
+        assert request_budget.current_deadline() is outer
+    assert request_budget.current_deadline() is None
+
+
+def test_timeouts_follow_the_deadline_and_only_gets_adapt(sent):
+    session = BudgetedSession()
+    warm(session, 0.1)
+    warm(session, 0.1, "POST /api/projects")
+
+    session.get(URL, timeout=10)
+    session.post(URL, timeout=10)
+    with deadline_budget(Deadline(1)):
+        session.get(URL, timeout=(3, 10))
+
+    assert sent[0][1] == request_budget.MIN_TIMEOUT
+    assert sent[1][1] == 10
+    assert 0.5 < sent[2][1] <= 1
+
+
+def test_expired_deadline_fails_before_sending(sent):
+    session = BudgetedSession()
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    with deadline_budget(deadline), pytest.raises(DeadlineExceeded):
+        session.get(URL, timeout=10)
+    assert sent == []
+    assert session.deadline_exceeded == 1
+
+
+def test_slow_get_is_hedged_and_the_faster_copy_wins(sent):
+    request_budget.configure(hedge_gets=True)
+    first_done = threading.Event()
+
+    def respond(attempt):
+        if attempt == 1:
+            first_done.wait(2)
+        return response(200 + attempt)
+
+    sent.respond = respond
+    session = BudgetedSession()
+    warm(session, 0.05)
+
+    answer = session.get(URL, timeout=10)
+    first_done.set()
+
+    assert answer.status_code == 202
+    assert (session.hedged, session.hedges_won) == (1, 1)
+
+
+def test_gets_are_not_hedged_unless_enabled(sent):
+    session = BudgetedSession()
+    warm(session, 0.05)
+    session.get(URL, timeout=10)
+    assert len(sent) == 1 and session.hedged == 0
@@ -0,0 +1,102 @@
+import time
+from datetime import date, datetime, timezone
+
+import pytest
+
+from kimai_plugin import timesheet_store
+from kimai_plugin.kimai_records import Timesheet
+from kimai_plugin.settings_cache import ConnectionProfile
+from kimai_plugin.timesheet_store import TimesheetStore
+
+PROFILE = ConnectionProfile.create("", "https://kimai.example", "token")
+
+
+def entry(timesheet_id, day, duration=3600):
+    return Timesheet(timesheet_id, f"{day}T09:00:00+0200", f"{day}T10:00:00+0200", duration, 1, 2, "")
+
+
+class FakeApi:
+    """Serves ``timesheets`` for both the sync and the range query and records the filters"""
+
+    def __init__(self, timesheets, server_time=None):
+        self.timesheets = timesheets
+        self.server_time = server_time
+        self.sync_filters = []
+        self.range_filters = []
+
+    def get_timesheets_with_server_time(self, profile, **filters):
+        self.sync_filters.append(filters)
+        return list(self.timesheets), self.server_time
+
+    def get_timesheets(self, profile, **filters):
+        self.range_filters.append(filters)
+        begin, end = filters["begin"][:10], filters["end"][:10]
+        return [t for t in self.timesheets if begin <= t.begin[:10] <= end]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimesheetStore(str(tmp_path / "timesheets.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_first_sync_is_full_and_later_ones_use_the_server_cursor(store):
+    api = FakeApi([entry(1, "2026-10-19")], server_time=datetime(2026, 10, 19, 7, 0, tzinfo=timezone.utc))
+
+    assert store.sync(api, PROFILE)
+    assert api.sync_filters == [{}]
+    assert store.last_synced_at == "2026-10-19T06:58:00+0000"
+
+    assert store.sync(api, PROFILE)
+    assert api.sync_filters[1] == {"modified_after": "2026-10-19T06:58:00+0000"}
+
+
+def test_cursor_without_date_header_carries_an_offset(store):
+    store.sync(FakeApi([]), PROFILE)
+    cursor = store.last_synced_at
+    assert cursor.endswith("+0000")
+    assert abs(datetime.strptime(cursor, "%Y-%m-%dT%H:%M:%S%z") - datetime.now(timezone.utc)).total_seconds() < 300
+
+
+def test_full_sync_again_after_the_interval(store, monkeypatch):
+    api = FakeApi([entry(1, "2026-10-19")])
+    store.sync(api, PROFILE)
+
+    later = time.time() + timesheet_store.FULL_SYNC_INTERVAL + 1
+    monkeypatch.setattr(timesheet_store.time, "time", lambda: later)
+    api.timesheets = [entry(2, "2026-10-20")]
+    store.sync(api, PROFILE)
+
+    assert api.sync_filters[-1] == {}
+    assert [t.id for t in store.timesheets_between(date(2026, 10, 19), date(2026, 10, 25))] == [2]
+
+
+def test_incremental_sync_keeps_rows_it_does_not_return(store):
+    api = FakeApi([entry(1, "2026-10-19"), entry(2, "2026-10-20")])
+    store.sync(api, PROFILE)
+    api.timesheets = []
+    store.sync(api, PROFILE)
+    assert len(store.timesheets_between(date(2026, 10, 19), date(2026, 10, 25))) == 2
+
+
+def test_reconcile_drops_entries_deleted_in_kimai_within_the_range_only(store):
+    api = FakeApi([entry(1, "2026-10-12"), entry(2, "2026-10-19"), entry(3, "2026-10-20", 1800)])
+    store.sync(api, PROFILE)
+
+    api.timesheets = [entry(1, "2026-10-12"), entry(3, "2026-10-20", 7200)]
+    assert store.reconcile(api, PROFILE, date(2026, 10, 19), date(2026, 10, 25))
+
+    assert api.range_filters == [{"begin": "2026-10-19T00:00:00", "end": "2026-10-25T23:59:59"}]
+    week = store.timesheets_between(date(2026, 10, 19), date(2026, 10, 25))
+    assert [(t.id, t.duration) for t in week] == [(3, 7200)]
+    assert [t.id for t in store.timesheets_between(date(2026, 10, 12), date(2026, 10, 18))] == [1]
+
+
+def test_reconcile_leaves_the_mirror_alone_when_kimai_fails(store):
+    api = FakeApi([entry(1, "2026-10-19")])
+    store.sync(api, PROFILE)
+    api.get_timesheets = lambda profile, **filters: None
+
+    assert not store.reconcile(api, PROFILE, date(2026, 10, 19), date(2026, 10, 25))
+    assert len(store.timesheets_between(date(2026, 10, 19), date(2026, 10, 25))) == 1
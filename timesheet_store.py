@@ -0,0 +1,187 @@
+# Import python modules
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from .kimai_records import Timesheet
+from .settings_cache import ConnectionProfile
+from .totals_cache import KIMAI_DATETIME_FORMAT
+from .plugin_log import get_logger
+
+log = get_logger("cache")
+
+# Kimai compares modified_after against its own clock; re-read a little overlap
+SYNC_OVERLAP = timedelta(minutes=2)
+# The cursor carries its UTC offset, so Kimai doesn't read it in the user's timezone
+CURSOR_FORMAT = KIMAI_DATETIME_FORMAT + "%z"
+# Incremental syncs can't see deletions; re-download everything this often
+FULL_SYNC_INTERVAL = 7 * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS timesheets (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    begin TEXT NOT NULL,
+    end TEXT,
+    duration INTEGER,
+    project_id INTEGER,
+    activity_id INTEGER,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS timesheets_by_day ON timesheets (day);
+CREATE INDEX IF NOT EXISTS timesheets_by_project_day ON timesheets (project_id, day);
+CREATE INDEX IF NOT EXISTS timesheets_by_begin ON timesheets (begin);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def store_path(data_dir: str, profile: ConnectionProfile) -> str:
+    """Database file for a profile; a different URL or token (i.e. user) gets its own file"""
+    digest = hashlib.sha256(f"{profile.base_url}\n{profile.api_token}".encode()).hexdigest()[:16]
+    return os.path.join(data_dir, f"timesheets-{digest}.sqlite3")
+
+
+class TimesheetStore:
+    """Local SQLite mirror of the user's timesheets on one Kimai instance.
+
+    The first ``sync`` pages through /api/timesheets once; later syncs only
+    ask for entries with ``modified_after`` the previous sync, using Kimai's
+    clock for the cursor. Rows are indexed by day and by project, so history
+    lookups (week ranges, recent combinations) are local queries instead of
+    round trips. Queries return ``Timesheet`` records. Kimai doesn't report
+    deletions, so ``reconcile`` replaces a date range with what Kimai returns
+    for it and ``sync`` falls back to a full download every
+    ``FULL_SYNC_INTERVAL`` seconds.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    @property
+    def last_synced_at(self) -> Optional[str]:
+        """Server-side cursor of the last successful sync, or None before the first one"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM sync_state WHERE key = 'modified_after'").fetchone()
+        return row["value"] if row else None
+
+    def _full_sync_due(self) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM sync_state WHERE key = 'full_synced_at'").fetchone()
+        return row is None or time.time() - float(row["value"]) >= FULL_SYNC_INTERVAL
+
+    def sync(self, kimai_api, profile: ConnectionProfile, full: bool = False) -> bool:
+        """Bring the mirror up to date; returns False if Kimai could not be reached"""
+        if not profile.is_configured:
+            return False
+
+        # Concurrent callers wait for the running sync instead of starting their own
+        with self._sync_lock:
+            cursor = None if full or self._full_sync_due() else self.last_synced_at
+            # Fallback cursor, taken before the request so nothing modified meanwhile is missed
+            requested_at = datetime.now(timezone.utc)
+
+            filters = {"modified_after": cursor} if cursor else {}
+            result = kimai_api.get_timesheets_with_server_time(profile, **filters)
+            if result is None:
+                return False
+            timesheets, server_time = result
+            next_cursor = ((server_time or requested_at) - SYNC_OVERLAP).strftime(CURSOR_FORMAT)
+
+            with self._lock, self._db:
+                if cursor is None:
+                    self._db.execute("DELETE FROM timesheets")
+                    self._db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('full_synced_at', ?)",
+                                     (str(time.time()),))
+                self._insert(timesheets)
+                self._db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('modified_after', ?)", (next_cursor,))
+
+            log.info("Synced {} timesheet(s) into the local mirror ({})", len(timesheets), 'incremental' if cursor else 'full')
+            return True
+
+    def reconcile(self, kimai_api, profile: ConnectionProfile, start: date, end: date) -> bool:
+        """Replace ``start`` .. ``end`` (inclusive) with what Kimai returns for it, dropping deleted entries.
+
+        Returns False if Kimai could not be reached; the mirror is unchanged then.
+        """
+        if not profile.is_configured:
+            return False
+
+        with self._sync_lock:
+            begin = datetime.combine(start, datetime.min.time())
+            until = datetime.combine(end, datetime.max.time().replace(microsecond=0))
+            timesheets = kimai_api.get_timesheets(profile, begin=begin.strftime(KIMAI_DATETIME_FORMAT),
+                                                  end=until.strftime(KIMAI_DATETIME_FORMAT))
+            if timesheets is None:
+                return False
+
+            with self._lock, self._db:
+                removed = self._db.execute("DELETE FROM timesheets WHERE day BETWEEN ? AND ?",
+                                           (start.isoformat(), end.isoformat())).rowcount
+                self._insert(timesheets)
+
+            log.debug("Reconciled {} .. {}: {} timesheet(s) ({} row(s) replaced)", start, end, len(timesheets), removed)
+            return True
+
+    def timesheets_between(self, start: date, end: date, project_id=None) -> list:
+        """Timesheets that began on ``start`` .. ``end`` (inclusive), oldest first"""
+        sql = "SELECT * FROM timesheets WHERE day BETWEEN ? AND ?"
+        params = [start.isoformat(), end.isoformat()]
+        if project_id is not None:
+            sql = "SELECT * FROM timesheets WHERE project_id = ? AND day BETWEEN ? AND ?"
+            params.insert(0, project_id)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY begin", params).fetchall()
+        return [self._timesheet(row) for row in rows]
+
+    def recent_combinations(self, limit: int = 10) -> list:
+        """Most recently tracked (project id, activity id, description) combinations, newest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT project_id, activity_id, description, MAX(begin) AS last_begin FROM timesheets "
+                "GROUP BY project_id, activity_id, description ORDER BY last_begin DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [(row["project_id"], row["activity_id"], row["description"] or "") for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _insert(self, timesheets: list) -> None:
+        """Insert or update rows; call inside a transaction holding the lock"""
+        self._db.executemany(
+            "INSERT OR REPLACE INTO timesheets (id, day, begin, end, duration, project_id, activity_id, description) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [self._row(timesheet) for timesheet in timesheets if timesheet.id and timesheet.begin]
+        )
+
+    def _row(self, timesheet: Timesheet) -> tuple:
+        return (
+            timesheet.id,
+            timesheet.begin[:10],  # Kimai reports begin in the user's timezone; its date is the day
+            timesheet.begin,
+            timesheet.end,
+            timesheet.duration,
+            timesheet.project_id,
+            timesheet.activity_id,
+            timesheet.description,
+        )
+
+    def _timesheet(self, row: sqlite3.Row) -> Timesheet:
+        return Timesheet(row["id"], row["begin"], row["end"], row["duration"],
+                         row["project_id"], row["activity_id"], row["description"] or "")
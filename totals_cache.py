@@ -0,0 +1,164 @@
+# Import python modules
+import threading
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from .kimai_records import Timesheet
+from .plugin_log import get_logger
+
+log = get_logger("cache")
+
+KIMAI_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def parse_kimai_datetime(value: str) -> Optional[datetime]:
+    """Parse a Kimai timestamp such as ``2025-06-18T07:02:46+0200`` (offset optional)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, KIMAI_DATETIME_FORMAT + "%z")
+    except ValueError:
+        try:
+            return datetime.strptime(value[:19], KIMAI_DATETIME_FORMAT).astimezone()
+        except ValueError:
+            log.debug("Unparseable Kimai datetime: '{}'", value)
+            return None
+
+
+def week_start(day: date) -> date:
+    """Monday of the week containing ``day``"""
+    return day - timedelta(days=day.weekday())
+
+
+class TrackedTotalsCache:
+    """Per-day tracked seconds for the current week, kept up to date locally.
+
+    The week is fetched once with ``begin``/``end`` filters. After that, the
+    active timesheet seen by the instance's poller (which every local start
+    and stop refreshes) moves the running entry in and out of the aggregates,
+    and the running entry's elapsed time is added on read, so refreshing the
+    display never re-downloads the week. Entries are attributed to the day
+    they began on, like Kimai does.
+
+    With a ``timesheet_store`` the downloaded week replaces that range of the
+    local mirror, so entries deleted in Kimai drop out of both.
+    """
+
+    def __init__(self, kimai_api, timesheet_store=None):
+        self.kimai_api = kimai_api
+        self.timesheet_store = timesheet_store
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._week = None       # Monday of the loaded week
+        self._days = {}         # date -> {project id: seconds}
+        self._finished = set()  # ids already counted in _days
+        self._running = None    # (id, project id, begin datetime)
+        self.hits = 0           # Loads served by the week already in memory
+        self.misses = 0
+
+    @property
+    def is_current(self) -> bool:
+        """Whether the loaded week is this week"""
+        return self._week == week_start(date.today())
+
+    def load(self, profile, force: bool = False) -> bool:
+        """Fetch this week's timesheets unless they are already loaded"""
+        with self._load_lock:
+            if self.is_current and not force:
+                self.hits += 1
+                return True
+            self.misses += 1
+
+            monday = week_start(date.today())
+            timesheets = self._fetch_week(profile, monday)
+            if timesheets is None:
+                return False
+
+            with self._lock:
+                self._week = monday
+                self._days = {}
+                self._finished = set()
+                self._running = None
+                for timesheet in timesheets:
+                    if timesheet.is_running:
+                        self._set_running(timesheet)
+                    else:
+                        self._add_finished(timesheet.id, timesheet.project_id,
+                                           parse_kimai_datetime(timesheet.begin), timesheet.duration)
+            log.info("Loaded {} timesheets for the week of {}", len(timesheets), monday)
+            return True
+
+    def _fetch_week(self, profile, monday: date) -> Optional[list]:
+        sunday = monday + timedelta(days=6)
+        if self.timesheet_store is not None and self.timesheet_store.reconcile(self.kimai_api, profile, monday, sunday):
+            return self.timesheet_store.timesheets_between(monday, sunday)
+
+        begin = datetime.combine(monday, datetime.min.time())
+        end = begin + timedelta(days=7) - timedelta(seconds=1)
+        return self.kimai_api.get_timesheets(profile, begin=begin.strftime(KIMAI_DATETIME_FORMAT),
+                                             end=end.strftime(KIMAI_DATETIME_FORMAT))
+
+    def apply_active(self, timesheet: Optional[Timesheet]) -> None:
+        """Follow the active timesheet reported by a poll (None when nothing runs)"""
+        active_id = timesheet.id if timesheet else None
+        with self._lock:
+            if self._week is None:
+                return
+            if self._running is not None and self._running[0] != active_id:
+                # Stopped since we last looked; count it up to now (the server may round differently)
+                running_id, project_id, begin = self._running
+                self._add_finished(running_id, project_id, begin,
+                                   (datetime.now(begin.tzinfo) - begin).total_seconds())
+                self._running = None
+            if timesheet is not None and self._running is None:
+                self._set_running(timesheet)
+
+    def totals(self, project_id=None) -> tuple:
+        """(today, this week) in seconds, including the running entry, optionally for one project"""
+        today = date.today()
+        with self._lock:
+            days = self._days
+            running = self._running
+
+            def day_total(day: date) -> float:
+                per_project = days.get(day, {})
+                if project_id is None:
+                    return sum(per_project.values())
+                return per_project.get(project_id, 0)
+
+            today_total = day_total(today)
+            week_total = sum(day_total(week_start(today) + timedelta(days=offset)) for offset in range(7))
+
+        if running is not None and (project_id is None or running[1] == project_id):
+            _, _, begin = running
+            elapsed = max(0.0, (datetime.now(begin.tzinfo) - begin).total_seconds())
+            if begin.date() == today:
+                today_total += elapsed
+            if week_start(begin.date()) == week_start(today):
+                week_total += elapsed
+        return today_total, week_total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._week = None
+            self._days = {}
+            self._finished = set()
+            self._running = None
+
+    def _set_running(self, timesheet: Timesheet) -> None:
+        begin = parse_kimai_datetime(timesheet.begin)
+        if begin is not None:
+            self._running = (timesheet.id, timesheet.project_id, begin)
+
+    def _add_finished(self, timesheet_id, project_id, begin: Optional[datetime], duration) -> None:
+        if begin is None or timesheet_id in self._finished:
+            return
+        self._finished.add(timesheet_id)
+        per_project = self._days.setdefault(begin.date(), {})
+        per_project[project_id] = per_project.get(project_id, 0) + float(duration or 0)
+
+
+def format_duration(seconds: float) -> str:
+    """Hours and minutes, e.g. ``7:05``"""
+    minutes = int(seconds // 60)
+    return f"{minutes // 60}:{minutes % 60:02d}"
@@ -0,0 +1,104 @@
+# Import python modules
+import functools
+import threading
+from typing import Callable
+from .plugin_log import get_logger
+
+log = get_logger("ui")
+
+def is_main_thread() -> bool:
+    """Whether the caller runs on the thread of the GLib main loop"""
+    return threading.current_thread() is threading.main_thread()
+
+
+class UiDispatcher:
+    """Coalesces one action's widget updates into a single main-loop callback.
+
+    Worker threads (and event handlers) ``post`` updates under a key instead
+    of calling ``GLib.idle_add`` themselves. A newer update for the same key
+    replaces the pending one, since only the latest state of e.g. the display
+    is worth rendering. Everything pending runs in posting order from one idle
+    callback, so a burst of poll results, errors and state changes costs one
+    main-loop dispatch and one render per key.
+    """
+
+    def __init__(self, owner):
+        self.owner_type = type(owner).__name__
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> (callback, args, kwargs), in posting order
+        self._scheduled = False
+        self._depth = 0  # Renders running on the main thread (only touched there)
+        self.posted = 0
+        self.superseded = 0
+        self.flushes = 0
+
+    def post(self, key: str, callback: Callable, *args, **kwargs) -> None:
+        """Run ``callback(*args, **kwargs)`` on the main loop, replacing a pending update for ``key``"""
+        from gi.repository import GLib
+        with self._lock:
+            self.posted += 1
+            if self._pending.pop(key, None) is not None:
+                self.superseded += 1
+            self._pending[key] = (callback, args, kwargs)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        GLib.idle_add(self._flush)
+
+    def cancel(self, key: str) -> None:
+        """Drop a pending update (it was rendered directly in the meantime)"""
+        with self._lock:
+            if self._pending.pop(key, None) is not None:
+                self.superseded += 1
+
+    def run_now(self, key: str, callback: Callable, *args, **kwargs):
+        """Render on the main thread right away, superseding a pending update for ``key``.
+
+        Renders nested in another render or in a flush leave pending updates
+        alone: those were posted after the state being rendered now.
+        """
+        if self._depth == 0:
+            self.cancel(key)
+        self._depth += 1
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            self._depth -= 1
+
+    def _flush(self) -> bool:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+            self.flushes += 1
+
+        if not is_main_thread():
+            log.error("UI updates of {} dispatched off the main thread ({})", self.owner_type, threading.current_thread().name)
+
+        self._depth += 1
+        try:
+            for key, (callback, args, kwargs) in pending.items():
+                try:
+                    callback(*args, **kwargs)
+                except Exception as e:
+                    log.error("Error applying UI update '{}' of {}: {}", key, self.owner_type, e)
+        finally:
+            self._depth -= 1
+        return False  # One-shot; the next post schedules a new flush
+
+
+def main_thread_only(key: str):
+    """Decorator for an action's render methods: widget calls only ever happen on the main thread.
+
+    On the main thread the method runs right away (see ``UiDispatcher.run_now``);
+    from any other thread it is posted to the action's ``ui`` dispatcher under
+    ``key`` instead, so worker threads can simply call it. Methods sharing a
+    key render the same widgets and supersede each other.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if is_main_thread():
+                return self.ui.run_now(key, method, self, *args, **kwargs)
+            self.ui.post(key, method, self, *args, **kwargs)
+        return wrapper
+    return decorator